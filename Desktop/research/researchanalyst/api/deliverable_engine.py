@@ -1,20 +1,39 @@
 import json
 import os
-import requests
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 import re
 from urllib.parse import urlparse
-import feedparser
 from bs4 import BeautifulSoup
 import yaml
 
+from api.feed_ingester import get_feed_store
+from api.feeds import feed_urls
+from api.http_client import get_http_client
+from api.response_cache import get_response_cache
+from search import get_tfidf_model
+from search.tfidf import cosine
+
+# Source providers queried by aggregate_sources, in the order their results are merged
+SOURCE_PROVIDERS = ('external', 'rss', 'web', 'internal')
+# Time budget (seconds) for one aggregation; providers still running after it are dropped
+AGGREGATION_BUDGET = float(os.getenv('SOURCE_AGGREGATION_BUDGET', '8'))
+# Shared across requests, so a burst of generate calls cannot start unbounded threads
+PROVIDER_WORKERS = 8
+
 class DeliverableEngine:
     """Comprehensive deliverable creation engine with multi-source integration."""
     
     def __init__(self):
         self.load_configurations()
         self.setup_external_apis()
+        self._provider_pool = ThreadPoolExecutor(max_workers=PROVIDER_WORKERS, thread_name_prefix='source-provider')
+        self._provider_stats = {name: {'calls': 0, 'ok': 0, 'errors': 0, 'timeouts': 0, 'total_ms': 0.0, 'max_ms': 0.0}
+                                for name in SOURCE_PROVIDERS}
+        self._stats_lock = threading.Lock()
     
     def load_configurations(self):
         """Load all configuration files for the deliverable engine."""
@@ -55,6 +74,12 @@ class DeliverableEngine:
             'https://feeds.reuters.com/reuters/businessNews',
             'https://www.economist.com/finance-and-economics/rss.xml'
         ]
+        # Outbound calls share one set of keep-alive pools (see api/http_client.py)
+        self.http = get_http_client()
+        # Provider responses are reused across requests until their TTL runs out
+        self.response_cache = get_response_cache()
+        # RSS entries are polled in the background (api/feed_ingester.py); requests only read the store
+        self.feed_store = get_feed_store()
     
     def _create_default_format_rules(self) -> Dict:
         """Create default format detection rules."""
@@ -310,32 +335,94 @@ class DeliverableEngine:
             'output_formats': self.format_rules.get('format_detection', {}).get(best_match, {}).get('output_formats', ['pdf'])
         }
     
-    def aggregate_sources(self, task: Dict, existing_sources: List[Dict] = None) -> List[Dict]:
+    def aggregate_sources(self, task: Dict, existing_sources: List[Dict] = None,
+                          budget: float = None) -> List[Dict]:
         """Aggregate sources from multiple platforms and APIs."""
+        return self.aggregate_sources_with_report(task, existing_sources, budget)[0]
+    
+    def aggregate_sources_with_report(self, task: Dict, existing_sources: List[Dict] = None,
+                                      budget: float = None) -> Tuple[List[Dict], Dict]:
+        """Aggregate sources, querying all providers concurrently within one time budget.
+        
+        Returns the ranked sources and a report with each provider's status
+        ('ok', 'error', 'timed_out' or 'cancelled'), latency and result count.
+        Results of providers that miss the deadline are discarded.
+        """
         aggregated_sources = existing_sources or []
-        
-        # Get external news and data
-        external_sources = self._fetch_external_sources(task)
-        aggregated_sources.extend(external_sources)
-        
-        # Get RSS feed content
-        rss_sources = self._fetch_rss_sources(task)
-        aggregated_sources.extend(rss_sources)
-        
-        # Get web scraping results
-        web_sources = self._scrape_web_sources(task)
-        aggregated_sources.extend(web_sources)
-        
-        # Get internal sources
-        internal_sources = self._fetch_internal_sources(task)
-        aggregated_sources.extend(internal_sources)
+        budget = AGGREGATION_BUDGET if budget is None else budget
+        started = time.monotonic()
+        deadline = started + budget
+        providers = {
+            'external': self._fetch_external_sources,
+            'rss': self._fetch_rss_sources,
+            'web': self._scrape_web_sources,
+            'internal': self._fetch_internal_sources,
+        }
+        futures = {name: self._provider_pool.submit(self._run_provider, name, fetch, task, deadline)
+                   for name, fetch in providers.items()}
+        
+        pending = set(futures.values())
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            _, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+        
+        report = {'budget_seconds': budget, 'providers': {}, 'timed_out': []}
+        for name in SOURCE_PROVIDERS:
+            future = futures[name]
+            if future in pending:
+                # Queued providers never start; running ones finish in the background and are ignored
+                status = 'cancelled' if future.cancel() else 'timed_out'
+                report['providers'][name] = {'status': status, 'latency_ms': None, 'count': 0}
+                report['timed_out'].append(name)
+                self._record_provider(name, status, None)
+                continue
+            sources, latency_ms, error = future.result()
+            entry = {'status': 'error' if error else 'ok', 'latency_ms': round(latency_ms, 1), 'count': len(sources)}
+            if error:
+                entry['error'] = error
+            report['providers'][name] = entry
+            self._record_provider(name, entry['status'], latency_ms)
+            aggregated_sources.extend(sources)
         
         # Rank and filter sources by relevance
         ranked_sources = self._rank_sources_by_relevance(task, aggregated_sources)
+        report['elapsed_ms'] = round((time.monotonic() - started) * 1000, 1)
         
-        return ranked_sources[:20]  # Limit to top 20 most relevant sources
+        return ranked_sources[:20], report  # Limit to top 20 most relevant sources
     
-    def _fetch_external_sources(self, task: Dict) -> List[Dict]:
+    def provider_stats(self) -> Dict:
+        """Cumulative per-provider call counts and latencies."""
+        with self._stats_lock:
+            return {name: dict(stats, avg_ms=round(stats['total_ms'] / stats['ok'], 1) if stats['ok'] else None,
+                               total_ms=round(stats['total_ms'], 1), max_ms=round(stats['max_ms'], 1))
+                    for name, stats in self._provider_stats.items()}
+    
+    def _run_provider(self, name: str, fetch, task: Dict, deadline: float) -> Tuple[List[Dict], float, Optional[str]]:
+        started = time.monotonic()
+        error = None
+        try:
+            sources = fetch(task, deadline)
+        except Exception as e:
+            print(f"Error aggregating {name} sources: {str(e)}")
+            sources, error = [], str(e)
+        return sources, (time.monotonic() - started) * 1000, error
+    
+    def _record_provider(self, name: str, status: str, latency_ms: Optional[float]) -> None:
+        with self._stats_lock:
+            stats = self._provider_stats[name]
+            stats['calls'] += 1
+            if status == 'ok':
+                stats['ok'] += 1
+                stats['total_ms'] += latency_ms
+                stats['max_ms'] = max(stats['max_ms'], latency_ms)
+            elif status == 'error':
+                stats['errors'] += 1
+            else:
+                stats['timeouts'] += 1
+    
+    def _fetch_external_sources(self, task: Dict, deadline: float = None) -> List[Dict]:
         """Fetch sources from external APIs."""
         sources = []
         
@@ -352,61 +439,68 @@ class DeliverableEngine:
                     'pageSize': 10
                 }
                 
-                response = requests.get(url, params=params, timeout=10)
-                if response.status_code == 200:
-                    data = response.json()
-                    for article in data.get('articles', []):
-                        sources.append({
-                            'id': f"news-{len(sources)}",
-                            'title': article.get('title', ''),
-                            'description': article.get('description', ''),
-                            'url': article.get('url', ''),
-                            'source': article.get('source', {}).get('name', ''),
-                            'published_at': article.get('publishedAt', ''),
-                            'type': 'news_article',
-                            'media_type': 'article',
-                            'relevance_score': 0.0,  # Will be calculated later
-                            'tags': [],
-                            'access_status': 'Available'
-                        })
+                # Identical queries are answered from the response cache (apiKey is not part of the key)
+                articles = self.response_cache.get_or_fetch(
+                    'news_api', dict(params, url=url),
+                    lambda previous, deadline: self._fetch_news_articles(url, params, deadline),
+                    source_type='news_article', deadline=deadline)
+                for article in articles:
+                    sources.append({
+                        'id': f"news-{len(sources)}",
+                        'title': article.get('title', ''),
+                        'description': article.get('description', ''),
+                        'url': article.get('url', ''),
+                        'source': article.get('source', {}).get('name', ''),
+                        'published_at': article.get('publishedAt', ''),
+                        'type': 'news_article',
+                        'media_type': 'article',
+                        'relevance_score': 0.0,  # Will be calculated later
+                        'tags': [],
+                        'access_status': 'Available'
+                    })
             except Exception as e:
                 print(f"Error fetching news: {e}")
-        
+
         return sources
-    
-    def _fetch_rss_sources(self, task: Dict) -> List[Dict]:
-        """Fetch sources from RSS feeds."""
+
+    def _fetch_news_articles(self, url: str, params: Dict, deadline: float = None) -> List[Dict]:
+        """Query NewsAPI; raises on a failed request so that nothing is cached for it."""
+        response = self.http.get('news_api', url, params=params, deadline=deadline)
+        if response.status_code != 200:
+            raise Exception(f"NewsAPI returned HTTP {response.status_code}")
+        return response.json().get('articles', [])
+
+    def _fetch_rss_sources(self, task: Dict, deadline: float = None) -> List[Dict]:
+        """Fetch sources from RSS feeds.
+
+        Reads the entries the feed ingester has stored locally, so deadline
+        (taken by every provider) is not needed here.
+        """
         sources = []
         query_terms = self._extract_search_terms(task)
-        
-        for feed_url in self.source_config['external_sources']['rss_feeds']:
-            try:
-                feed = feedparser.parse(feed_url)
-                for entry in feed.entries[:5]:  # Limit to 5 entries per feed
-                    # Check if entry is relevant to task
-                    entry_text = f"{entry.get('title', '')} {entry.get('summary', '')}".lower()
-                    relevance = sum(1 for term in query_terms if term.lower() in entry_text)
-                    
-                    if relevance > 0:
-                        sources.append({
-                            'id': f"rss-{len(sources)}",
-                            'title': entry.get('title', ''),
-                            'description': entry.get('summary', ''),
-                            'url': entry.get('link', ''),
-                            'source': feed.feed.get('title', 'RSS Feed'),
-                            'published_at': entry.get('published', ''),
-                            'type': 'rss_feed',
-                            'media_type': 'article',
-                            'relevance_score': relevance / len(query_terms),
-                            'tags': [],
-                            'access_status': 'Available'
-                        })
-            except Exception as e:
-                print(f"Error fetching RSS feed {feed_url}: {e}")
+        if not query_terms:
+            return sources
+        
+        feeds = feed_urls(self.source_config['external_sources'].get('rss_feeds'))
+        # Up to 5 relevant entries per feed, from the locally ingested copy
+        for entry in self.feed_store.search(feeds, query_terms, limit=5):
+            sources.append({
+                'id': f"rss-{len(sources)}",
+                'title': entry['title'],
+                'description': entry['description'],
+                'url': entry['link'],
+                'source': entry['feed'],
+                'published_at': entry['published'],
+                'type': 'rss_feed',
+                'media_type': 'article',
+                'relevance_score': entry['relevance'] / len(query_terms),
+                'tags': [],
+                'access_status': 'Available'
+            })
         
         return sources
     
-    def _scrape_web_sources(self, task: Dict) -> List[Dict]:
+    def _scrape_web_sources(self, task: Dict, deadline: float = None) -> List[Dict]:
         """Scrape web sources for additional content."""
         sources = []
         query_terms = self._extract_search_terms(task)
@@ -417,7 +511,7 @@ class DeliverableEngine:
         
         return sources
     
-    def _fetch_internal_sources(self, task: Dict) -> List[Dict]:
+    def _fetch_internal_sources(self, task: Dict, deadline: float = None) -> List[Dict]:
         """Fetch sources from internal platforms (mock implementation)."""
         sources = []
         
@@ -486,13 +580,17 @@ class DeliverableEngine:
     
     def _rank_sources_by_relevance(self, task: Dict, sources: List[Dict]) -> List[Dict]:
         """Rank sources by relevance to the task."""
-        task_text = f"{task.get('title', '')} {task.get('description', '')}".lower()
+        model = get_tfidf_model()
+        # One store check for the whole batch rather than one per source
+        model.refresh()
+        task_vector = model.text_vector(f"{task.get('title', '')} {task.get('description', '')}", refresh=False)
         
         for source in sources:
-            source_text = f"{source.get('title', '')} {source.get('description', '')}".lower()
+            source_vector = model.text_vector(f"{source.get('title', '')} {source.get('description', '')}",
+                                              refresh=False)
             
-            # Calculate relevance score based on text similarity
-            relevance_score = self._calculate_text_similarity(task_text, source_text)
+            # Relevance is the TF-IDF cosine similarity of the texts
+            relevance_score = cosine(task_vector, source_vector)
             
             # Boost score for recent sources
             if source.get('published_at'):
@@ -511,18 +609,12 @@ class DeliverableEngine:
         # Sort by relevance score
         return sorted(sources, key=lambda x: x.get('relevance_score', 0), reverse=True)
     
-    def _calculate_text_similarity(self, text1: str, text2: str) -> float:
-        """Calculate simple text similarity score."""
-        words1 = set(text1.split())
-        words2 = set(text2.split())
-        
-        if not words1 or not words2:
-            return 0.0
-        
-        intersection = words1.intersection(words2)
-        union = words1.union(words2)
-        
-        return len(intersection) / len(union)
+    def _calculate_text_similarity(self, text1: str, text2: str, refresh: bool = True) -> float:
+        """Cosine similarity of two texts, weighted by the shared TF-IDF model.
+
+        In a loop, call get_tfidf_model().refresh() once and pass refresh=False.
+        """
+        return get_tfidf_model().similarity(text1, text2, refresh)
     
     def generate_deliverable(self, task: Dict, sources: List[Dict], format_type: str = None) -> Dict:
         """Generate a comprehensive deliverable using the detected format and aggregated sources."""
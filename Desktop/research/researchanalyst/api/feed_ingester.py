@@ -0,0 +1,410 @@
+import hashlib
+import json
+import os
+import random
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import timezone
+from typing import Dict, Iterator, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from bs4 import BeautifulSoup
+from dateutil import parser as date_parser
+
+from api.feeds import FeedFetcher, feed_urls, item_relevance
+from storage.json_backend import DATA_DIR
+
+CONFIG_PATH = os.path.join(DATA_DIR, 'source_config.json')
+FEED_DB_PATH = os.path.join(DATA_DIR, '.feeds.db')
+
+# Feeds polled at the same time
+FEED_WORKERS = 6
+# Poll interval bounds (seconds); each feed starts at INITIAL_INTERVAL
+MIN_INTERVAL = 5 * 60
+INITIAL_INTERVAL = 15 * 60
+MAX_INTERVAL = 6 * 60 * 60
+# A poll with new entries divides the interval by this; one without multiplies it
+SPEEDUP = 2.0
+BACKOFF = 1.5
+# Failed polls back off faster
+ERROR_BACKOFF = 2.0
+# How often the poller wakes up to look for due feeds
+TICK = 30
+# Entries kept per feed, newest first
+MAX_ENTRIES_PER_FEED = 200
+# Query-string parameters that only track the click (plus any utm_*), dropped when deduplicating links
+TRACKING_PARAMS = {'ref', 'cmpid', 'ito', 'fbclid', 'gclid'}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS feeds (
+    url TEXT PRIMARY KEY,
+    title TEXT,
+    etag TEXT,
+    last_modified TEXT,
+    interval REAL NOT NULL,
+    next_poll REAL NOT NULL,
+    last_polled REAL,
+    last_changed REAL,
+    errors INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS entries (
+    seq INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    feed_url TEXT NOT NULL,
+    title TEXT NOT NULL,
+    description TEXT NOT NULL,
+    link TEXT NOT NULL,
+    published_at TEXT NOT NULL,
+    ingested_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_feed_published ON entries(feed_url, published_at);
+"""
+
+# Full-text index over entries, kept in sync by triggers (external-content FTS5 table)
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(
+    title, description, content='entries', content_rowid='seq'
+);
+CREATE TRIGGER IF NOT EXISTS entries_ai AFTER INSERT ON entries BEGIN
+    INSERT INTO entries_fts (rowid, title, description) VALUES (new.seq, new.title, new.description);
+END;
+CREATE TRIGGER IF NOT EXISTS entries_ad AFTER DELETE ON entries BEGIN
+    INSERT INTO entries_fts (entries_fts, rowid, title, description) VALUES ('delete', old.seq, old.title, old.description);
+END;
+CREATE TRIGGER IF NOT EXISTS entries_au AFTER UPDATE ON entries BEGIN
+    INSERT INTO entries_fts (entries_fts, rowid, title, description) VALUES ('delete', old.seq, old.title, old.description);
+    INSERT INTO entries_fts (rowid, title, description) VALUES (new.seq, new.title, new.description);
+END;
+"""
+
+
+def configured_feeds(path: str = CONFIG_PATH) -> List[str]:
+    """Enabled feed URLs from source_config.json["external_sources"]["rss_feeds"]."""
+    try:
+        with open(path, 'r') as f:
+            return feed_urls(json.load(f).get('external_sources', {}).get('rss_feeds'))
+    except FileNotFoundError:
+        return []
+    except Exception as e:
+        print(f"Error loading feed config: {str(e)}")
+        return []
+
+
+def normalize_link(link: str) -> str:
+    """Canonical form of an entry link for deduplication: lowercase host, no fragment or tracking params."""
+    parts = urlsplit(link.strip())
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+             if not (k.lower().startswith('utm_') or k.lower() in TRACKING_PARAMS)]
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, urlencode(query), ''))
+
+
+def normalize_entry(item: Dict) -> Optional[Dict]:
+    """Plain-text title and description, canonical link and ISO-8601 UTC date; None for empty items."""
+    title = ' '.join(item.get('title', '').split())
+    description = item.get('description', '')
+    if '<' in description:
+        description = BeautifulSoup(description, 'html.parser').get_text(' ')
+    description = ' '.join(description.split())
+    if not title and not description:
+        return None
+    link = normalize_link(item.get('link', '')) if item.get('link') else ''
+    try:
+        published = date_parser.parse(item.get('published', ''))
+        if published.tzinfo is None:
+            published = published.replace(tzinfo=timezone.utc)
+        published_at = published.astimezone(timezone.utc).isoformat()
+    except (ValueError, OverflowError):
+        published_at = ''
+    # The same story syndicated by two feeds shares its link; linkless entries fall back to their title
+    key = link or f"{title.lower()}|{published_at}"
+    return {
+        'id': hashlib.sha1(key.encode('utf-8')).hexdigest(),
+        'title': title,
+        'description': description,
+        'link': link,
+        'published_at': published_at,
+    }
+
+
+def fts_query(terms: List[str]) -> str:
+    """FTS5 query matching any term as a word prefix ("payment" also finds "payments")."""
+    return ' OR '.join('"{}"*'.format(term.replace('"', '""')) for term in terms if term.strip())
+
+
+class FeedStore:
+    """Local, indexed store of normalized RSS/Atom entries and per-feed polling state.
+
+    Entries are deduplicated by canonical link and searched through an FTS5
+    index (or LIKE when SQLite lacks FTS5). The feeds table holds each
+    feed's validators and adaptive poll schedule; pollers claim a due feed
+    by moving its next_poll forward, so several processes can poll without
+    fetching the same feed twice.
+    """
+
+    def __init__(self, path: str = FEED_DB_PATH):
+        self.path = path
+        self.fts = True
+        self._local = threading.local()
+
+    def search(self, urls: List[str], terms: List[str], limit: int = 5) -> List[Dict]:
+        """Up to limit newest entries per feed that mention a search term.
+
+        Each entry has title, description, link, published, feed (the feed's
+        title), url (the feed's URL) and relevance (the number of terms it mentions).
+        """
+        terms = [term for term in terms if term.strip()]
+        if not urls or not terms:
+            return []
+        placeholders = ', '.join('?' for _ in urls)
+        columns = 'e.title, e.description, e.link, e.published_at, e.feed_url, f.title'
+        if self.fts:
+            sql = (f'SELECT {columns} FROM entries_fts JOIN entries e ON e.seq = entries_fts.rowid '
+                   f'LEFT JOIN feeds f ON f.url = e.feed_url '
+                   f'WHERE entries_fts MATCH ? AND e.feed_url IN ({placeholders}) '
+                   f'ORDER BY e.published_at DESC, e.seq DESC')
+            params = [fts_query(terms)] + list(urls)
+        else:
+            like = ' OR '.join('e.title LIKE ? OR e.description LIKE ?' for _ in terms)
+            sql = (f'SELECT {columns} FROM entries e LEFT JOIN feeds f ON f.url = e.feed_url '
+                   f'WHERE ({like}) AND e.feed_url IN ({placeholders}) '
+                   f'ORDER BY e.published_at DESC, e.seq DESC')
+            params = [f'%{term}%' for term in terms for _ in range(2)] + list(urls)
+
+        per_feed = {url: 0 for url in urls}
+        results = []
+        for title, description, link, published_at, url, feed_title in self._conn().execute(sql, params):
+            if per_feed[url] >= limit:
+                if all(count >= limit for count in per_feed.values()):
+                    break
+                continue
+            entry = {'title': title, 'description': description, 'link': link, 'published': published_at}
+            relevance = item_relevance(entry, terms)
+            if relevance > 0:
+                per_feed[url] += 1
+                results.append(dict(entry, feed=feed_title or 'RSS Feed', url=url, relevance=relevance))
+        return results
+
+    def sync_feeds(self, urls: List[str]) -> None:
+        """Start polling new feeds right away and drop feeds (and their entries) no longer configured."""
+        conn = self._conn()
+        now = time.time()
+        conn.executemany('INSERT OR IGNORE INTO feeds (url, interval, next_poll) VALUES (?, ?, ?)',
+                         [(url, INITIAL_INTERVAL, now) for url in urls])
+        placeholders = ', '.join('?' for _ in urls)
+        conn.execute(f'DELETE FROM feeds WHERE url NOT IN ({placeholders})', list(urls))
+        conn.execute(f'DELETE FROM entries WHERE feed_url NOT IN ({placeholders})', list(urls))
+
+    def claim_due(self, lease: float) -> List[Dict]:
+        """Feeds due for a poll, each pushed lease seconds ahead so no other poller takes it meanwhile."""
+        conn = self._conn()
+        now = time.time()
+        claimed = []
+        for row in conn.execute('SELECT url, title, etag, last_modified, interval FROM feeds '
+                                'WHERE next_poll <= ? ORDER BY next_poll', (now,)).fetchall():
+            cursor = conn.execute('UPDATE feeds SET next_poll = ? WHERE url = ? AND next_poll <= ?',
+                                  (now + lease, row[0], now))
+            if cursor.rowcount:
+                claimed.append(dict(zip(('url', 'title', 'etag', 'last_modified', 'interval'), row)))
+        return claimed
+
+    def next_poll_in(self) -> Optional[float]:
+        row = self._conn().execute('SELECT MIN(next_poll) FROM feeds').fetchone()
+        return None if row[0] is None else max(0.0, row[0] - time.time())
+
+    def ingest(self, url: str, items: List[Dict]) -> int:
+        """Upsert normalized entries for a feed and trim it to MAX_ENTRIES_PER_FEED; returns how many were new."""
+        entries = [entry for entry in map(normalize_entry, items) if entry]
+        now = time.time()
+        with self._transaction() as conn:
+            added = conn.executemany(
+                'INSERT OR IGNORE INTO entries (id, feed_url, title, description, link, published_at, ingested_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                [(e['id'], url, e['title'], e['description'], e['link'], e['published_at'], now) for e in entries]
+            ).rowcount
+            # Entries already stored may have been edited upstream (a story shared with another feed stays with it)
+            conn.executemany(
+                'UPDATE entries SET title = ?, description = ? '
+                'WHERE id = ? AND feed_url = ? AND (title != ? OR description != ?)',
+                [(e['title'], e['description'], e['id'], url, e['title'], e['description']) for e in entries])
+            conn.execute(
+                'DELETE FROM entries WHERE feed_url = ? AND seq NOT IN '
+                '(SELECT seq FROM entries WHERE feed_url = ? ORDER BY published_at DESC, seq DESC LIMIT ?)',
+                (url, url, MAX_ENTRIES_PER_FEED))
+        return added
+
+    def reschedule(self, feed: Dict, changed: bool, error: bool = False, result: Dict = None) -> float:
+        """Adapt a feed's poll interval to whether it changed, and schedule its next poll; returns the interval."""
+        interval = feed['interval']
+        if error:
+            interval *= ERROR_BACKOFF
+        elif changed:
+            interval /= SPEEDUP
+        else:
+            interval *= BACKOFF
+        interval = min(MAX_INTERVAL, max(MIN_INTERVAL, interval))
+        now = time.time()
+        # Jitter keeps feeds that share a schedule from being polled in lockstep
+        next_poll = now + interval * random.uniform(0.9, 1.1)
+        conn = self._conn()
+        if error:
+            conn.execute('UPDATE feeds SET interval = ?, next_poll = ?, last_polled = ?, errors = errors + 1 '
+                         'WHERE url = ?', (interval, next_poll, now, feed['url']))
+        else:
+            result = result or {}
+            conn.execute(
+                'UPDATE feeds SET interval = ?, next_poll = ?, last_polled = ?, errors = 0, '
+                'last_changed = CASE WHEN ? THEN ? ELSE last_changed END, '
+                'title = COALESCE(?, title), etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified) '
+                'WHERE url = ?',
+                (interval, next_poll, now, changed, now, result.get('title') or None, result.get('etag'),
+                 result.get('last_modified'), feed['url']))
+        return interval
+
+    def feed_stats(self) -> List[Dict]:
+        now = time.time()
+        rows = self._conn().execute(
+            'SELECT f.url, f.title, f.interval, f.next_poll, f.last_polled, f.last_changed, f.errors, '
+            '(SELECT COUNT(*) FROM entries e WHERE e.feed_url = f.url) FROM feeds f ORDER BY f.url').fetchall()
+        return [{
+            'url': url, 'title': title, 'interval_seconds': round(interval),
+            'next_poll_in': round(max(0.0, next_poll - now)), 'last_polled': last_polled,
+            'last_changed': last_changed, 'errors': errors, 'entries': entries,
+        } for url, title, interval, next_poll, last_polled, last_changed, errors, entries in rows]
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(SCHEMA)
+            try:
+                conn.executescript(FTS_SCHEMA)
+            except sqlite3.OperationalError:
+                # SQLite built without FTS5: search falls back to LIKE
+                self.fts = False
+            self._local.conn = conn
+        return conn
+
+
+class FeedIngester:
+    """Polls the configured feeds in the background and stores their entries in a FeedStore.
+
+    Each feed is polled on its own schedule: the interval halves when a poll
+    brings new entries and grows by half when it does not (or doubles after
+    an error), within MIN_INTERVAL..MAX_INTERVAL. Polls use conditional GETs,
+    so an unchanged feed costs a 304.
+    """
+
+    def __init__(self, store: 'FeedStore' = None, fetcher: FeedFetcher = None,
+                 config_path: str = CONFIG_PATH, workers: int = FEED_WORKERS):
+        self.store = store or get_feed_store()
+        self.fetcher = fetcher or FeedFetcher()
+        self.config_path = config_path
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='feed-ingest')
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def poll_once(self) -> Dict[str, int]:
+        """Poll every due feed once; returns the number of new entries per polled feed."""
+        self.store.sync_feeds(configured_feeds(self.config_path))
+        # The lease outlasts any single request, so a crashed poller's feeds come back on their own
+        due = self.store.claim_due(lease=MIN_INTERVAL)
+        return dict(zip((feed['url'] for feed in due), self._pool.map(self._poll, due)))
+
+    def run(self) -> None:
+        """Poll until stop() is called."""
+        while not self._stop.is_set():
+            try:
+                self.poll_once()
+                wait = self.store.next_poll_in()
+            except Exception as e:
+                print(f"Error polling feeds: {str(e)}")
+                wait = TICK
+            self._stop.wait(TICK if wait is None else min(TICK, max(1.0, wait)))
+
+    def start(self) -> threading.Thread:
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run, name='feed-ingester', daemon=True)
+            self._thread.start()
+        return self._thread
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _poll(self, feed: Dict) -> int:
+        previous = {'etag': feed.get('etag'), 'last_modified': feed.get('last_modified'),
+                    'title': feed.get('title'), 'complete': True}
+        try:
+            result = self.fetcher.download(feed['url'], previous if feed.get('etag') or feed.get('last_modified') else None)
+        except Exception as e:
+            print(f"Error polling RSS feed {feed['url']}: {str(e)}")
+            self.store.reschedule(feed, changed=False, error=True)
+            return 0
+        if result is previous:
+            self.store.reschedule(feed, changed=False)
+            return 0
+        added = self.store.ingest(feed['url'], result.get('items', []))
+        self.store.reschedule(feed, changed=added > 0, result=result)
+        return added
+
+
+_store: Optional[FeedStore] = None
+_ingester: Optional[FeedIngester] = None
+_lock = threading.Lock()
+
+
+def get_feed_store() -> FeedStore:
+    """Process-wide FeedStore at FEED_DB_PATH."""
+    global _store
+    with _lock:
+        if _store is None:
+            _store = FeedStore()
+        return _store
+
+
+def start_feed_ingester() -> FeedIngester:
+    """Start the process-wide background poller (once)."""
+    global _ingester
+    store = get_feed_store()
+    with _lock:
+        if _ingester is None:
+            _ingester = FeedIngester(store)
+        _ingester.start()
+        return _ingester
+
+
+def feed_ingester_stats() -> List[Dict]:
+    """Per-feed poll schedule and entry counts, without opening the store if nothing used it."""
+    return _store.feed_stats() if _store is not None else []
+
+
+# python -m api.feed_ingester           poll feeds continuously (run instead of the in-app thread)
+# python -m api.feed_ingester --once    poll the due feeds once and exit
+if __name__ == "__main__":
+    ingester = FeedIngester()
+    if '--once' in sys.argv[1:]:
+        for url, added in ingester.poll_once().items():
+            print(f"{url}: {added} new entries")
+        sys.exit(0)
+    try:
+        ingester.run()
+    except KeyboardInterrupt:
+        pass
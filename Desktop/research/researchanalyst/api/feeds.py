@@ -0,0 +1,185 @@
+import threading
+import time
+import xml.etree.ElementTree as ET
+from typing import Any, Dict, Iterator, List, Optional
+
+import feedparser
+import requests
+
+from api.http_client import HttpClient, get_http_client
+
+# Stop reading a feed after this many items, matching or not
+FEED_SCAN_LIMIT = 50
+CHUNK_SIZE = 8192
+
+# RSS <item> / Atom <entry> children, mapped to item fields (first one found wins)
+ITEM_FIELDS = {
+    'title': ('title',),
+    'description': ('description', 'summary', 'content', 'encoded'),
+    'link': ('link',),
+    'published': ('pubDate', 'published', 'updated', 'date'),
+}
+
+
+def feed_urls(feeds: Any) -> List[str]:
+    """URLs of the enabled feeds in the rss_feeds config (plain URLs or {url, enabled} entries)."""
+    urls = []
+    for feed in feeds or []:
+        if isinstance(feed, str):
+            urls.append(feed)
+        elif isinstance(feed, dict) and feed.get('url') and feed.get('enabled', True):
+            urls.append(feed['url'])
+    return urls
+
+
+def item_relevance(item: Dict, terms: List[str]) -> int:
+    """Number of search terms found in the item's title and description."""
+    text = f"{item.get('title', '')} {item.get('description', '')}".lower()
+    return sum(1 for term in terms if term.lower() in text)
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1]
+
+
+def _element_item(element: ET.Element) -> Dict[str, str]:
+    children = {}
+    for child in element:
+        name = _local_name(child.tag)
+        if name == 'link' and child.get('href'):
+            # Atom links carry the URL in href; prefer rel="alternate" (the default)
+            if child.get('rel', 'alternate') == 'alternate' or 'link' not in children:
+                children['link'] = child.get('href')
+            continue
+        text = (child.text or '').strip()
+        if text and name not in children:
+            children[name] = text
+    item = {}
+    for field, names in ITEM_FIELDS.items():
+        item[field] = next((children[name] for name in names if name in children), '')
+    return item
+
+
+class FeedParser:
+    """Incremental RSS/Atom parser: feed it byte chunks and collect items as they complete."""
+
+    def __init__(self):
+        self._parser = ET.XMLPullParser(events=('start', 'end'))
+        self._depth = 0
+        self._item_depth = None
+        self.title = ''
+
+    def feed(self, chunk: bytes) -> Iterator[Dict[str, str]]:
+        """Parse a chunk and yield every item that it completes."""
+        self._parser.feed(chunk)
+        for event, element in self._parser.read_events():
+            name = _local_name(element.tag)
+            if event == 'start':
+                self._depth += 1
+                if name in ('item', 'entry') and self._item_depth is None:
+                    self._item_depth = self._depth
+                continue
+            if self._item_depth is not None and self._depth == self._item_depth:
+                self._item_depth = None
+                yield _element_item(element)
+                element.clear()
+            elif self._item_depth is None and name == 'title' and not self.title:
+                # The channel's (RSS) or feed's (Atom) own title comes before its items
+                self.title = (element.text or '').strip()
+            self._depth -= 1
+
+    def close(self) -> None:
+        self._parser.close()
+
+
+class FeedFetcher:
+    """Downloads RSS/Atom feeds with conditional GETs and early-exit parsing.
+
+    Used by the background feed ingester. A feed is sent its last ETag and
+    Last-Modified, so an unchanged feed costs a 304. A changed feed is
+    streamed through an incremental XML parser, which can stop (and drop
+    the connection) once it has enough matching items; documents it cannot
+    parse are handed to feedparser whole.
+    """
+
+    def __init__(self, client: HttpClient = None):
+        self.client = client or get_http_client()
+        self._lock = threading.Lock()
+        self.stats = {'fetched': 0, 'not_modified': 0, 'errors': 0}
+
+    def download(self, url: str, previous: Optional[Dict] = None, terms: List[str] = None, limit: int = 5,
+                 deadline: float = None) -> Dict:
+        """Fetch and parse one feed into {etag, last_modified, title, items, complete}.
+
+        previous (an earlier complete result) supplies the validators; if the
+        server answers 304 it is returned as is. With terms, reading stops
+        after limit matching items; without, after FEED_SCAN_LIMIT items.
+        """
+        headers = {}
+        if previous and previous.get('complete'):
+            if previous.get('etag'):
+                headers['If-None-Match'] = previous['etag']
+            if previous.get('last_modified'):
+                headers['If-Modified-Since'] = previous['last_modified']
+
+        try:
+            with self.client.get('rss', url, headers=headers, deadline=deadline, stream=True) as response:
+                if response.status_code == 304 and previous:
+                    with self._lock:
+                        self.stats['not_modified'] += 1
+                    return previous
+                response.raise_for_status()
+                title, scanned, complete = self._parse(response, terms, limit, deadline)
+        except Exception:
+            with self._lock:
+                self.stats['errors'] += 1
+            raise
+
+        with self._lock:
+            self.stats['fetched'] += 1
+        return {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'title': title,
+            'items': scanned,
+            'complete': complete,
+        }
+
+    def _parse(self, response: requests.Response, terms: List[str], limit: int,
+               deadline: Optional[float]):
+        """Stream the body into the parser; returns (feed title, items read, whether the scan was complete)."""
+        parser = FeedParser()
+        body = []
+        scanned = []
+        matched = 0
+        exhausted = False
+        try:
+            for chunk in response.iter_content(CHUNK_SIZE):
+                body.append(chunk)
+                for item in parser.feed(chunk):
+                    scanned.append(item)
+                    if len(scanned) >= FEED_SCAN_LIMIT:
+                        return parser.title, scanned, True
+                    if not terms:
+                        continue
+                    matched += item_relevance(item, terms) > 0
+                    if matched >= limit:
+                        return parser.title, scanned, False
+                if deadline is not None and time.monotonic() >= deadline:
+                    return parser.title, scanned, False
+            exhausted = True
+            # A truncated document (missing closing tags) only fails here
+            parser.close()
+        except ET.ParseError:
+            # Not well-formed XML (stray entities, HTML in the body, ...): let feedparser cope with it
+            if not exhausted:
+                body.extend(response.iter_content(CHUNK_SIZE))
+            feed = feedparser.parse(b''.join(body))
+            scanned = [{
+                'title': entry.get('title', ''),
+                'description': entry.get('summary', ''),
+                'link': entry.get('link', ''),
+                'published': entry.get('published', ''),
+            } for entry in feed.entries[:FEED_SCAN_LIMIT]]
+            return feed.feed.get('title', ''), scanned, True
+        return parser.title, scanned, True
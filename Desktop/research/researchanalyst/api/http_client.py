@@ -0,0 +1,194 @@
+import json
+import os
+import random
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# The http_client section of this file configures pools, retries and timeouts
+CONFIG_PATH = os.path.join('data', 'source_config.json')
+
+DEFAULT_CONFIG = {
+    'user_agent': 'ResearchAnalyst/1.0',
+    # Hosts that keep a pool, and keep-alive connections per host
+    'pool_connections': 10,
+    'pool_maxsize': 10,
+    # Retries after the first attempt, for GET/HEAD on connection errors and RETRY_STATUSES
+    'max_retries': 2,
+    # Backoff before retry n is uniform in [0, backoff_factor * 2**n], capped at max_backoff
+    'backoff_factor': 0.5,
+    'max_backoff': 5.0,
+    # Seconds per request for each provider
+    'timeouts': {'default': 10},
+    # Per-host overrides, e.g. {"newsapi.org": {"pool_maxsize": 4}}
+    'hosts': {},
+}
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+RETRY_METHODS = {'GET', 'HEAD'}
+
+
+def load_http_config(path: str = CONFIG_PATH) -> Dict:
+    """DEFAULT_CONFIG overlaid with the http_client section of the source config."""
+    config = dict(DEFAULT_CONFIG)
+    try:
+        with open(path, 'r') as f:
+            config.update(json.load(f).get('http_client', {}))
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"Error loading HTTP client config: {str(e)}")
+    return config
+
+
+class HttpClient:
+    """Shared outbound HTTP layer: one keep-alive session with per-host connection pools.
+
+    Every provider (NewsAPI, RSS, scraping) goes through request(), which
+    applies the provider's timeout (capped by an optional deadline) and
+    retries idempotent requests with jittered exponential backoff. Calls are
+    counted per provider, and stats() reports each host pool's utilisation.
+    """
+
+    def __init__(self, config: Dict = None):
+        self.config = config or load_http_config()
+        self.session = requests.Session()
+        self.session.headers['User-Agent'] = self.config['user_agent']
+        self._adapters: Dict[str, HTTPAdapter] = {}
+        default = self._adapter(self.config['pool_connections'], self.config['pool_maxsize'])
+        self.session.mount('https://', default)
+        self.session.mount('http://', default)
+        self._adapters['*'] = default
+        for host, options in self.config.get('hosts', {}).items():
+            adapter = self._adapter(2, options.get('pool_maxsize', self.config['pool_maxsize']))
+            self.session.mount(f'https://{host}', adapter)
+            self.session.mount(f'http://{host}', adapter)
+            self._adapters[host] = adapter
+        self._lock = threading.Lock()
+        self._providers: Dict[str, Dict] = {}
+
+    def timeout(self, provider: str, deadline: float = None) -> float:
+        """The provider's timeout, cut down to what is left before deadline (a time.monotonic() value)."""
+        timeouts = self.config.get('timeouts', {})
+        timeout = timeouts.get(provider, timeouts.get('default', 10))
+        if deadline is not None:
+            timeout = max(0.1, min(timeout, deadline - time.monotonic()))
+        return timeout
+
+    def request(self, provider: str, method: str, url: str, deadline: float = None,
+                retries: int = None, **kwargs) -> requests.Response:
+        """Send a request on the shared session, retrying GET/HEAD on transient failures.
+
+        The response of the last attempt is returned whatever its status;
+        the last connection error is raised once the retries are used up.
+        """
+        method = method.upper()
+        retries = self.config['max_retries'] if retries is None else retries
+        if method not in RETRY_METHODS:
+            retries = 0
+        timeout = kwargs.pop('timeout', None)
+        attempt = 0
+        while True:
+            started = time.monotonic()
+            try:
+                response = self.session.request(method, url, timeout=timeout or self.timeout(provider, deadline),
+                                                **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self._record(provider, started, error=True)
+                delay = self._backoff(attempt, None, deadline)
+                if attempt >= retries or delay is None:
+                    raise
+                print(f"Retrying {provider} request to {urlparse(url).netloc}: {str(e)}")
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt >= retries:
+                    self._record(provider, started, error=response.status_code >= 500)
+                    return response
+                self._record(provider, started, error=True)
+                delay = self._backoff(attempt, response.headers.get('Retry-After'), deadline)
+                if delay is None:
+                    # No time left to wait for another attempt
+                    return response
+                response.close()
+            time.sleep(delay)
+            attempt += 1
+            with self._lock:
+                self._provider(provider)['retries'] += 1
+
+    def get(self, provider: str, url: str, **kwargs) -> requests.Response:
+        return self.request(provider, 'GET', url, **kwargs)
+
+    def record(self, provider: str, latency_ms: float, error: bool = False) -> None:
+        """Count a call made outside request() (e.g. by the OpenAI client's own pool)."""
+        with self._lock:
+            stats = self._provider(provider)
+            stats['requests'] += 1
+            stats['errors'] += error
+            stats['total_ms'] += latency_ms
+            stats['max_ms'] = max(stats['max_ms'], latency_ms)
+
+    def stats(self) -> Dict:
+        """Per-provider request counts and latency, and per-host pool utilisation."""
+        with self._lock:
+            providers = {name: dict(stats, total_ms=round(stats['total_ms'], 1), max_ms=round(stats['max_ms'], 1),
+                                    avg_ms=round(stats['total_ms'] / stats['requests'], 1) if stats['requests'] else None)
+                         for name, stats in self._providers.items()}
+        pools = {}
+        for adapter in self._adapters.values():
+            manager = adapter.poolmanager
+            for key in manager.pools.keys():
+                pool = manager.pools.get(key)
+                if pool is None or pool.pool is None:
+                    continue
+                # The queue holds idle connections plus None for each slot not yet connected
+                idle = sum(1 for conn in list(pool.pool.queue) if conn is not None)
+                pools[f'{pool.scheme}://{pool.host}:{pool.port}'] = {
+                    'maxsize': pool.pool.maxsize,
+                    'in_use': pool.pool.maxsize - pool.pool.qsize(),
+                    'idle': idle,
+                    'connections_opened': pool.num_connections,
+                    'requests': pool.num_requests,
+                }
+        return {'providers': providers, 'pools': pools}
+
+    def _adapter(self, pool_connections: int, pool_maxsize: int) -> HTTPAdapter:
+        # Retries are done in request(), where the backoff is jittered and bounded by the deadline
+        return HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=0)
+
+    def _backoff(self, attempt: int, retry_after: Optional[str], deadline: Optional[float]) -> Optional[float]:
+        """Seconds to wait before the next attempt, or None if that would run past the deadline."""
+        delay = random.uniform(0, self.config['backoff_factor'] * 2 ** attempt)
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, float(retry_after))
+        delay = min(delay, self.config['max_backoff'])
+        if deadline is not None and time.monotonic() + delay >= deadline:
+            return None
+        return delay
+
+    def _provider(self, provider: str) -> Dict:
+        return self._providers.setdefault(provider, {'requests': 0, 'retries': 0, 'errors': 0,
+                                                     'total_ms': 0.0, 'max_ms': 0.0})
+
+    def _record(self, provider: str, started: float, error: bool) -> None:
+        self.record(provider, (time.monotonic() - started) * 1000, error)
+
+
+_client: Optional[HttpClient] = None
+_client_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """Process-wide HttpClient, so every caller shares the same keep-alive pools."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
+
+
+def http_client_stats() -> Dict:
+    """stats() of the shared client, without creating one."""
+    return _client.stats() if _client is not None else {}
@@ -1,12 +1,51 @@
 import openai
+import httpx  # installed with openai, which sends its requests through it
 import os
 import json
+import threading
+import time
 from datetime import datetime
 import re
 
+from api.http_client import get_http_client
+
 USAGE_FILE = "openai_usage.json"
 DAILY_LIMIT_USD = 5.0
 COST_PER_1K_TOKENS = 0.03  # adjust for your model/plan
+OPENAI_HOST = "api.openai.com"
+
+# One client per API key, so its keep-alive connections are reused across calls
+_openai_clients = {}
+_openai_lock = threading.Lock()
+
+def get_openai_client(api_key):
+    """Shared OpenAI client with pool size, retries and timeout from the http_client config."""
+    with _openai_lock:
+        client = _openai_clients.get(api_key)
+        if client is None:
+            http = get_http_client()
+            pool_size = http.config.get('hosts', {}).get(OPENAI_HOST, {}).get('pool_maxsize', http.config['pool_maxsize'])
+            limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+            client = openai.OpenAI(
+                api_key=api_key,
+                max_retries=http.config['max_retries'],
+                timeout=http.timeout('openai'),
+                http_client=httpx.Client(limits=limits, timeout=http.timeout('openai'))
+            )
+            _openai_clients[api_key] = client
+        return client
+
+def create_chat_completion(client, **kwargs):
+    """client.chat.completions.create, with its latency counted under the openai provider."""
+    started = time.monotonic()
+    error = False
+    try:
+        return client.chat.completions.create(**kwargs)
+    except Exception:
+        error = True
+        raise
+    finally:
+        get_http_client().record('openai', (time.monotonic() - started) * 1000, error)
 
 def get_today():
     return datetime.now().strftime("%Y-%m-%d")
@@ -262,8 +301,9 @@ def generate_llm_deliverable(task, sources):
         check_and_update_usage(int(estimated_tokens))
         
         # Generate content with OpenAI
-        client = openai.OpenAI(api_key=api_key)
-        response = client.chat.completions.create(
+        client = get_openai_client(api_key)
+        response = create_chat_completion(
+            client,
             model="gpt-4",
             messages=[
                 {
@@ -299,7 +339,8 @@ Focus on:
 3. Ensuring all objectives are covered: {', '.join(task.get('objectives', []))}
 """
             
-            improvement_response = client.chat.completions.create(
+            improvement_response = create_chat_completion(
+                client,
                 model="gpt-4",
                 messages=[
                     {
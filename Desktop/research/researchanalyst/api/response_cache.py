@@ -0,0 +1,250 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+from storage.json_backend import DATA_DIR
+
+# The response_cache section of this file sets the size bound and TTLs
+CONFIG_PATH = os.path.join(DATA_DIR, 'source_config.json')
+CACHE_PATH = os.path.join(DATA_DIR, '.response_cache.db')
+
+DEFAULT_CONFIG = {
+    # Least recently used responses are evicted above this many bytes
+    'max_bytes': 50 * 1024 * 1024,
+    # Seconds a response is fresh, per provider ('default' for the rest)
+    'ttl': {'default': 900},
+    # Per source type; takes precedence over the provider's ttl
+    'source_type_ttl': {},
+    # Seconds past expiry a response may still be served while it is refreshed in the background
+    'stale_ttl': 86400,
+}
+
+# Query parameters that do not change the response (credentials)
+IGNORED_PARAMS = {'apikey', 'api_key', 'key', 'token'}
+# Background refreshes running at once
+REFRESH_WORKERS = 2
+# Only record a hit's access time if the stored one is older than this, to keep reads cheap
+ACCESS_RESOLUTION = 60
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    provider TEXT NOT NULL,
+    body TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    fetched_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    stale_until REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses(accessed_at);
+"""
+
+
+class CachedResponse(NamedTuple):
+    value: Any
+    expires_at: float
+    stale_until: float
+    accessed_at: float
+
+
+def load_cache_config(path: str = CONFIG_PATH) -> Dict:
+    """DEFAULT_CONFIG overlaid with the response_cache section of the source config."""
+    config = dict(DEFAULT_CONFIG)
+    try:
+        with open(path, 'r') as f:
+            config.update(json.load(f).get('response_cache', {}))
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"Error loading response cache config: {str(e)}")
+    return config
+
+
+def normalize_query(query: Any) -> Any:
+    """Canonical form of a query: keys sorted, credentials dropped, text lowercased and
+    whitespace-collapsed, lists of terms deduplicated and sorted."""
+    if isinstance(query, dict):
+        return {str(k): normalize_query(v) for k, v in sorted(query.items()) if str(k).lower() not in IGNORED_PARAMS}
+    if isinstance(query, (list, tuple, set)):
+        items = [normalize_query(item) for item in query]
+        if all(isinstance(item, str) for item in items):
+            return sorted(set(items))
+        return items
+    if isinstance(query, str):
+        return ' '.join(query.lower().split())
+    return query
+
+
+def cache_key(provider: str, query: Any) -> str:
+    body = json.dumps([provider, normalize_query(query)], sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(body.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """On-disk TTL cache for external source responses, keyed by provider + normalized query.
+
+    Responses live in a WAL-journaled SQLite database shared by all worker
+    processes. A fresh hit is returned as is; a stale one (expired, but
+    within stale_ttl) is returned at once while a background thread fetches
+    a replacement. The database is kept under max_bytes by evicting the
+    least recently used responses.
+    """
+
+    def __init__(self, path: str = CACHE_PATH, config: Dict = None):
+        self.path = path
+        self.config = config or load_cache_config()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._pool = ThreadPoolExecutor(max_workers=REFRESH_WORKERS, thread_name_prefix='cache-refresh')
+        self.stats = {'hits': 0, 'stale_hits': 0, 'misses': 0, 'refreshes': 0, 'refresh_errors': 0, 'evictions': 0}
+
+    def ttl(self, provider: str, source_type: str = None) -> float:
+        """Freshness lifetime for a provider's responses, or for a source type if one is configured."""
+        by_type = self.config.get('source_type_ttl', {})
+        if source_type in by_type:
+            return by_type[source_type]
+        ttls = self.config.get('ttl', {})
+        return ttls.get(provider, ttls.get('default', DEFAULT_CONFIG['ttl']['default']))
+
+    def get(self, provider: str, query: Any) -> Optional[CachedResponse]:
+        """The stored response, however old, or None."""
+        row = self._conn().execute(
+            'SELECT body, expires_at, stale_until, accessed_at FROM responses WHERE key = ?',
+            (cache_key(provider, query),)).fetchone()
+        if row is None:
+            return None
+        return CachedResponse(json.loads(row[0]), row[1], row[2], row[3])
+
+    def put(self, provider: str, query: Any, value: Any, source_type: str = None) -> None:
+        body = json.dumps(value)
+        now = time.time()
+        expires_at = now + self.ttl(provider, source_type)
+        conn = self._conn()
+        conn.execute(
+            'INSERT OR REPLACE INTO responses (key, provider, body, size, fetched_at, expires_at, stale_until, accessed_at) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            (cache_key(provider, query), provider, body, len(body), now, expires_at,
+             expires_at + self.config['stale_ttl'], now))
+        self._evict(conn)
+
+    def get_or_fetch(self, provider: str, query: Any, fetch: Callable[[Any, Optional[float]], Any],
+                     source_type: str = None, deadline: float = None,
+                     accept: Callable[[Any], bool] = None) -> Any:
+        """Return the cached response for query, calling fetch(previous, deadline) when needed.
+
+        previous is the stored value (possibly expired) or None, so fetch can
+        revalidate it, e.g. with a conditional GET. A stale value is returned
+        immediately and refreshed in the background (with no deadline). A
+        value rejected by accept is treated as missing. If fetch fails, a
+        value still within its stale window is served instead.
+        """
+        key = cache_key(provider, query)
+        cached = self.get(provider, query)
+        now = time.time()
+        usable = cached is not None and (accept is None or accept(cached.value))
+        if usable and now < cached.expires_at:
+            self._count('hits')
+            self._touch(key, cached, now)
+            return cached.value
+        if usable and now < cached.stale_until:
+            self._count('stale_hits')
+            self._touch(key, cached, now)
+            self._refresh(key, provider, query, fetch, source_type, cached.value)
+            return cached.value
+
+        self._count('misses')
+        try:
+            value = fetch(cached.value if cached else None, deadline)
+        except Exception:
+            if cached is not None and now < cached.stale_until:
+                print(f"Error refreshing {provider} response; serving the cached copy")
+                return cached.value
+            raise
+        self.put(provider, query, value, source_type)
+        return value
+
+    def cache_stats(self) -> Dict:
+        row = self._conn().execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses').fetchone()
+        with self._lock:
+            return dict(self.stats, entries=row[0], bytes=row[1], max_bytes=self.config['max_bytes'])
+
+    def _refresh(self, key: str, provider: str, query: Any, fetch: Callable, source_type: Optional[str],
+                 previous: Any) -> None:
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                self.put(provider, query, fetch(previous, None), source_type)
+                self._count('refreshes')
+            except Exception as e:
+                self._count('refresh_errors')
+                print(f"Error refreshing cached {provider} response: {str(e)}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        self._pool.submit(refresh)
+
+    def _touch(self, key: str, cached: CachedResponse, now: float) -> None:
+        if now - cached.accessed_at >= ACCESS_RESOLUTION:
+            self._conn().execute('UPDATE responses SET accessed_at = ? WHERE key = ?', (now, key))
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """Drop dead responses, then the least recently used ones until under max_bytes."""
+        conn.execute('DELETE FROM responses WHERE stale_until < ?', (time.time(),))
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        excess = total - self.config['max_bytes']
+        if excess <= 0:
+            return
+        victims = []
+        for key, size in conn.execute('SELECT key, size FROM responses ORDER BY accessed_at'):
+            if excess <= 0:
+                break
+            victims.append((key,))
+            excess -= size
+        conn.executemany('DELETE FROM responses WHERE key = ?', victims)
+        with self._lock:
+            self.stats['evictions'] += len(victims)
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.stats[name] += 1
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+        return conn
+
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """Process-wide ResponseCache at CACHE_PATH."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache()
+        return _cache
+
+
+def response_cache_stats() -> Dict:
+    """cache_stats() of the shared cache, without creating one."""
+    return _cache.cache_stats() if _cache is not None else {}
@@ -1,16 +1,24 @@
-from flask import Flask, render_template, request, jsonify, redirect, url_for
+from flask import Flask, render_template, request, jsonify, redirect, url_for, make_response
+import hashlib
 import json
 import os
 from datetime import datetime, timedelta
 import uuid
 import traceback
 
+from storage import VersionConflict, VersionedCollection, get_blob_store, get_repository, get_store, thaw
+from search import FACET_FIELDS, get_search_index
+from search.suggest import DEFAULT_SUGGESTIONS, MAX_SUGGESTIONS
+from storage.paging import HEAVY_FIELDS, MAX_PAGE_SIZE, encode_cursor, page_envelope, parse_page_query, wants_page
+
 # Import with error handling for serverless compatibility
 try:
-    from source_matcher import assign_sources_to_task, match_sources_to_task
+    from source_matcher import assign_sources_to_task, match_sources_to_task, suggest_sources, suggestion_cache_stats
 except ImportError:
     def assign_sources_to_task(task, sources): return []
     def match_sources_to_task(task, sources, top_n=5): return []
+    def suggest_sources(task, top_n=5): return []
+    def suggestion_cache_stats(): return {}
 
 try:
     from task_router import create_task
@@ -31,10 +39,25 @@ try:
 except ImportError:
     class DeliverableEngine:
         def aggregate_sources(self, task, sources): return []
+        def aggregate_sources_with_report(self, task, sources): return [], {}
+        def provider_stats(self): return {}
         def generate_deliverable(self, task, sources, format_type): return {}
         def detect_format(self, task, format_type): return {}
         def render_template(self, deliverable, task, sources): return ""
 
+try:
+    from api.http_client import http_client_stats
+    from api.response_cache import response_cache_stats
+except ImportError:
+    def http_client_stats(): return {}
+    def response_cache_stats(): return {}
+
+try:
+    from api.feed_ingester import feed_ingester_stats, start_feed_ingester
+except ImportError:
+    def feed_ingester_stats(): return []
+    def start_feed_ingester(): return None
+
 try:
     from task_validator import TaskValidator, validate_and_fix_tasks
 except ImportError:
@@ -57,35 +80,136 @@ app.secret_key = 'research-analyst-secret-key-2025'
 deliverable_generator = DeliverableGenerator()
 deliverable_engine = DeliverableEngine()
 task_validator = TaskValidator()
+# RSS feeds are polled in a background thread; FEED_INGESTER=off when `python -m api.feed_ingester` runs instead
+if os.getenv('FEED_INGESTER', 'thread') == 'thread':
+    start_feed_ingester()
+
+# Collection store (JSON files or SQLite, see STORAGE_BACKEND) with a read-only view cache
+store = get_store()
+# Id-indexed lookups over the store, rebuilt once per data version
+repository = get_repository()
+blobs = get_blob_store()
+# One deliverable per task, with a delta-compressed version history
+deliverable_store = VersionedCollection(store, repository, blobs)
+search_index = get_search_index()
+SEARCH_RESULT_LIMIT = 50
+SEARCH_FACETS = [facet for fields in FACET_FIELDS.values() for facet in fields]
 
 # Load data from JSON files with better error handling
-def load_data(filename):
+def load_data(filename, writable=False):
+    """Load a collection from the data cache.
+
+    Returns a shared read-only view by default. Routes that modify the data
+    and hand it back to save_data() must pass writable=True to get a private copy.
+    """
     try:
-        with open(f'data/{filename}.json', 'r') as f:
-            return json.load(f)
+        return store.load(filename, writable=writable)
     except (FileNotFoundError, json.JSONDecodeError, Exception) as e:
         print(f"Error loading {filename}: {str(e)}")
         return []
 
 def save_data(filename, data):
     try:
-        os.makedirs('data', exist_ok=True)
-        with open(f'data/{filename}.json', 'w') as f:
-            json.dump(data, f, indent=2)
+        store.save(filename, data)
+    except Exception as e:
+        print(f"Error saving {filename}: {str(e)}")
+
+def upsert_data(filename, record, key='id'):
+    """Write a single record, replacing the first one with the same key."""
+    try:
+        store.upsert(filename, record, key)
     except Exception as e:
         print(f"Error saving {filename}: {str(e)}")
 
+def insert_data(filename, record):
+    """Append a single record to a collection."""
+    try:
+        store.insert(filename, record)
+    except Exception as e:
+        print(f"Error saving {filename}: {str(e)}")
+
+def find_data(filename, field, value):
+    """Return read-only records whose field matches value, using storage indexes where available."""
+    try:
+        return store.find(filename, field, value)
+    except Exception as e:
+        print(f"Error loading {filename}: {str(e)}")
+        return []
+
+def deliverable_with_content(deliverable):
+    """Return the deliverable with its content read back from the blob store."""
+    try:
+        return blobs.with_content(deliverable)
+    except Exception as e:
+        print(f"Error loading deliverable content: {str(e)}")
+        return dict(deliverable, content='')
+
 def calculate_task_quality_scores(tasks):
-    """Calculate quality scores for all tasks and add them to the task data."""
+    """Return copies of the tasks with a quality_score field added."""
     try:
-        for task in tasks:
-            quality_score = task_validator.get_task_quality_score(task)
-            task['quality_score'] = round(quality_score, 1)
-        return tasks
+        return [dict(task, quality_score=round(task_validator.get_task_quality_score(task), 1))
+                for task in tasks]
     except Exception as e:
         print(f"Error calculating quality scores: {str(e)}")
         return tasks
 
+def conditional_response(names, build):
+    """Serve build() with a strong ETag over the named collections' versions.
+
+    The ETag is derived from the request path and each collection's version,
+    which comes from the backend's change stamp (a stat or a counter lookup)
+    and takes no exclusive lock, so a client whose If-None-Match still matches
+    gets 304 Not Modified without the data being loaded or serialized.
+    """
+    versions = []
+    for name in names:
+        try:
+            version = store.version(name)
+        except FileNotFoundError:
+            # No collection file yet: build() serves it as empty, without an ETag
+            version = None
+        if version is None:
+            return build()
+        versions.append((name, version))
+    etag = hashlib.sha1('|'.join(
+        [request.full_path] + [f"{name}:{version}:{tag}" for name, (version, tag) in versions]
+    ).encode('utf-8')).hexdigest()
+    data_version = ','.join(f"{name}={version}" for name, (version, _) in versions)
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+    else:
+        response = make_response(build())
+        if response.status_code != 200:
+            return response
+    response.set_etag(etag)
+    response.headers['X-Data-Version'] = data_version
+    return response
+
+def list_page(name, decorate=None):
+    """Serve one page of a collection for the list APIs.
+
+    Without any paging/filter parameters the legacy bare array is returned.
+    Otherwise filters run against the repository indexes, only the page is
+    decorated (e.g. quality scores) and projected, and the response is
+    {items, next_cursor, count}.
+    """
+    if not wants_page(request.args):
+        records = load_data(name)
+        return jsonify(decorate(records) if decorate else records)
+    try:
+        query = parse_page_query(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    try:
+        items, last = repository.page(name, query.filters, query.after, query.limit, query.matches)
+    except FileNotFoundError as e:
+        print(f"Error loading {name}: {str(e)}")
+        items, last = [], None
+    if decorate and query.wants('quality_score'):
+        items = decorate(items)
+    next_cursor = encode_cursor(*last) if last is not None else None
+    return jsonify(page_envelope((query.project(item) for item in items), next_cursor))
+
 # Health check route for debugging
 @app.route('/health')
 def health_check():
@@ -98,7 +222,12 @@ def health_check():
                 'sources': len(load_data('sources')),
                 'workflows': len(load_data('workflows')),
                 'deliverables': len(load_data('deliverables'))
-            }
+            },
+            'suggestion_cache': suggestion_cache_stats(),
+            'source_providers': deliverable_engine.provider_stats(),
+            'http_client': http_client_stats(),
+            'response_cache': response_cache_stats(),
+            'feed_ingester': feed_ingester_stats()
         })
     except Exception as e:
         return jsonify({
@@ -196,88 +325,114 @@ def search():
     query = request.args.get('q', '')
     category = request.args.get('category', '')
     status = request.args.get('status', '')
+    filters = search_filters(request.args)
     
-    tasks = load_data('tasks')
-    sources = load_data('sources')
-    deliverables = load_data('deliverables')
-    
-    # Calculate quality scores for tasks
-    tasks = calculate_task_quality_scores(tasks)
-    
-    # Filter results
+    # Rank matches from the full-text index; quality scores only for the tasks shown
     results = []
+    facets = {}
+    corrections = {}
+    total = 0
     if query:
-        for task in tasks:
-            if query.lower() in task.get('title', '').lower() or query.lower() in task.get('description', '').lower():
-                results.append({'type': 'task', 'data': task})
-        
-        for source in sources:
-            if query.lower() in source.get('title', '').lower() or query.lower() in source.get('description', '').lower():
-                results.append({'type': 'source', 'data': source})
-        
-        for deliverable in deliverables:
-            if query.lower() in deliverable.get('title', '').lower() or query.lower() in deliverable.get('description', '').lower():
-                results.append({'type': 'deliverable', 'data': deliverable})
-    
-    return render_template('search.html', results=results, query=query, category=category, status=status)
+        found = search_index.query(query, limit=SEARCH_RESULT_LIMIT, filters=filters)
+        facets, total, corrections = found['facets'], found['total'], found['corrections']
+        for hit in found['hits']:
+            record = repository.get(hit['collection'], hit['id'])
+            if record is None:
+                continue
+            if hit['type'] == 'task':
+                record = calculate_task_quality_scores([record])[0]
+            results.append({'type': hit['type'], 'data': record, 'score': hit['score']})
+    
+    return render_template('search.html', results=results, query=query, category=category, status=status,
+                           filters=filters, facets=facets, total=total, corrections=corrections)
+
+def search_filters(args):
+    """Facet filters from request args: {facet: [values]}, ignoring blank values."""
+    filters = {}
+    for facet in SEARCH_FACETS:
+        values = [value for value in args.getlist(facet) if value]
+        if values:
+            filters[facet] = values
+    return filters
+
+@app.route('/api/search')
+def api_search():
+    """JSON search with facet filters and per-facet counts for the query's matches."""
+    query = request.args.get('q', '')
+    try:
+        limit = min(max(int(request.args.get('limit', SEARCH_RESULT_LIMIT)), 1), MAX_PAGE_SIZE)
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+    filters = search_filters(request.args)
+    types = request.args.getlist('type') or None
+    
+    def build():
+        found = search_index.query(query, limit=limit, filters=filters, types=types)
+        results = []
+        for hit in found['hits']:
+            record = repository.get(hit['collection'], hit['id'])
+            if record is not None:
+                results.append(dict(hit, data={k: v for k, v in record.items() if k not in HEAVY_FIELDS}))
+        return jsonify({'query': query, 'total': found['total'], 'results': results, 'facets': found['facets'],
+                        'corrections': found['corrections']})
+    
+    return conditional_response(['tasks', 'sources', 'deliverables'], build)
+
+@app.route('/api/search/suggest')
+def api_search_suggest():
+    """Autocomplete for the search bar from task/source titles, tags and stakeholders."""
+    prefix = request.args.get('prefix', '')
+    try:
+        limit = min(max(int(request.args.get('limit', DEFAULT_SUGGESTIONS)), 1), MAX_SUGGESTIONS)
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+    return conditional_response(['tasks', 'sources'],
+                                lambda: jsonify({'prefix': prefix, 'suggestions': search_index.suggest(prefix, limit)}))
 
 # Duty pages routes
 @app.route('/corporate_strategy')
 def corporate_strategy():
-    tasks = [t for t in load_data('tasks') if t.get('category') == 'Corporate Strategy']
+    tasks = find_data('tasks', 'category', 'Corporate Strategy')
     tasks = calculate_task_quality_scores(tasks)
     return render_template('corporate_strategy.html', tasks=tasks)
 
 @app.route('/research_support')
 def research_support():
-    tasks = [t for t in load_data('tasks') if t.get('category') == 'Research Support']
+    tasks = find_data('tasks', 'category', 'Research Support')
     tasks = calculate_task_quality_scores(tasks)
     return render_template('research_support.html', tasks=tasks)
 
 @app.route('/content_curation')
 def content_curation():
-    tasks = [t for t in load_data('tasks') if t.get('category') == 'Content Curation']
+    tasks = find_data('tasks', 'category', 'Content Curation')
     tasks = calculate_task_quality_scores(tasks)
     return render_template('content_curation.html', tasks=tasks)
 
 @app.route('/communications')
 def communications():
-    tasks = [t for t in load_data('tasks') if t.get('category') == 'Communications']
+    tasks = find_data('tasks', 'category', 'Communications')
     tasks = calculate_task_quality_scores(tasks)
     return render_template('communications.html', tasks=tasks)
 
 # NEW: Deliverable editor route
 @app.route('/edit/<task_id>')
 def edit_deliverable(task_id):
-    tasks = load_data('tasks')
-    sources = load_data('sources')
-    deliverables = load_data('deliverables')
-    
     # Find the task
-    task = None
-    for t in tasks:
-        if t.get('id') == task_id:
-            task = t
-            break
+    task = repository.get('tasks', task_id)
     
     if not task:
         return "Task not found", 404
     
     # Calculate quality score for the task
-    task['quality_score'] = round(task_validator.get_task_quality_score(task), 1)
+    task = dict(task, quality_score=round(task_validator.get_task_quality_score(task), 1))
     
     # Find existing deliverable for this task
-    deliverable = None
-    for d in deliverables:
-        if d.get('task_id') == task_id:
-            deliverable = d
-            break
+    deliverable = repository.first('deliverables', 'task_id', task_id)
+    if deliverable:
+        deliverable = deliverable_with_content(deliverable)
     
     # Get sources for this task
-    task_sources = []
-    for source in sources:
-        if source.get('id') in task.get('sources', []):
-            task_sources.append(source)
+    task_sources = repository.get_many('sources', task.get('sources', []))
     
     # Detect format
     detected_format = deliverable_generator.detect_format(task)
@@ -310,10 +465,8 @@ def generate_content():
 @app.route('/api/tasks', methods=['GET', 'POST', 'PUT', 'DELETE'])
 def api_tasks():
     if request.method == 'GET':
-        tasks = load_data('tasks')
-        # Calculate quality scores for API responses
-        tasks = calculate_task_quality_scores(tasks)
-        return jsonify(tasks)
+        # Calculate quality scores for API responses (only for the page served)
+        return conditional_response(['tasks'], lambda: list_page('tasks', calculate_task_quality_scores))
     
     elif request.method == 'POST':
         try:
@@ -340,27 +493,33 @@ def api_tasks():
     
     elif request.method == 'PUT':
         data = request.json
-        tasks = load_data('tasks')
-        task_id = data.get('id')
+        task = repository.get('tasks', data.get('id'))
         
-        for task in tasks:
-            if task.get('id') == task_id:
-                task.update(data)
-                task['last_updated'] = datetime.now().isoformat()
-                save_data('tasks', tasks)
-                return jsonify(task)
+        if task:
+            task = thaw(task)
+            task.update(data)
+            task['last_updated'] = datetime.now().isoformat()
+            upsert_data('tasks', task)
+            return jsonify(task)
         
         return jsonify({'error': 'Task not found'}), 404
 
+@app.route('/api/tasks/<task_id>', methods=['GET'])
+def api_task_detail(task_id):
+    def build():
+        task = repository.get('tasks', task_id)
+        if not task:
+            return jsonify({'error': 'Task not found'}), 404
+        return jsonify(calculate_task_quality_scores([task])[0])
+    return conditional_response(['tasks'], build)
+
 @app.route('/api/sources', methods=['GET', 'POST'])
 def api_sources():
     if request.method == 'GET':
-        sources = load_data('sources')
-        return jsonify(sources)
+        return conditional_response(['sources'], lambda: list_page('sources'))
     
     elif request.method == 'POST':
         data = request.json
-        sources = load_data('sources')
         new_source = {
             'id': f"source-{str(uuid.uuid4())[:8]}",
             'title': data.get('title'),
@@ -373,19 +532,25 @@ def api_sources():
             'relevance_score': data.get('relevance_score', 0.0),
             'assigned_tasks': data.get('assigned_tasks', [])
         }
-        sources.append(new_source)
-        save_data('sources', sources)
+        insert_data('sources', new_source)
         return jsonify(new_source)
 
+@app.route('/api/sources/<source_id>', methods=['GET'])
+def api_source_detail(source_id):
+    def build():
+        source = repository.get('sources', source_id)
+        if not source:
+            return jsonify({'error': 'Source not found'}), 404
+        return jsonify(source)
+    return conditional_response(['sources'], build)
+
 @app.route('/api/deliverables', methods=['GET', 'POST'])
 def api_deliverables():
     if request.method == 'GET':
-        deliverables = load_data('deliverables')
-        return jsonify(deliverables)
+        return conditional_response(['deliverables'], lambda: list_page('deliverables'))
     
     elif request.method == 'POST':
         data = request.json
-        deliverables = load_data('deliverables')
         new_deliverable = {
             'id': f"deliverable-{str(uuid.uuid4())[:8]}",
             'title': data.get('title'),
@@ -396,8 +561,9 @@ def api_deliverables():
             'created_at': datetime.now().isoformat(),
             'last_updated': datetime.now().isoformat()
         }
-        deliverables.append(new_deliverable)
-        save_data('deliverables', deliverables)
+        if new_deliverable['task_id']:
+            return jsonify(deliverable_store.save(new_deliverable))
+        insert_data('deliverables', blobs.externalize(new_deliverable))
         return jsonify(new_deliverable)
 
 # NEW: Deliverable generation API
@@ -409,15 +575,10 @@ def generate_deliverable():
     use_enhanced_engine = data.get('use_enhanced_engine', True)
     use_llm = data.get('use_llm', True)  # Default to LLM
     
-    tasks = load_data('tasks')
     sources = load_data('sources')
     
     # Find the task
-    task = None
-    for t in tasks:
-        if t.get('id') == task_id:
-            task = t
-            break
+    task = repository.get('tasks', task_id)
     
     if not task:
         return jsonify({'error': 'Task not found'}), 404
@@ -425,7 +586,7 @@ def generate_deliverable():
     try:
         if use_llm:
             # Find sources assigned to this task
-            task_sources = [s for s in sources if task_id in s.get('assigned_tasks', [])]
+            task_sources = repository.sources_for_task(task_id)
             # Generate deliverable using LLM
             content = generate_llm_deliverable(task, task_sources)
             deliverable = {
@@ -440,9 +601,7 @@ def generate_deliverable():
                 'sources_used': [s.get('id') for s in task_sources],
                 'output_formats': ['pdf', 'docx', 'html']
             }
-            deliverables = load_data('deliverables')
-            deliverables.append(deliverable)
-            save_data('deliverables', deliverables)
+            deliverable = deliverable_store.save(deliverable)
             return jsonify({
                 'deliverable': deliverable,
                 'content': content,
@@ -451,30 +610,30 @@ def generate_deliverable():
             })
         elif use_enhanced_engine:
             # Use the enhanced deliverable engine with external source aggregation
-            aggregated_sources = deliverable_engine.aggregate_sources(task, sources)
+            # aggregate_sources extends the list and scores the dicts in place; providers
+            # that miss the time budget are left out and listed in the report
+            aggregated_sources, aggregation_report = deliverable_engine.aggregate_sources_with_report(task, thaw(sources))
             deliverable = deliverable_engine.generate_deliverable(task, aggregated_sources, format_type)
             format_detection = deliverable_engine.detect_format(task, format_type)
             content = deliverable_engine.render_template(deliverable, task, aggregated_sources)
-            task['sources'] = [s.get('id') for s in aggregated_sources[:10]]
-            save_data('tasks', tasks)
+            task = dict(thaw(task), sources=[s.get('id') for s in aggregated_sources[:10]])
+            upsert_data('tasks', task)
         else:
             # Fallback to original deliverable generator
-            task_sources = []
-            for source in sources:
-                if source.get('id') in task.get('sources', []):
-                    task_sources.append(source)
+            task_sources = repository.get_many('sources', task.get('sources', []))
             deliverable = deliverable_generator.generate_deliverable(task, task_sources, format_type)
             content = deliverable_generator.render_template(deliverable, task, task_sources)
             format_detection = {'format': format_type or 'executive_brief', 'confidence': 0.8}
-        deliverables = load_data('deliverables')
-        deliverables.append(deliverable)
-        save_data('deliverables', deliverables)
-        return jsonify({
+        deliverable = deliverable_store.save(dict(deliverable, task_id=task.get('id')))
+        response = {
             'deliverable': deliverable,
             'content': content,
             'format_type': format_type,
             'generation_method': 'enhanced_engine' if use_enhanced_engine else 'basic_generator'
-        })
+        }
+        if use_enhanced_engine:
+            response['source_aggregation'] = aggregation_report
+        return jsonify(response)
     except Exception as e:
         return jsonify({'error': f'Error generating deliverable: {str(e)}'}), 500
 
@@ -486,24 +645,14 @@ def export_deliverable():
     content = data.get('content')
     format = data.get('format', 'markdown')
     
-    tasks = load_data('tasks')
-    sources = load_data('sources')
-    
     # Find the task
-    task = None
-    for t in tasks:
-        if t.get('id') == task_id:
-            task = t
-            break
+    task = repository.get('tasks', task_id)
     
     if not task:
         return jsonify({'error': 'Task not found'}), 404
     
     # Get sources for this task
-    task_sources = []
-    for source in sources:
-        if source.get('id') in task.get('sources', []):
-            task_sources.append(source)
+    task_sources = repository.get_many('sources', task.get('sources', []))
     
     # Create a temporary deliverable for export
     temp_deliverable = {
@@ -526,25 +675,29 @@ def export_deliverable():
     })
 
 # NEW: Update deliverable API
+@app.route('/api/deliverables/<task_id>', methods=['GET'])
+def get_deliverable(task_id):
+    def build():
+        deliverable = repository.first('deliverables', 'task_id', task_id)
+        if not deliverable:
+            return jsonify({'error': 'Deliverable not found'}), 404
+        return jsonify(deliverable_with_content(deliverable))
+    return conditional_response(['deliverables'], build)
+
 @app.route('/api/deliverables/<task_id>', methods=['PUT'])
 def update_deliverable(task_id):
     data = request.json
-    deliverables = load_data('deliverables')
     
     # Find existing deliverable
-    deliverable = None
-    for d in deliverables:
-        if d.get('task_id') == task_id:
-            deliverable = d
-            break
+    deliverable = repository.first('deliverables', 'task_id', task_id)
     
     if deliverable:
-        # Update existing deliverable
-        deliverable.update(data)
-        deliverable['last_updated'] = datetime.now().isoformat()
+        # Update existing deliverable (a new version is recorded if the content changed)
+        deliverable = deliverable_store.save(
+            dict(data, task_id=task_id, last_updated=datetime.now().isoformat()), merge=True)
     else:
         # Create new deliverable
-        deliverable = {
+        deliverable = deliverable_store.save({
             'id': f"deliverable-{str(uuid.uuid4())[:8]}",
             'task_id': task_id,
             'title': f"Deliverable for Task {task_id}",
@@ -552,12 +705,62 @@ def update_deliverable(task_id):
             'status': data.get('status', 'Draft'),
             'created_at': datetime.now().isoformat(),
             'last_updated': datetime.now().isoformat()
-        }
-        deliverables.append(deliverable)
+        })
     
-    save_data('deliverables', deliverables)
     return jsonify(deliverable)
 
+@app.route('/api/deliverables/<task_id>', methods=['PATCH'])
+def patch_deliverable(task_id):
+    """Apply text edits to the latest deliverable content.
+
+    Body: {"base_version": n, "ops": [{"offset", "delete", "insert"}, ...]}
+    or {"base_version": n, "diff": "<unified diff>"}, plus optional
+    status/title fields. Offsets count Unicode code points in version n.
+    Answers 409 with the current version if n is no longer the latest.
+    """
+    data = request.get_json(silent=True) or {}
+    base_version = data.get('base_version')
+    if not isinstance(base_version, int) or ('ops' in data) == ('diff' in data) \
+            or not isinstance(data.get('ops', []), list) or not isinstance(data.get('diff', ''), str):
+        return jsonify({'error': 'base_version and exactly one of ops (a list) or diff (a string) are required'}), 400
+    fields = {k: data[k] for k in ('status', 'title') if k in data}
+    fields['last_updated'] = datetime.now().isoformat()
+    try:
+        deliverable = deliverable_store.patch(task_id, base_version, edits=data.get('ops'),
+                                              diff=data.get('diff'), fields=fields)
+    except VersionConflict as e:
+        return jsonify({'error': str(e), 'current_version': e.current}), 409
+    except FileNotFoundError:
+        # The head points at a body missing from the blob store
+        return jsonify({'error': 'Deliverable content not found'}), 404
+    except (ValueError, TypeError) as e:
+        return jsonify({'error': f'Patch does not apply: {str(e)}'}), 400
+    if deliverable is None:
+        return jsonify({'error': 'Deliverable not found'}), 404
+    return jsonify({k: deliverable.get(k) for k in
+                    ('id', 'task_id', 'version', 'content_hash', 'content_size', 'last_updated')})
+
+@app.route('/api/deliverables/<task_id>/versions', methods=['GET'])
+def list_deliverable_versions(task_id):
+    def build():
+        if not deliverable_store.head(task_id):
+            return jsonify({'error': 'Deliverable not found'}), 404
+        return jsonify({'task_id': task_id, 'versions': deliverable_store.versions(task_id)})
+    return conditional_response(['deliverables', 'deliverable_versions'], build)
+
+@app.route('/api/deliverables/<task_id>/versions/<int:version>', methods=['GET'])
+def get_deliverable_version(task_id, version):
+    def build():
+        try:
+            content = deliverable_store.checkout(task_id, version)
+        except Exception as e:
+            print(f"Error loading deliverable version: {str(e)}")
+            return jsonify({'error': f'Error loading version: {str(e)}'}), 500
+        if content is None:
+            return jsonify({'error': 'Version not found'}), 404
+        return jsonify({'task_id': task_id, 'version': version, 'content': content})
+    return conditional_response(['deliverable_versions'], build)
+
 @app.route('/api/tag', methods=['POST'])
 def api_tag():
     data = request.json
@@ -566,46 +769,37 @@ def api_tag():
     tags = data.get('tags', [])
     
     if tag_type == 'source':
-        sources = load_data('sources')
-        for source in sources:
-            if source.get('id') == item_id:
-                source['tags'] = tags
-                save_data('sources', sources)
-                return jsonify({'success': True})
+        source = repository.get('sources', item_id)
+        if source:
+            upsert_data('sources', dict(thaw(source), tags=tags))
+            return jsonify({'success': True})
     
     elif tag_type == 'task':
-        tasks = load_data('tasks')
-        for task in tasks:
-            if task.get('id') == item_id:
-                task['tags'] = tags
-                save_data('tasks', tasks)
-                return jsonify({'success': True})
+        task = repository.get('tasks', item_id)
+        if task:
+            upsert_data('tasks', dict(thaw(task), tags=tags))
+            return jsonify({'success': True})
     
     return jsonify({'error': 'Item not found'}), 404
 
 # New API route for suggested sources
 @app.route('/api/suggested_sources/<task_id>', methods=['GET'])
 def get_suggested_sources(task_id):
-    tasks = load_data('tasks')
-    sources = load_data('sources')
-    
-    # Find the task
-    task = None
-    for t in tasks:
-        if t.get('id') == task_id:
-            task = t
-            break
-    
-    if not task:
-        return jsonify({'error': 'Task not found'}), 404
-    
-    # Get suggested sources using the source matcher
-    suggested_sources = match_sources_to_task(task, sources, top_n=5)
-    
-    return jsonify({
-        'task_id': task_id,
-        'suggested_sources': suggested_sources
-    })
+    def build():
+        # Find the task
+        task = repository.get('tasks', task_id)
+        
+        if not task:
+            return jsonify({'error': 'Task not found'}), 404
+        
+        # Get suggested sources using the source matcher (memoized per task and sources version)
+        suggested_sources = suggest_sources(task, top_n=5)
+        
+        return jsonify({
+            'task_id': task_id,
+            'suggested_sources': suggested_sources
+        })
+    return conditional_response(['tasks', 'sources'], build)
 
 # NEW: Task validation API
 @app.route('/api/tasks/validate', methods=['GET'])
@@ -625,8 +819,7 @@ def validate_tasks():
 @app.route('/api/tasks/quality-report', methods=['GET'])
 def get_quality_report():
     """Get comprehensive quality report for all tasks."""
-    report = task_validator.get_tasks_quality_report()
-    return jsonify(report)
+    return conditional_response(['tasks'], lambda: jsonify(task_validator.get_tasks_quality_report()))
 
 # NEW: Validate and fix tasks API
 @app.route('/api/tasks/fix', methods=['POST'])
@@ -644,14 +837,8 @@ def fix_tasks():
 @app.route('/api/tasks/<task_id>/validate', methods=['GET'])
 def validate_single_task(task_id):
     """Validate a single task and return quality score."""
-    tasks = load_data('tasks')
-    
     # Find the task
-    task = None
-    for t in tasks:
-        if t.get('id') == task_id:
-            task = t
-            break
+    task = repository.get('tasks', task_id)
     
     if not task:
         return jsonify({'error': 'Task not found'}), 404
@@ -0,0 +1,49 @@
+# Full-text search over the research analyst collections
+import threading
+from typing import Optional
+
+from search.bm25 import InvertedIndex
+from search.engine import SEARCH_FIELDS, SearchIndex
+from search.facets import FACET_FIELDS, FacetIndex
+from search.lsh import LSHIndex
+from search.suggest import Suggester
+from search.tfidf import TFIDF_FIELDS, TfidfModel
+from search.tokenizer import tokenize
+from storage import get_blob_store, get_repository, get_store
+
+__all__ = ['FacetIndex', 'FACET_FIELDS', 'InvertedIndex', 'LSHIndex', 'SearchIndex', 'SEARCH_FIELDS', 'Suggester',
+           'TFIDF_FIELDS', 'TfidfModel', 'tokenize', 'get_lsh_index', 'get_search_index',
+           'get_tfidf_model']
+
+_search_index: Optional[SearchIndex] = None
+_tfidf_model: Optional[TfidfModel] = None
+_lsh_index: Optional[LSHIndex] = None
+_lock = threading.Lock()
+
+
+def get_search_index() -> SearchIndex:
+    """Return the process-wide SearchIndex over the shared store."""
+    global _search_index
+    with _lock:
+        if _search_index is None:
+            _search_index = SearchIndex(get_store(), get_repository(), get_blob_store())
+        return _search_index
+
+
+def get_tfidf_model() -> TfidfModel:
+    """Return the process-wide TF-IDF model over the shared store."""
+    global _tfidf_model
+    with _lock:
+        if _tfidf_model is None:
+            _tfidf_model = TfidfModel(get_store())
+        return _tfidf_model
+
+
+def get_lsh_index() -> LSHIndex:
+    """Return the process-wide LSH index over sources (requires NumPy)."""
+    global _lsh_index
+    model = get_tfidf_model()
+    with _lock:
+        if _lsh_index is None:
+            _lsh_index = LSHIndex(get_store(), model)
+        return _lsh_index
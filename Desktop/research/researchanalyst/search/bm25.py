@@ -0,0 +1,93 @@
+import heapq
+import math
+from array import array
+from collections import Counter
+from operator import itemgetter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+# Standard BM25 parameters: term-frequency saturation and length normalization
+K1 = 1.2
+B = 0.75
+
+
+def idf(n: int, df: int) -> float:
+    return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+
+class InvertedIndex:
+    """Term -> postings index over a set of documents, ranked with BM25.
+
+    Each postings list is a pair of compact arrays (document numbers, term
+    frequencies), so a query only touches the lists of its own terms and
+    the top k documents are picked with a heap instead of a full sort.
+    Documents are never removed in place: deleting one records a tombstone
+    that queries skip until the index is merged into a fresh one.
+    """
+
+    def __init__(self):
+        self.keys: List[Any] = []
+        self.lengths = array('I')
+        self.terms: List[Tuple[str, ...]] = []
+        self.postings: Dict[str, Tuple[array, array]] = {}
+        self.deleted: Set[int] = set()
+        self.total_length = 0
+
+    def __len__(self) -> int:
+        return len(self.keys) - len(self.deleted)
+
+    def add(self, key: Any, tokens: Iterable[str]) -> int:
+        """Index a document's tokens under key; returns its document number."""
+        doc = len(self.keys)
+        counts = Counter(tokens)
+        length = sum(counts.values())
+        self.keys.append(key)
+        self.lengths.append(length)
+        self.terms.append(tuple(counts))
+        self.total_length += length
+        for term, tf in counts.items():
+            postings = self.postings.get(term)
+            if postings is None:
+                postings = self.postings[term] = (array('I'), array('I'))
+            postings[0].append(doc)
+            postings[1].append(tf)
+        return doc
+
+    def delete(self, doc: int) -> None:
+        """Tombstone a document."""
+        if doc not in self.deleted:
+            self.deleted.add(doc)
+            self.total_length -= self.lengths[doc]
+
+    def accumulate(self, scores: Dict[Any, float], term: str, weight: float, average: float) -> None:
+        """Add one term's BM25 contribution (weight = its idf) for every live document to scores."""
+        postings = self.postings.get(term)
+        if not postings:
+            return
+        keys, lengths, deleted = self.keys, self.lengths, self.deleted
+        for doc, tf in zip(*postings):
+            if deleted and doc in deleted:
+                continue
+            key = keys[doc]
+            norm = K1 * (1 - B + B * lengths[doc] / average)
+            scores[key] = scores.get(key, 0.0) + weight * tf * (K1 + 1) / (tf + norm)
+
+    def search(self, terms: Iterable[str], k: int = 50,
+               accept: Optional[Callable[[Any], bool]] = None) -> List[Tuple[float, Any]]:
+        """Return the k best (score, key) pairs for terms, best first."""
+        n = len(self)
+        scores: Dict[Any, float] = {}
+        if n:
+            for term in dict.fromkeys(terms):
+                postings = self.postings.get(term)
+                if postings:
+                    df = sum(1 for doc in postings[0] if doc not in self.deleted)
+                    self.accumulate(scores, term, idf(n, df), self.total_length / n)
+        return top_k(scores, k, accept)
+
+
+def top_k(scores: Dict[Any, float], k: int,
+          accept: Optional[Callable[[Any], bool]] = None) -> List[Tuple[float, Any]]:
+    candidates = scores.items()
+    if accept is not None:
+        candidates = [(key, score) for key, score in candidates if accept(key)]
+    return [(score, key) for key, score in heapq.nlargest(k, candidates, key=itemgetter(1))]
@@ -0,0 +1,237 @@
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from search.bm25 import top_k
+from search.facets import FacetIndex, record_facets
+from search.fuzzy import TrigramIndex
+from search.segments import SegmentedIndex
+from search.suggest import DEFAULT_SUGGESTIONS, Suggester, record_phrases
+from search.tokenizer import field_text, tokenize
+
+# Collection -> (result type, {field: weight}); a weight repeats the field's tokens
+SEARCH_FIELDS = {
+    'tasks': ('task', {'title': 2, 'description': 1, 'objectives': 1}),
+    'sources': ('source', {'title': 2, 'tags': 1, 'description': 1}),
+    'deliverables': ('deliverable', {'title': 2, 'content': 1}),
+}
+
+TYPE_COLLECTIONS = {kind: name for name, (kind, _) in SEARCH_FIELDS.items()}
+
+# Below this many matches, misspelled query terms are also searched as their closest known terms
+FUZZY_MIN_HITS = 3
+
+
+def _record_key(record: Any, position: int) -> Any:
+    record_id = record.get('id') if isinstance(record, dict) else None
+    return record_id if isinstance(record_id, (str, int)) else ('#', position)
+
+
+def _phrase_terms(phrases: List[Tuple[str, str]]) -> List[str]:
+    return [term for _, phrase in phrases for term in tokenize(phrase)]
+
+
+class SearchIndex:
+    """Full-text index over tasks, sources and deliverables for /search.
+
+    The index is built once and then kept current document by document: it
+    listens for writes made through the store and applies the store's
+    record-level changes (or, after a whole-collection save or a write from
+    another process, a diff against the records it last indexed). Replaced
+    and removed documents are tombstoned in the SegmentedIndex, which merges
+    its segments in the background. A FacetIndex over the same documents
+    serves the facet filters and counts, a Suggester the title, tag and
+    stakeholder completions, and a TrigramIndex over the words of those
+    phrases the typo-tolerant fallback.
+    """
+
+    def __init__(self, store, repository, blobs):
+        self.store = store
+        self.repository = repository
+        self.blobs = blobs
+        self._stamps: Dict[str, Any] = {}
+        self._records: Dict[str, Dict[Any, Any]] = {}
+        self._index: Optional[SegmentedIndex] = None
+        self._facets = FacetIndex()
+        self._suggester = Suggester()
+        self._fuzzy = TrigramIndex()
+        self._lock = threading.RLock()
+        store.add_listener(self._on_write)
+
+    def document_tokens(self, name: str, record: dict) -> List[str]:
+        tokens: List[str] = []
+        for field, weight in SEARCH_FIELDS[name][1].items():
+            if field == 'content':
+                try:
+                    value = self.blobs.resolve(record)
+                except Exception as e:
+                    print(f"Error loading {name} content for search: {str(e)}")
+                    value = ''
+            else:
+                value = record.get(field)
+            tokens.extend(tokenize(field_text(value)) * weight)
+        return tokens
+
+    def index(self) -> SegmentedIndex:
+        """Return the index, brought up to date with the current store versions."""
+        if self._index is None:
+            with self._lock:
+                if self._index is None:
+                    self._build()
+        for name in SEARCH_FIELDS:
+            self.refresh(name)
+        return self._index
+
+    def refresh(self, name: str) -> None:
+        """Apply whatever changed in one collection since it was last indexed."""
+        with self._lock:
+            if self._index is None or name not in SEARCH_FIELDS:
+                return
+            stamp, records = self._snapshot(name)
+            if stamp == self._stamps.get(name):
+                return
+            changes = self.store.changes_since(name, self._stamps.get(name))
+            if changes is None:
+                self._sync(name, records)
+            else:
+                indexed = self._records[name]
+                for change in changes:
+                    key = _record_key(change.new, change.position)
+                    if change.old is not None:
+                        old_key = _record_key(change.old, change.position)
+                        if old_key != key and old_key in indexed:
+                            self._drop(name, old_key)
+                    self._put(name, key, change.new)
+            self._stamps[name] = stamp
+
+    def search(self, query: str, limit: int = 50, types: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Return up to limit hits for query as {type, collection, id, score}, best first."""
+        return self.query(query, limit, types=types)['hits']
+
+    def query(self, query: str, limit: int = 50, filters: Optional[Dict[str, List[str]]] = None,
+              types: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Search with facet filters ({facet: [values]}, see FACET_FIELDS).
+
+        Returns {hits, total, facets, corrections}: the top hits as in
+        search(), how many documents matched the query and filters, per-facet
+        value counts for the query's matches, and {term: [close terms]} for
+        any misspelled terms that were searched as known ones instead.
+        """
+        terms = tokenize(query)
+        if not terms:
+            return {'hits': [], 'total': 0, 'facets': {}, 'corrections': {}}
+        wanted = {TYPE_COLLECTIONS[t] for t in types if t in TYPE_COLLECTIONS} if types else None
+        index = self.index()
+
+        def score(terms: List[str]) -> Dict[Any, float]:
+            # Type filtering comes first, so total and facets only count the wanted collections
+            scores = index.scores(terms)
+            if wanted is None:
+                return scores
+            return {key: value for key, value in scores.items() if key[0] in wanted}
+
+        scores = score(terms)
+        corrections = {}
+        if len(scores) < FUZZY_MIN_HITS:
+            corrections = self.corrections(terms)
+            if corrections:
+                scores = score(terms + [term for close in corrections.values() for term in close])
+        with self._lock:
+            matched = self._facets.bitmap_of(scores)
+            facets = self._facets.counts(matched, filters)
+            allowed = self._facets.match(filters or {})
+            if allowed is not None:
+                scores = {key: scores[key] for key in self._facets.keys_of(matched & allowed)}
+        hits = [{'type': SEARCH_FIELDS[name][0], 'collection': name, 'id': record_id, 'score': round(value, 4)}
+                for value, (name, record_id) in top_k(scores, limit)]
+        return {'hits': hits, 'total': len(scores), 'facets': facets, 'corrections': corrections}
+
+    def corrections(self, terms: List[str]) -> Dict[str, List[str]]:
+        """Close indexed terms for each query term the index does not contain."""
+        corrections = {}
+        with self._lock:
+            index = self.index()
+            for term in dict.fromkeys(terms):
+                if term in index.df:
+                    continue
+                close = [match for match, _ in self._fuzzy.match(term) if match in index.df]
+                if close:
+                    corrections[term] = close
+        return corrections
+
+    def suggest(self, prefix: str, limit: int = DEFAULT_SUGGESTIONS) -> List[Dict[str, Any]]:
+        """Autocomplete prefix from titles, tags and stakeholder names as {text, kind, weight}."""
+        self.index()
+        return self._suggester.suggest(prefix, limit)
+
+    def _build(self) -> None:
+        documents = []
+        facets = []
+        phrases = []
+        for name in SEARCH_FIELDS:
+            stamp, records = self._snapshot(name)
+            indexed = self._records[name] = {}
+            for position, record in enumerate(records):
+                if isinstance(record, dict):
+                    key = _record_key(record, position)
+                    if key not in indexed:
+                        indexed[key] = record
+                        documents.append(((name, key), self.document_tokens(name, record)))
+                        facets.append(((name, key), record_facets(name, record)))
+                        phrases.extend(record_phrases(name, record))
+            self._stamps[name] = stamp
+        index = SegmentedIndex()
+        index.bulk_load(documents)
+        self._facets = FacetIndex()
+        self._facets.load(facets)
+        self._suggester = Suggester()
+        self._suggester.load(phrases)
+        self._fuzzy = TrigramIndex()
+        self._fuzzy.add(_phrase_terms(phrases))
+        self._index = index
+
+    def _sync(self, name: str, records: Any) -> None:
+        """Re-index only the records that differ from the ones indexed last time."""
+        current: Dict[Any, Any] = {}
+        for position, record in enumerate(records):
+            if isinstance(record, dict):
+                current.setdefault(_record_key(record, position), record)
+        indexed = self._records[name]
+        for key in [key for key in indexed if key not in current]:
+            self._drop(name, key)
+        for key, record in current.items():
+            self._put(name, key, record)
+
+    def _put(self, name: str, key: Any, record: Any) -> None:
+        indexed = self._records[name]
+        previous = indexed.get(key)
+        if previous is record or (previous is not None and previous == record):
+            indexed[key] = record
+            return
+        indexed[key] = record
+        self._index.add((name, key), self.document_tokens(name, record))
+        self._facets.add((name, key), record_facets(name, record))
+        if previous is not None:
+            self._remove_phrases(record_phrases(name, previous))
+        phrases = record_phrases(name, record)
+        self._suggester.add(phrases)
+        self._fuzzy.add(_phrase_terms(phrases))
+
+    def _drop(self, name: str, key: Any) -> None:
+        record = self._records[name].pop(key)
+        self._index.remove((name, key))
+        self._facets.remove((name, key))
+        self._remove_phrases(record_phrases(name, record))
+
+    def _remove_phrases(self, phrases: List[Tuple[str, str]]) -> None:
+        self._suggester.remove(phrases)
+        self._fuzzy.remove(_phrase_terms(phrases))
+
+    def _on_write(self, name: str) -> None:
+        if name in SEARCH_FIELDS:
+            self.refresh(name)
+
+    def _snapshot(self, name: str) -> Tuple[Any, Any]:
+        try:
+            return self.store.snapshot(name)
+        except FileNotFoundError:
+            return None, []
@@ -0,0 +1,140 @@
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Collection -> {facet name: record field}; facet names double as /search query parameters
+FACET_FIELDS = {
+    'tasks': {'category': 'category', 'status': 'status', 'output_type': 'output_type', 'origin': 'origin'},
+    'sources': {'source_type': 'type', 'media_type': 'media_type', 'access_status': 'access_status'},
+}
+
+FACETS = tuple(facet for fields in FACET_FIELDS.values() for facet in fields)
+
+
+def _popcount(bitmap: int) -> int:
+    return bitmap.bit_count() if hasattr(bitmap, 'bit_count') else bin(bitmap).count('1')
+
+
+def record_facets(name: str, record: Any) -> List[Tuple[str, str]]:
+    """(facet, value) pairs for a record; non-string and empty values are not faceted."""
+    pairs = []
+    if isinstance(record, dict):
+        for facet, field in FACET_FIELDS.get(name, {}).items():
+            value = record.get(field)
+            if isinstance(value, str) and value:
+                pairs.append((facet, value))
+    return pairs
+
+
+class FacetIndex:
+    """Per-value bitmaps over indexed documents for filtering and facet counts.
+
+    Every document gets a small integer slot (freed slots are reused) and
+    each (facet, value) keeps a Python int with that slot's bit set, so a
+    filter is a handful of ANDs/ORs and a facet count is one popcount, no
+    matter how many documents there are.
+    """
+
+    def __init__(self):
+        self.slots: Dict[Any, int] = {}
+        self.keys: List[Any] = []
+        self.free: List[int] = []
+        self.values: Dict[Any, List[Tuple[str, str]]] = {}
+        self.bitmaps: Dict[str, Dict[str, int]] = {facet: {} for facet in FACETS}
+
+    def add(self, key: Any, pairs: Iterable[Tuple[str, str]]) -> None:
+        """Set (or replace) the facet values of the document stored under key."""
+        self.remove(key)
+        if self.free:
+            slot = self.free.pop()
+            self.keys[slot] = key
+        else:
+            slot = len(self.keys)
+            self.keys.append(key)
+        self.slots[key] = slot
+        pairs = list(pairs)
+        self.values[key] = pairs
+        bit = 1 << slot
+        for facet, value in pairs:
+            bitmaps = self.bitmaps[facet]
+            bitmaps[value] = bitmaps.get(value, 0) | bit
+
+    def remove(self, key: Any) -> None:
+        slot = self.slots.pop(key, None)
+        if slot is None:
+            return
+        mask = ~(1 << slot)
+        for facet, value in self.values.pop(key):
+            bitmaps = self.bitmaps[facet]
+            bitmaps[value] &= mask
+            if not bitmaps[value]:
+                del bitmaps[value]
+        self.keys[slot] = None
+        self.free.append(slot)
+
+    def load(self, documents: Iterable[Tuple[Any, List[Tuple[str, str]]]]) -> None:
+        """Add many documents at once, building each bitmap in a single pass."""
+        pending: Dict[Tuple[str, str], List[int]] = {}
+        for key, pairs in documents:
+            if key in self.slots:
+                self.add(key, pairs)
+                continue
+            slot = len(self.keys)
+            self.keys.append(key)
+            self.slots[key] = slot
+            self.values[key] = list(pairs)
+            for pair in self.values[key]:
+                pending.setdefault(pair, []).append(slot)
+        for (facet, value), slots in pending.items():
+            bitmaps = self.bitmaps[facet]
+            bitmaps[value] = bitmaps.get(value, 0) | self._bitmap(slots)
+
+    def bitmap_of(self, keys: Iterable[Any]) -> int:
+        """Bitmap of the given document keys (unknown keys are ignored)."""
+        return self._bitmap(slot for slot in map(self.slots.get, keys) if slot is not None)
+
+    def keys_of(self, bitmap: int) -> Iterator[Any]:
+        """Document keys whose bits are set in bitmap."""
+        data = bitmap.to_bytes((bitmap.bit_length() + 7) // 8, 'little')
+        for i, byte in enumerate(data):
+            while byte:
+                low = byte & -byte
+                yield self.keys[i * 8 + low.bit_length() - 1]
+                byte ^= low
+
+    def match(self, filters: Dict[str, List[str]], skip: Optional[str] = None) -> Optional[int]:
+        """Bitmap of documents matching every facet filter (any of its values), or None if unfiltered."""
+        result = None
+        for facet, values in filters.items():
+            if facet == skip or facet not in self.bitmaps or not values:
+                continue
+            bitmap = 0
+            for value in values:
+                bitmap |= self.bitmaps[facet].get(value, 0)
+            result = bitmap if result is None else result & bitmap
+        return result
+
+    def counts(self, matched: int, filters: Optional[Dict[str, List[str]]] = None) -> Dict[str, Dict[str, int]]:
+        """Facet value counts within matched.
+
+        Each facet is counted under the other facets' filters but not its
+        own, so the alternatives to a selected value keep their counts.
+        """
+        filters = filters or {}
+        counts: Dict[str, Dict[str, int]] = {}
+        for facet, bitmaps in self.bitmaps.items():
+            base = matched
+            others = self.match(filters, skip=facet)
+            if others is not None:
+                base &= others
+            values = {}
+            for value, bitmap in bitmaps.items():
+                count = _popcount(base & bitmap)
+                if count:
+                    values[value] = count
+            counts[facet] = dict(sorted(values.items(), key=lambda item: (-item[1], item[0])))
+        return counts
+
+    def _bitmap(self, slots: Iterable[int]) -> int:
+        data = bytearray((len(self.keys) + 7) // 8)
+        for slot in slots:
+            data[slot >> 3] |= 1 << (slot & 7)
+        return int.from_bytes(data, 'little')
@@ -0,0 +1,101 @@
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Terms shorter than this are never corrected; one typo allowed up to LONG_TERM, two beyond
+MIN_FUZZY_LENGTH = 3
+LONG_TERM = 8
+
+
+def trigrams(term: str) -> Set[str]:
+    """Character trigrams of a term, padded so its start and end count."""
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def max_distance(term: str) -> int:
+    if len(term) < MIN_FUZZY_LENGTH:
+        return 0
+    return 1 if len(term) < LONG_TERM else 2
+
+
+def bounded_levenshtein(a: str, b: str, limit: int) -> Optional[int]:
+    """Edit distance between a and b, or None as soon as it must exceed limit."""
+    if abs(len(a) - len(b)) > limit:
+        return None
+    if len(a) > len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        # Only cells within limit of the diagonal can stay within limit
+        low, high = max(1, i - limit), min(len(b), i + limit)
+        current = [limit + 1] * (len(b) + 1)
+        current[0] = i if i <= limit else limit + 1
+        for j in range(low, high + 1):
+            cost = 0 if ca == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+        if min(current[low - 1:high + 1]) > limit:
+            return None
+        previous = current
+    return previous[len(b)] if previous[len(b)] <= limit else None
+
+
+class TrigramIndex:
+    """Trigram -> terms index for typo-tolerant lookups over a vocabulary.
+
+    Candidates are the terms sharing enough trigrams with the query term
+    (k edits can destroy at most 3k of them), and only those are checked
+    with a bounded edit distance, so a lookup never scans the vocabulary.
+    """
+
+    def __init__(self):
+        self.terms: Counter = Counter()
+        self.grams: Dict[str, Set[str]] = {}
+
+    def __contains__(self, term: str) -> bool:
+        return term in self.terms
+
+    def add(self, terms: Iterable[str]) -> None:
+        for term in terms:
+            self.terms[term] += 1
+            if self.terms[term] == 1:
+                for gram in trigrams(term):
+                    self.grams.setdefault(gram, set()).add(term)
+
+    def remove(self, terms: Iterable[str]) -> None:
+        for term in terms:
+            if term not in self.terms:
+                continue
+            self.terms[term] -= 1
+            if self.terms[term] > 0:
+                continue
+            del self.terms[term]
+            for gram in trigrams(term):
+                bucket = self.grams.get(gram)
+                if bucket is not None:
+                    bucket.discard(term)
+                    if not bucket:
+                        del self.grams[gram]
+
+    def match(self, term: str, limit: int = 3) -> List[Tuple[str, int]]:
+        """Up to limit vocabulary terms within the allowed edit distance of term, closest first.
+
+        Ties go to the more frequent term. A wider distance is only tried
+        when nothing closer exists.
+        """
+        grams = trigrams(term)
+        shared: Counter = Counter()
+        for gram in grams:
+            shared.update(self.grams.get(gram, ()))
+        for k in range(1, max_distance(term) + 1):
+            needed = max(1, len(grams) - 3 * k)
+            matches = []
+            for candidate, count in shared.items():
+                if count < needed or candidate == term or abs(len(candidate) - len(term)) > k:
+                    continue
+                distance = bounded_levenshtein(term, candidate, k)
+                if distance is not None:
+                    matches.append((distance, -self.terms[candidate], candidate))
+            if matches:
+                matches.sort()
+                return [(candidate, distance) for distance, _, candidate in matches[:limit]]
+        return []
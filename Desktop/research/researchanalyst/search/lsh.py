@@ -0,0 +1,335 @@
+import atexit
+import itertools
+import os
+import random
+import tempfile
+import threading
+import time
+import zlib
+from typing import Any, Dict, Iterable, List, Set
+
+from search.tfidf import TFIDF_FIELDS, record_terms
+from storage.json_backend import DATA_DIR
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; without it LSHIndex is unavailable and matching stays exact
+    np = None
+
+# 48 min-hashes in 48 bands of one row: a record becomes a candidate when any band matches, which for
+# term sets with Jaccard similarity J happens with probability 1 - (1 - J) ** 48 (0.91 at 0.05, 0.99 at 0.1).
+# Task texts are much longer than source texts, so the Jaccard similarity of a good match is low and
+# wider bands (ROWS > 1) lose most of them.
+NUM_PERM = 48
+BANDS = 48
+ROWS = NUM_PERM // BANDS
+# Min-hash functions are multiply-shift hashes ((a * x + b) mod 2 ** 64) >> 32 of 32-bit term hashes
+SEED = 1
+EMPTY = 1 << 32
+# Multiplier mixing a band's rows into one 32-bit bucket hash
+_MIX = 0x9E3779B1
+
+# Terms in more than this share of documents (0.2%) are left out of signatures: they would put most
+# records in the same buckets. The cut is taken from the TF-IDF model when the index is built.
+MAX_DF_RATIO = 0.002
+
+LSH_PATH = os.path.join(DATA_DIR, '.lsh.npz')
+PERSIST_INTERVAL = 30
+# Signatures are computed about this many terms at a time (a CHUNK x NUM_PERM array that stays in cache)
+CHUNK = 1 << 12
+
+# Term -> crc32 of its UTF-8 bytes, forgotten when it grows past this many terms
+HASH_CACHE_SIZE = 1 << 20
+
+_rng = random.Random(SEED)
+_A = [_rng.randrange(1, 1 << 64, 2) for _ in range(NUM_PERM)]
+_B = [_rng.randrange(0, 1 << 64) for _ in range(NUM_PERM)]
+_hash_cache: Dict[str, int] = {}
+
+
+def term_hashes(terms: Iterable[str]) -> List[int]:
+    """32-bit hashes of terms (duplicates do not change a MinHash signature)."""
+    if len(_hash_cache) > HASH_CACHE_SIZE:
+        _hash_cache.clear()
+    hashes = []
+    for term in terms:
+        value = _hash_cache.get(term)
+        if value is None:
+            value = _hash_cache[term] = zlib.crc32(term.encode('utf-8'))
+        hashes.append(value)
+    return hashes
+
+
+def signatures(hash_lists: List[List[int]]) -> 'np.ndarray':
+    """(len(hash_lists), NUM_PERM) MinHash signatures; rows of empty sets are all EMPTY."""
+    counts = np.array([len(hashes) for hashes in hash_lists], dtype=np.int64)
+    values = np.fromiter(itertools.chain.from_iterable(hash_lists), dtype=np.uint64, count=int(counts.sum()))
+    a = np.array(_A, dtype=np.uint64)
+    b = np.array(_B, dtype=np.uint64)
+    result = np.full((len(hash_lists), NUM_PERM), EMPTY, dtype=np.uint64)
+    ends = np.cumsum(counts)
+    starts = ends - counts
+    row = 0
+    while row < len(hash_lists):
+        # Whole rows per chunk, so each row's minimum is taken in one reduceat
+        last = max(row + 1, int(np.searchsorted(ends, starts[row] + CHUNK, side='right')))
+        rows = np.arange(row, last)
+        rows = rows[counts[rows] > 0]
+        if len(rows):
+            lo, hi = starts[rows[0]], ends[rows[-1]]
+            # Each distinct term is hashed once per chunk; wrapping uint64 arithmetic is the mod 2 ** 64
+            unique, inverse = np.unique(values[lo:hi], return_inverse=True)
+            hashed = ((unique[:, None] * a + b) >> np.uint64(32)).astype(np.uint32)[inverse]
+            result[rows] = np.minimum.reduceat(hashed, starts[rows] - lo, axis=0)
+        row = last
+    return result
+
+
+def band_hashes(sigs: 'np.ndarray') -> 'np.ndarray':
+    """(n, BANDS) 32-bit bucket hashes: each band's ROWS min-hashes mixed into one value."""
+    mask = np.uint64(0xFFFFFFFF)
+    bands = sigs.reshape(len(sigs), BANDS, ROWS)
+    h = np.zeros((len(sigs), BANDS), dtype=np.uint64)
+    for r in range(ROWS):
+        # Wraps modulo 2 ** 64, which leaves the low 32 bits exact
+        h = ((h ^ bands[:, :, r]) * np.uint64(_MIX)) & mask
+    return h.astype(np.uint32)
+
+
+def bucket_keys(hashes: 'np.ndarray') -> 'np.ndarray':
+    """Band number in the high 32 bits, bucket hash in the low 32, so bands never collide."""
+    return (np.arange(BANDS, dtype=np.uint64) << np.uint64(32)) | hashes.astype(np.uint64)
+
+
+class LSHIndex:
+    """MinHash/LSH index over one collection's record terms, for candidate retrieval.
+
+    Each record's set of informative terms (the TF-IDF fields, less the
+    terms common enough to be in over MAX_DF_RATIO of documents, which are
+    fixed when the index is built) gets a MinHash signature,
+    cut into BANDS bands that are hashed into buckets; the records sharing a
+    bucket with a query are its candidates, to be re-scored exactly by the
+    caller. Records are keyed by position. Bucket keys live in one sorted
+    array searched with binary search; records changed since it was built
+    are masked out of it and served from a small dict overlay until the
+    overlay grows past COMPACT_RATIO of the collection and the array is
+    rebuilt, much like the segments of the full-text index. Writes through
+    the store re-hash only the changed records (a whole-collection save is
+    diffed record by record) and the hashes are persisted to LSH_PATH with
+    the collection version they match.
+    """
+
+    COMPACT_RATIO = 0.05
+    COMPACT_MIN = 1024
+
+    def __init__(self, store, model, name: str = 'sources', path: str = LSH_PATH):
+        if np is None:
+            raise ImportError("LSHIndex requires NumPy")
+        self.store = store
+        self.model = model
+        self.name = name
+        self.path = path
+        self.fields = TFIDF_FIELDS[name]
+        # Per position: bucket hash of every band, and whether the record had any terms
+        self.hashes = np.zeros((0, BANDS), dtype=np.uint32)
+        self.present = np.zeros(0, dtype=bool)
+        self.common: Set[str] = set()
+        self._sorted_keys = np.zeros(0, dtype=np.uint64)
+        self._sorted_positions = np.zeros(0, dtype=np.int64)
+        self._stale = np.zeros(0, dtype=bool)
+        self._overlay: Dict[int, Set[int]] = {}
+        self._overlay_keys: Dict[int, List[int]] = {}
+        self._records: Any = None
+        self._stamp: Any = None
+        self._loaded = False
+        self._dirty = False
+        self._saved_at = 0.0
+        self._lock = threading.RLock()
+        store.add_listener(self._on_write)
+        atexit.register(self.save)
+
+    def __len__(self) -> int:
+        return len(self.present)
+
+    def covers(self, records: Any) -> bool:
+        """Whether the index is current and was built over exactly this read-only view."""
+        self.refresh()
+        return self._records is records
+
+    def candidates(self, terms: Iterable[str]) -> 'np.ndarray':
+        """Sorted positions of the records sharing at least one bucket with terms."""
+        return self.candidates_batch([terms])[0]
+
+    def candidates_batch(self, term_sets: List[Iterable[str]]) -> List['np.ndarray']:
+        self.refresh()
+        hash_lists = [self._hashes(terms) for terms in term_sets]
+        keys = bucket_keys(band_hashes(signatures(hash_lists)))
+        results = []
+        with self._lock:
+            for hashes, query in zip(hash_lists, keys):
+                if not hashes:
+                    results.append(np.zeros(0, dtype=np.int64))
+                    continue
+                lo = np.searchsorted(self._sorted_keys, query, side='left')
+                hi = np.searchsorted(self._sorted_keys, query, side='right')
+                found = [self._sorted_positions[l:h] for l, h in zip(lo, hi) if h > l]
+                found = np.concatenate(found) if found else np.zeros(0, dtype=np.int64)
+                found = found[~self._stale[found]]
+                extra = [position for key in query.tolist() for position in self._overlay.get(key, ())]
+                if extra:
+                    found = np.concatenate([found, np.array(extra, dtype=np.int64)])
+                results.append(np.unique(found))
+        return results
+
+    def refresh(self) -> None:
+        """Bring the index up to date with the store."""
+        with self._lock:
+            try:
+                stamp, records = self.store.snapshot(self.name)
+            except FileNotFoundError:
+                stamp, records = None, []
+            if self._loaded and stamp == self._stamp:
+                return
+            changes = self.store.changes_since(self.name, self._stamp) if self._loaded else None
+            if changes is not None:
+                self._update([change.position for change in changes], [change.new for change in changes])
+                self._dirty = True
+            elif self._loaded:
+                self._sync(records)
+                self._dirty = True
+            elif not self._adopt_persisted(stamp, records):
+                self._build(records)
+                self._dirty = True
+            self._records = records
+            self._stamp = stamp
+            self._loaded = True
+        self._maybe_save()
+
+    def save(self) -> None:
+        """Persist the bucket hashes and the collection version they match."""
+        with self._lock:
+            # The version the hashes were computed at, not whatever is current by now
+            version = self.store.version_at(self.name, self._stamp) if self._loaded else None
+            if not self._dirty or version is None:
+                return
+            arrays = {
+                'version': np.array([version[0]], dtype=np.int64),
+                'tag': np.array([version[1]]),
+                'params': np.array([NUM_PERM, BANDS, SEED], dtype=np.int64),
+                'common': np.array(sorted(self.common), dtype=str),
+                'hashes': self.hashes.copy(),
+                'present': self.present.copy(),
+            }
+            self._dirty = False
+            self._saved_at = time.time()
+        try:
+            directory = os.path.dirname(self.path) or '.'
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f'.{os.path.basename(self.path)}.', suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    np.savez(f, **arrays)
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except Exception as e:
+            print(f"Error saving LSH index: {str(e)}")
+
+    def _hashes(self, terms: Iterable[str]) -> List[int]:
+        common = self.common
+        return term_hashes(term for term in terms if term not in common)
+
+    def _build(self, records: Any) -> None:
+        self.model.refresh()
+        cut = MAX_DF_RATIO * self.model.total_documents
+        self.common = {term for term, df in self.model.total_df.items() if df > cut}
+        hash_lists = [self._hashes(record_terms(self.name, record)) for record in records]
+        self.present = np.array([bool(hashes) for hashes in hash_lists], dtype=bool)
+        self.hashes = band_hashes(signatures(hash_lists))
+        self._compact()
+
+    def _sync(self, records: Any) -> None:
+        """Re-hash the records that differ from the last indexed version, position by position."""
+        previous = self._records if self._records is not None else []
+        changed = [position for position, record in enumerate(records)
+                   if position >= len(previous) or not self._same_text(previous[position], record)]
+        if len(records) < len(self.present):
+            self.hashes = self.hashes[:len(records)]
+            self.present = self.present[:len(records)]
+            self._compact()
+        self._update(changed, [records[position] for position in changed])
+
+    def _same_text(self, old: Any, new: Any) -> bool:
+        if old is new:
+            return True
+        if not isinstance(old, dict) or not isinstance(new, dict):
+            return False
+        return all(old.get(field) == new.get(field) for field in self.fields)
+
+    def _update(self, positions: List[int], records: List[Any]) -> None:
+        if not positions:
+            return
+        hash_lists = [self._hashes(record_terms(self.name, record)) for record in records]
+        hashes = band_hashes(signatures(hash_lists))
+        size = max(max(positions) + 1, len(self.present))
+        if size > len(self.present):
+            grow = size - len(self.present)
+            self.hashes = np.concatenate([self.hashes, np.zeros((grow, BANDS), dtype=np.uint32)])
+            self.present = np.concatenate([self.present, np.zeros(grow, dtype=bool)])
+            self._stale = np.concatenate([self._stale, np.zeros(grow, dtype=bool)])
+        for position, row, terms in zip(positions, hashes, hash_lists):
+            self.hashes[position] = row
+            self.present[position] = bool(terms)
+            self._stale[position] = True
+            for key in self._overlay_keys.pop(position, ()):
+                bucket = self._overlay[key]
+                bucket.discard(position)
+                if not bucket:
+                    del self._overlay[key]
+            if terms:
+                keys = bucket_keys(row[None, :])[0].tolist()
+                self._overlay_keys[position] = keys
+                for key in keys:
+                    self._overlay.setdefault(key, set()).add(position)
+        if len(self._overlay_keys) > max(self.COMPACT_MIN, self.COMPACT_RATIO * len(self.present)):
+            self._compact()
+
+    def _compact(self) -> None:
+        """Rebuild the sorted bucket array from the per-position hashes and empty the overlay."""
+        positions = np.flatnonzero(self.present)
+        keys = bucket_keys(self.hashes[positions]).ravel()
+        positions = np.repeat(positions, BANDS)
+        order = np.argsort(keys, kind='stable')
+        self._sorted_keys = keys[order]
+        self._sorted_positions = positions[order]
+        self._stale = np.zeros(len(self.present), dtype=bool)
+        self._overlay = {}
+        self._overlay_keys = {}
+
+    def _adopt_persisted(self, stamp: Any, records: Any) -> bool:
+        try:
+            with np.load(self.path) as persisted:
+                version = self.store.version_at(self.name, stamp)
+                if (version is None or int(persisted['version'][0]) != version[0]
+                        or str(persisted['tag'][0]) != version[1]
+                        or persisted['params'].tolist() != [NUM_PERM, BANDS, SEED]
+                        or len(persisted['present']) != len(records)):
+                    return False
+                self.hashes = persisted['hashes']
+                self.present = persisted['present']
+                self.common = set(persisted['common'].tolist())
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            print(f"Error loading LSH index: {str(e)}")
+            return False
+        self._compact()
+        return True
+
+    def _maybe_save(self) -> None:
+        if self._dirty and time.time() - self._saved_at >= PERSIST_INTERVAL:
+            self.save()
+
+    def _on_write(self, name: str) -> None:
+        if name == self.name:
+            self.refresh()
@@ -0,0 +1,188 @@
+import bisect
+import threading
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from search.bm25 import InvertedIndex, idf, top_k
+
+# Seal the in-memory write segment once it holds this many documents
+SEGMENT_SIZE = 1000
+# Merge in the background once there are more sealed segments than this...
+MAX_SEGMENTS = 8
+# ...or once this fraction of indexed documents are tombstones
+MAX_DELETED_RATIO = 0.3
+
+
+class SegmentedIndex:
+    """BM25 index made of immutable segments plus a small write segment.
+
+    Adding a document appends it to the write segment; replacing or removing
+    one tombstones its old copy. Corpus statistics (document count, total
+    length, document frequencies) are kept exactly as documents come and
+    go, so scores match a freshly built index. Full write segments are
+    sealed, and a background thread merges sealed segments and drops
+    tombstones when there are too many of either.
+    """
+
+    def __init__(self, segment_size: int = SEGMENT_SIZE, max_segments: int = MAX_SEGMENTS,
+                 background: bool = True):
+        self.segment_size = segment_size
+        self.max_segments = max_segments
+        self.background = background
+        self.segments: List[InvertedIndex] = []
+        self.active = InvertedIndex()
+        self.locations: Dict[Any, Tuple[InvertedIndex, int]] = {}
+        self.df: Counter = Counter()
+        self.total_length = 0
+        self._lock = threading.RLock()
+        self._merging = False
+
+    def __len__(self) -> int:
+        return len(self.locations)
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self.locations
+
+    def keys(self) -> List[Any]:
+        return list(self.locations)
+
+    def add(self, key: Any, tokens: Iterable[str]) -> None:
+        """Index (or re-index) the document stored under key."""
+        tokens = list(tokens)
+        with self._lock:
+            self._remove(key)
+            segment = self.active
+            doc = segment.add(key, tokens)
+            self.locations[key] = (segment, doc)
+            self.df.update(segment.terms[doc])
+            self.total_length += segment.lengths[doc]
+            if len(segment.keys) >= self.segment_size:
+                self.segments.append(segment)
+                self.active = InvertedIndex()
+        self._maybe_merge()
+
+    def remove(self, key: Any) -> None:
+        with self._lock:
+            self._remove(key)
+        self._maybe_merge()
+
+    def bulk_load(self, documents: Iterable[Tuple[Any, List[str]]]) -> None:
+        """Build one sealed segment from many documents at once (initial load)."""
+        segment = InvertedIndex()
+        for key, tokens in documents:
+            segment.add(key, tokens)
+        with self._lock:
+            for doc, key in enumerate(segment.keys):
+                if key in self.locations:
+                    self._remove(key)
+                self.locations[key] = (segment, doc)
+                self.df.update(segment.terms[doc])
+                self.total_length += segment.lengths[doc]
+            self.segments.append(segment)
+        self._maybe_merge()
+
+    def search(self, terms: Iterable[str], k: int = 50,
+               accept: Optional[Callable[[Any], bool]] = None) -> List[Tuple[float, Any]]:
+        """Return the k best (score, key) pairs for terms across all segments, best first."""
+        return top_k(self.scores(terms), k, accept)
+
+    def scores(self, terms: Iterable[str]) -> Dict[Any, float]:
+        """BM25 score of every live document matching any of terms, by key."""
+        with self._lock:
+            n = len(self.locations)
+            if not n:
+                return {}
+            segments = self.segments + [self.active]
+            average = self.total_length / n
+            scores: Dict[Any, float] = {}
+            for term in dict.fromkeys(terms):
+                df = self.df.get(term)
+                if not df:
+                    continue
+                weight = idf(n, df)
+                for segment in segments:
+                    segment.accumulate(scores, term, weight, average)
+        return scores
+
+    def merge(self) -> None:
+        """Fold sealed segments into one, dropping tombstoned documents.
+
+        The largest segment is left alone unless it carries too many
+        tombstones itself, so steady writes do not keep rewriting the bulk
+        of the index.
+        """
+        with self._lock:
+            sources = list(self.segments)
+            if len(sources) > 1:
+                largest = max(sources, key=lambda segment: len(segment.keys))
+                if len(largest.deleted) <= MAX_DELETED_RATIO * len(largest.keys):
+                    sources.remove(largest)
+            seen = [set(segment.deleted) for segment in sources]
+        if len(sources) < 2 and not any(seen):
+            return
+        merged = InvertedIndex()
+        moved: Dict[Tuple[int, int], int] = {}
+        for s, segment in enumerate(sources):
+            for doc, key in enumerate(segment.keys):
+                if doc in seen[s]:
+                    continue
+                moved[(s, doc)] = merged.add(key, self._tokens(segment, doc))
+        with self._lock:
+            # Carry over removals that happened while we were merging
+            for s, segment in enumerate(sources):
+                for doc in segment.deleted - seen[s]:
+                    if (s, doc) in moved:
+                        merged.delete(moved[(s, doc)])
+            for (s, doc), new_doc in moved.items():
+                key = sources[s].keys[doc]
+                if self.locations.get(key) == (sources[s], doc):
+                    self.locations[key] = (merged, new_doc)
+            remaining = [segment for segment in self.segments if all(segment is not s for s in sources)]
+            self.segments = remaining + [merged]
+
+    def _remove(self, key: Any) -> None:
+        location = self.locations.pop(key, None)
+        if location is None:
+            return
+        segment, doc = location
+        segment.delete(doc)
+        self.df.subtract(segment.terms[doc])
+        for term in segment.terms[doc]:
+            if self.df[term] <= 0:
+                del self.df[term]
+        self.total_length -= segment.lengths[doc]
+
+    @staticmethod
+    def _tokens(segment: InvertedIndex, doc: int) -> List[str]:
+        tokens = []
+        for term in segment.terms[doc]:
+            docs, tfs = segment.postings[term]
+            # Postings are in document order, so the entry can be found by bisection
+            tokens.extend([term] * tfs[bisect.bisect_left(docs, doc)])
+        return tokens
+
+    def _needs_merge(self) -> bool:
+        if len(self.segments) > self.max_segments:
+            return True
+        indexed = sum(len(segment.keys) for segment in self.segments)
+        deleted = sum(len(segment.deleted) for segment in self.segments)
+        return indexed > 0 and deleted / indexed > MAX_DELETED_RATIO
+
+    def _maybe_merge(self) -> None:
+        with self._lock:
+            if self._merging or not self._needs_merge():
+                return
+            self._merging = True
+        if self.background:
+            threading.Thread(target=self._run_merge, name='search-segment-merge', daemon=True).start()
+        else:
+            self._run_merge()
+
+    def _run_merge(self) -> None:
+        try:
+            self.merge()
+        except Exception as e:
+            print(f"Error merging search segments: {str(e)}")
+        finally:
+            with self._lock:
+                self._merging = False
@@ -0,0 +1,147 @@
+import bisect
+import heapq
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Tuple
+
+# Collection -> [(suggestion kind, record field)]; list fields contribute one phrase per item
+SUGGEST_FIELDS = {
+    'tasks': [('task', 'title'), ('stakeholder', 'stakeholders'), ('tag', 'tags')],
+    'sources': [('source', 'title'), ('tag', 'tags')],
+}
+
+DEFAULT_SUGGESTIONS = 10
+MAX_SUGGESTIONS = 50
+# How many prefixes keep their completions cached between changes
+CACHE_SIZE = 1024
+
+_WORD_START = re.compile(r'(?<!\w)\w', re.UNICODE)
+
+
+def record_phrases(name: str, record: Any) -> List[Tuple[str, str]]:
+    """(kind, phrase) pairs a record contributes to autocomplete."""
+    phrases = []
+    if isinstance(record, dict):
+        for kind, field in SUGGEST_FIELDS.get(name, []):
+            value = record.get(field)
+            values = value if isinstance(value, (list, tuple)) else [value]
+            for item in values:
+                if isinstance(item, str) and item.strip():
+                    phrases.append((kind, ' '.join(item.split())))
+    return phrases
+
+
+class Suggester:
+    """Frequency-weighted prefix completion over short phrases.
+
+    Every word start of every phrase is kept in one sorted array, so the
+    completions of a prefix are a contiguous run found by binary search;
+    typing "payme" finds "Digital Payment Adoption" as well as "payments".
+    A phrase's weight is how many records use it. The top completions per
+    prefix are cached until a change touches a phrase that prefix matches.
+    """
+
+    def __init__(self):
+        self.entries: List[Tuple[str, str, str]] = []
+        self.weights: Dict[Tuple[str, str], int] = {}
+        self.display: Dict[Tuple[str, str], str] = {}
+        self._cache: 'OrderedDict[Tuple[str, int], List[Dict[str, Any]]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.weights)
+
+    def load(self, phrases: Iterable[Tuple[str, str]]) -> None:
+        """Add many phrases at once, sorting the array a single time."""
+        with self._lock:
+            for kind, phrase in phrases:
+                entry = (kind, phrase.lower())
+                if entry in self.weights:
+                    self.weights[entry] += 1
+                else:
+                    self.weights[entry] = 1
+                    self.display[entry] = phrase
+                    self.entries.extend(self._fragments(*entry))
+            self.entries.sort()
+            self._cache.clear()
+
+    def add(self, phrases: Iterable[Tuple[str, str]]) -> None:
+        with self._lock:
+            changed = []
+            for kind, phrase in phrases:
+                entry = (kind, phrase.lower())
+                fragments = self._fragments(*entry)
+                changed.extend(fragments)
+                if entry in self.weights:
+                    self.weights[entry] += 1
+                    continue
+                self.weights[entry] = 1
+                self.display[entry] = phrase
+                for fragment in fragments:
+                    bisect.insort(self.entries, fragment)
+            self._invalidate(changed)
+
+    def remove(self, phrases: Iterable[Tuple[str, str]]) -> None:
+        with self._lock:
+            changed = []
+            for kind, phrase in phrases:
+                entry = (kind, phrase.lower())
+                weight = self.weights.get(entry)
+                if weight is None:
+                    continue
+                fragments = self._fragments(*entry)
+                changed.extend(fragments)
+                if weight > 1:
+                    self.weights[entry] = weight - 1
+                    continue
+                del self.weights[entry]
+                del self.display[entry]
+                for fragment in fragments:
+                    i = bisect.bisect_left(self.entries, fragment)
+                    if i < len(self.entries) and self.entries[i] == fragment:
+                        del self.entries[i]
+            self._invalidate(changed)
+
+    def suggest(self, prefix: str, limit: int = DEFAULT_SUGGESTIONS) -> List[Dict[str, Any]]:
+        """Top completions of prefix as {text, kind, weight}: heaviest first, then phrase starts."""
+        prefix = ' '.join(prefix.lower().split())
+        if not prefix:
+            return []
+        cache_key = (prefix, limit)
+        with self._lock:
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                self._cache.move_to_end(cache_key)
+                return cached
+            # (kind, phrase) -> whether the prefix matched the start of the phrase
+            matches: Dict[Tuple[str, str], bool] = {}
+            entries = self.entries
+            i = bisect.bisect_left(entries, (prefix,))
+            while i < len(entries) and entries[i][0].startswith(prefix):
+                fragment, kind, phrase = entries[i]
+                entry = (kind, phrase)
+                matches[entry] = matches.get(entry, False) or fragment == phrase
+                i += 1
+            top = heapq.nlargest(limit, matches.items(),
+                                 key=lambda item: (self.weights[item[0]], item[1], -len(item[0][1])))
+            results = [{'text': self.display[entry], 'kind': entry[0], 'weight': self.weights[entry]}
+                       for entry, _ in top]
+            self._cache[cache_key] = results
+            if len(self._cache) > CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return results
+
+    def _invalidate(self, fragments: List[Tuple[str, str, str]]) -> None:
+        """Forget cached completions for prefixes of the changed fragments."""
+        if not fragments or not self._cache:
+            return
+        for cache_key in list(self._cache):
+            prefix = cache_key[0]
+            if any(fragment.startswith(prefix) for fragment, _, _ in fragments):
+                del self._cache[cache_key]
+
+    @staticmethod
+    def _fragments(kind: str, phrase: str) -> List[Tuple[str, str, str]]:
+        starts = dict.fromkeys(match.start() for match in _WORD_START.finditer(phrase))
+        return [(phrase[start:], kind, phrase) for start in starts]
@@ -0,0 +1,220 @@
+import atexit
+import json
+import math
+import os
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional
+
+from search.tokenizer import field_text, tokenize
+from storage.json_backend import DATA_DIR, write_json_atomic
+
+# Collections that make up the corpus and the fields of each that are counted
+TFIDF_FIELDS = {
+    'sources': ('title', 'description', 'tags'),
+    'tasks': ('title', 'description', 'tags'),
+}
+
+MODEL_PATH = os.path.join(DATA_DIR, '.tfidf.json')
+# Persist changed document frequencies at most this often (and at exit)
+PERSIST_INTERVAL = 30
+
+
+def idf(n: int, df: int) -> float:
+    """Smoothed inverse document frequency; always >= 1, also for unseen terms."""
+    return math.log((1 + n) / (1 + df)) + 1
+
+
+def record_text(name: str, record: Any) -> str:
+    if not isinstance(record, dict):
+        return ''
+    return ' '.join(field_text(record.get(field)) for field in TFIDF_FIELDS[name])
+
+
+def record_terms(name: str, record: Any) -> Counter:
+    return Counter(tokenize(record_text(name, record)))
+
+
+def term_weight(tf: int) -> float:
+    """Sublinear term frequency, so one repeated word cannot dominate a document."""
+    return 1 + math.log(tf)
+
+
+class TfidfModel:
+    """Corpus-wide TF-IDF weights shared by the source matcher and the deliverable engine.
+
+    Document frequencies are counted over sources and tasks, persisted to
+    MODEL_PATH together with the collection versions they were counted at,
+    and reused on start-up while those versions still match. Writes through
+    the store update them incrementally (only the changed records are
+    re-tokenized); anything else triggers a recount of that collection.
+    Documents become L2-normalized sparse vectors ({term: weight}), so
+    cosine similarity is a plain dot product.
+    """
+
+    def __init__(self, store, path: str = MODEL_PATH):
+        self.store = store
+        self.path = path
+        self.df: Dict[str, Counter] = {name: Counter() for name in TFIDF_FIELDS}
+        self.documents: Dict[str, int] = {name: 0 for name in TFIDF_FIELDS}
+        # Document frequencies summed over all collections
+        self.total_df: Counter = Counter()
+        # Bumped whenever document frequencies change, so derived weights know to recompute
+        self.generation = 0
+        self._stamps: Dict[str, Any] = {}
+        self._persisted = self._read()
+        self._dirty = False
+        self._saved_at = 0.0
+        self._lock = threading.RLock()
+        store.add_listener(self._on_write)
+        atexit.register(self.save)
+
+    @property
+    def total_documents(self) -> int:
+        return sum(self.documents.values())
+
+    def document_frequency(self, term: str) -> int:
+        return self.total_df.get(term, 0)
+
+    def refresh(self) -> None:
+        """Bring the document frequencies up to date with the store."""
+        for name in TFIDF_FIELDS:
+            self._refresh(name)
+        self._maybe_save()
+
+    def vector(self, terms: Counter, refresh: bool = True) -> Dict[str, float]:
+        """Normalized TF-IDF vector of a bag of terms (refresh=False skips checking the store)."""
+        if refresh:
+            self.refresh()
+        with self._lock:
+            n, df = self.total_documents, self.total_df
+            weights = {term: term_weight(tf) * idf(n, df.get(term, 0)) for term, tf in terms.items()}
+        norm = math.sqrt(sum(weight * weight for weight in weights.values()))
+        return {term: weight / norm for term, weight in weights.items()} if norm else {}
+
+    def text_vector(self, text: str, refresh: bool = True) -> Dict[str, float]:
+        return self.vector(Counter(tokenize(text)), refresh)
+
+    def record_vector(self, name: str, record: Any, refresh: bool = True) -> Dict[str, float]:
+        return self.vector(record_terms(name, record), refresh)
+
+    def similarity(self, text1: str, text2: str, refresh: bool = True) -> float:
+        """Cosine similarity of two texts under the corpus weights.
+
+        Pass refresh=False when comparing many pairs after one refresh().
+        """
+        if refresh:
+            self.refresh()
+        return cosine(self.text_vector(text1, refresh=False), self.text_vector(text2, refresh=False))
+
+    def idf_weights(self, terms: Iterable[str]) -> List[float]:
+        """idf of each term, in order (for building weight arrays)."""
+        with self._lock:
+            n, df = self.total_documents, self.total_df
+            return [idf(n, df.get(term, 0)) for term in terms]
+
+    def save(self) -> None:
+        """Persist the document frequencies and the collection versions they match."""
+        with self._lock:
+            if not self._dirty:
+                return
+            versions = {}
+            for name in TFIDF_FIELDS:
+                # The version the counts were computed at, not whatever is current by now
+                version = self.store.version_at(name, self._stamps[name]) if name in self._stamps else None
+                if version is None:
+                    return
+                versions[name] = list(version)
+            data = {
+                'versions': versions,
+                'documents': dict(self.documents),
+                'df': {name: dict(df) for name, df in self.df.items()},
+            }
+            self._dirty = False
+            self._saved_at = time.time()
+        try:
+            write_json_atomic(self.path, data, durable=False)
+        except Exception as e:
+            print(f"Error saving TF-IDF model: {str(e)}")
+
+    def _refresh(self, name: str) -> None:
+        with self._lock:
+            try:
+                stamp, records = self.store.snapshot(name)
+            except FileNotFoundError:
+                stamp, records = None, []
+            if name in self._stamps and stamp == self._stamps[name]:
+                return
+            changes = self.store.changes_since(name, self._stamps[name]) if name in self._stamps else None
+            if changes is not None:
+                for change in changes:
+                    if change.old is not None:
+                        self._count(name, change.old, -1)
+                    self._count(name, change.new, 1)
+                self._dirty = True
+            elif not self._adopt_persisted(name, stamp):
+                self._recount(name, records)
+                self._dirty = True
+            self._stamps[name] = stamp
+            self.generation += 1
+
+    def _count(self, name: str, record: Any, sign: int) -> None:
+        for term in record_terms(name, record):
+            for df in (self.df[name], self.total_df):
+                df[term] += sign
+                if df[term] <= 0:
+                    del df[term]
+        self.documents[name] += sign
+
+    def _recount(self, name: str, records: Any) -> None:
+        df = Counter()
+        documents = 0
+        for record in records:
+            if isinstance(record, dict):
+                df.update(record_terms(name, record).keys())
+                documents += 1
+        self._replace(name, df, documents)
+
+    def _adopt_persisted(self, name: str, stamp: Any) -> bool:
+        persisted = self._persisted
+        if not persisted or name not in persisted.get('df', {}):
+            return False
+        version = self.store.version_at(name, stamp)
+        if version is None or persisted.get('versions', {}).get(name) != list(version):
+            return False
+        self._replace(name, Counter(persisted['df'][name]), persisted['documents'][name])
+        return True
+
+    def _replace(self, name: str, df: Counter, documents: int) -> None:
+        self.total_df.subtract(self.df[name])
+        self.total_df.update(df)
+        self.total_df = +self.total_df
+        self.df[name] = df
+        self.documents[name] = documents
+
+    def _read(self) -> Optional[dict]:
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Error loading TF-IDF model: {str(e)}")
+            return None
+
+    def _maybe_save(self) -> None:
+        if self._dirty and time.time() - self._saved_at >= PERSIST_INTERVAL:
+            self.save()
+
+    def _on_write(self, name: str) -> None:
+        if name in TFIDF_FIELDS:
+            self._refresh(name)
+            self._maybe_save()
+
+
+def cosine(vector1: Dict[str, float], vector2: Dict[str, float]) -> float:
+    """Dot product of two normalized sparse vectors."""
+    if len(vector1) > len(vector2):
+        vector1, vector2 = vector2, vector1
+    return sum(weight * vector2.get(term, 0.0) for term, weight in vector1.items())
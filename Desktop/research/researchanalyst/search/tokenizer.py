@@ -0,0 +1,28 @@
+import re
+from typing import Any, List
+
+_TOKEN = re.compile(r'\w+', re.UNICODE)
+
+# Very common English words that only bloat postings lists
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have in into is it its of on or that the their this to was
+were will with
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens of text, without stopwords or lone underscores."""
+    return [token for token in _TOKEN.findall(text.lower()) if token not in STOPWORDS and token != '_']
+
+
+def field_text(value: Any) -> str:
+    """Flatten a record field (string, list of strings, nested values) into plain text."""
+    if value is None:
+        return ''
+    if isinstance(value, str):
+        return value
+    if isinstance(value, dict):
+        return ' '.join(field_text(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return ' '.join(field_text(v) for v in value)
+    return str(value)
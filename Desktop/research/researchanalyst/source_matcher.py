@@ -1,56 +1,501 @@
+import hashlib
 import json
-from datetime import datetime
-from typing import List, Dict, Any
+import threading
+import time
+from collections import Counter, OrderedDict
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, Tuple
 
-DATA_PATH = 'data/sources.json'
+from search import get_lsh_index, get_tfidf_model
+from search.tfidf import cosine, record_terms, term_weight
+from storage import FrozenList, freeze, get_store
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the pure-Python scorer below is used without it
+    np = None
+
+# Relevance = TF-IDF cosine * TEXT_WEIGHT + freshness * FRESHNESS_WEIGHT; unparseable dates count as this old
+TEXT_WEIGHT = 0.7
+FRESHNESS_WEIGHT = 0.3
+UNKNOWN_AGE_DAYS = 999
+
+# From this many sources on, a task whose terms' postings exceed LSH_MIN_POSTINGS entries (common words
+# in a large corpus) scores only its LSH candidates, if reading those is cheaper; exact=True scores all
+LSH_MIN_SOURCES = 20000
+LSH_MIN_POSTINGS = 50000
+
+# How many (task, sources version, top_n) suggestion lists are kept
+SUGGESTION_CACHE_SIZE = 512
+
+_EPOCH = datetime(1970, 1, 1)
+_DAY_US = 86400 * 10 ** 6
 
 
 def load_sources() -> List[Dict[str, Any]]:
-    with open(DATA_PATH, 'r') as f:
-        return json.load(f)
+    return get_store().load('sources', writable=True)
 
 def save_sources(sources: List[Dict[str, Any]]):
-    with open(DATA_PATH, 'w') as f:
-        json.dump(sources, f, indent=2)
+    get_store().save('sources', sources)
+
+def freshness_timestamp(source: Dict[str, Any]) -> Optional[int]:
+    """Microseconds since the epoch of a source's freshness date, or None if it cannot be used."""
+    try:
+        freshness = datetime.fromisoformat(source['freshness'].replace('Z',''))
+    except Exception:
+        return None
+    # Offset-aware dates cannot be compared with utcnow(); the scorer has always treated them as unknown
+    if freshness.tzinfo is not None:
+        return None
+    return (freshness - _EPOCH) // timedelta(microseconds=1)
+
+def task_hash(task: Dict[str, Any]) -> str:
+    """Digest of the task fields matching depends on."""
+    fields = [task.get('tags', []), task.get('title', ''), task.get('description', '')]
+    return hashlib.sha1(json.dumps(fields, sort_keys=True, default=str).encode('utf-8')).hexdigest()
 
-def match_sources_to_task(task: Dict[str, Any], sources: List[Dict[str, Any]], top_n: int = 5) -> List[Dict[str, Any]]:
+def scored(source: Dict[str, Any], relevance: float) -> Dict[str, Any]:
+    """A shallow copy of source carrying its relevance_score; the source itself is left alone."""
+    return dict(source, relevance_score=round(relevance, 2))
+
+def match_sources_to_task(task: Dict[str, Any], sources: List[Dict[str, Any]], top_n: int = 5,
+                          exact: bool = False) -> List[Dict[str, Any]]:
     """
-    Match sources to a task using tag overlap, media type, and freshness.
-    Returns a ranked list of sources with updated relevance_score.
+    Match sources to a task using TF-IDF similarity of their text and freshness.
+    Returns ranked copies of the top sources with relevance_score set;
+    the given sources are not modified. Large store views are narrowed to
+    LSH candidates first unless exact is set.
     """
-    task_tags = set(task.get('tags', []) + task.get('title', '').lower().split() + task.get('description', '').lower().split())
+    if np is not None and sources:
+        return match_sources_to_tasks([task], sources, top_n, exact)[0]
+    model = get_tfidf_model()
+    model.refresh()
+    task_vector = model.record_vector('tasks', task, refresh=False)
     now = datetime.utcnow()
     matches = []
     for source in sources:
-        source_tags = set(source.get('tags', []))
-        tag_overlap = len(task_tags & source_tags)
+        similarity = cosine(task_vector, model.record_vector('sources', source, refresh=False)) if task_vector else 0.0
         # Freshness: newer is better
         try:
             freshness_days = (now - datetime.fromisoformat(source['freshness'].replace('Z',''))).days
         except Exception:
-            freshness_days = 999
+            freshness_days = UNKNOWN_AGE_DAYS
         freshness_score = max(0, 1 - freshness_days / 365)
-        # Simple relevance: tag overlap + freshness
-        relevance = tag_overlap * 0.7 + freshness_score * 0.3
-        source['relevance_score'] = round(relevance, 2)
+        relevance = similarity * TEXT_WEIGHT + freshness_score * FRESHNESS_WEIGHT
         matches.append((relevance, source))
     matches.sort(reverse=True, key=lambda x: x[0])
-    return [m[1] for m in matches[:top_n]]
+    return [scored(source, relevance) for relevance, source in matches[:top_n]]
+
+def match_sources_to_tasks(tasks: List[Dict[str, Any]], sources: List[Dict[str, Any]], top_n: int = 5,
+                           exact: bool = False) -> List[List[Dict[str, Any]]]:
+    """Match_sources_to_task for many tasks at once, scoring the whole batch in one pass when NumPy is available."""
+    if np is None or not sources:
+        return [match_sources_to_task(task, sources, top_n) for task in tasks]
+    return SourceMatrix.for_sources(sources).top_sources_batch(tasks, top_n, approximate=not exact)
+
+def lsh_index_for(sources: List[Dict[str, Any]]):
+    """The shared LSH index if it covers exactly these sources and they are many enough to need it."""
+    if np is None or len(sources) < LSH_MIN_SOURCES or not isinstance(sources, FrozenList):
+        return None
+    index = get_lsh_index()
+    return index if index.covers(sources) else None
+
+
+class SourceMatrix:
+    """Sources encoded once for vectorized scoring with NumPy.
+
+    Source texts (title, description, tags) become a sparse source x term
+    matrix of sublinear term frequencies, kept column-wise (term -> sources
+    that contain it), and freshness dates a vector of timestamps. The
+    TF-IDF weights and row norms are derived from it with NumPy whenever
+    the shared model's document frequencies change, so the term counts
+    are only tokenized once. Scoring a task takes the dot product of its
+    normalized vector with the columns of its terms, which only touches
+    the sources sharing a term with it. When those columns are long, an
+    LSH index can narrow the sources to candidates, which are then scored
+    exactly from the row-wise view. Every other source scores on
+    freshness alone, so only the freshest few of those can place and they
+    come from a precomputed order. An argpartition top-k then picks the
+    winners, earlier sources first among equal scores, as in the
+    pure-Python loop in match_sources_to_task.
+    """
+
+    _cached: Optional['SourceMatrix'] = None
+
+    def __init__(self, sources: List[Dict[str, Any]]):
+        self.sources = sources
+        self.model = get_tfidf_model()
+        self.vocabulary: Dict[str, int] = {}
+        indices, frequencies, indptr, timestamps = [], [], [0], []
+        for source in sources:
+            for term, tf in record_terms('sources', source).items():
+                indices.append(self.vocabulary.setdefault(term, len(self.vocabulary)))
+                frequencies.append(term_weight(tf))
+            indptr.append(len(indices))
+            timestamps.append(freshness_timestamp(source))
+        indices = np.array(indices, dtype=np.int64)
+        rows = np.repeat(np.arange(len(sources)), np.diff(np.array(indptr, dtype=np.int64)))
+        # Column-wise (CSC) view: the sources of term c are column_rows[column_ptr[c]:column_ptr[c + 1]]
+        # Row-wise (CSR) view: the terms of source r are row_columns[row_ptr[r]:row_ptr[r + 1]]
+        self.row_ptr = np.array(indptr, dtype=np.int64)
+        self.row_columns = indices
+        order = np.argsort(indices, kind='stable')
+        self._order = order
+        self.column_rows = rows[order]
+        self.column_tf = np.array(frequencies, dtype=np.float64)[order]
+        self.column_ptr = np.searchsorted(indices[order], np.arange(len(self.vocabulary) + 1))
+        self.known = np.array([ts is not None for ts in timestamps], dtype=bool)
+        self.timestamps = np.array([ts if ts is not None else 0 for ts in timestamps], dtype=np.int64)
+        self._weights: Optional['np.ndarray'] = None
+        self._row_weights: Optional['np.ndarray'] = None
+        self._generation = None
+
+    @classmethod
+    def for_sources(cls, sources: List[Dict[str, Any]]) -> 'SourceMatrix':
+        """Encoded form of sources; a read-only store view is encoded once and reused."""
+        if not isinstance(sources, FrozenList):
+            return cls(sources)
+        cached = cls._cached
+        if cached is None or cached.sources is not sources:
+            cached = cls._cached = cls(sources)
+        return cached
+
+    def weights(self) -> 'np.ndarray':
+        """Normalized TF-IDF weight of every stored (source, term) entry, in column order (refreshes the model)."""
+        self.model.refresh()
+        if self._weights is None or self._generation != self.model.generation:
+            self._generation = self.model.generation
+            idf = np.array(self.model.idf_weights(self.vocabulary), dtype=np.float64)
+            values = self.column_tf * np.repeat(idf, np.diff(self.column_ptr))
+            norms = np.sqrt(np.bincount(self.column_rows, weights=values * values, minlength=len(self.sources)))
+            self._weights = values / np.where(norms > 0, norms, 1.0)[self.column_rows]
+            self._row_weights = np.empty_like(self._weights)
+            self._row_weights[self._order] = self._weights
+        return self._weights
+
+    def freshness_scores(self, now: Optional[datetime] = None) -> 'np.ndarray':
+        now_us = ((now or datetime.utcnow()) - _EPOCH) // timedelta(microseconds=1)
+        # Whole days like timedelta.days (floored), 999 where the date was unusable
+        days = np.where(self.known, (now_us - self.timestamps) // _DAY_US, UNKNOWN_AGE_DAYS)
+        return np.maximum(0, 1 - days / 365)
+
+    def query(self, task: Dict[str, Any]) -> Tuple[Counter, List[Tuple[int, float]], int]:
+        """(task terms, (column, weight) of each known term, postings entries those columns hold)."""
+        terms = record_terms('tasks', task)
+        task_vector = self.model.vector(terms, refresh=False)
+        columns = [(self.vocabulary[term], weight) for term, weight in task_vector.items() if term in self.vocabulary]
+        postings = sum(int(self.column_ptr[c + 1] - self.column_ptr[c]) for c, _ in columns)
+        return terms, columns, postings
+
+    def similarity(self, task: Dict[str, Any], weights: 'np.ndarray',
+                   approximate: bool = False) -> Tuple['np.ndarray', 'np.ndarray']:
+        """(source indices, cosine similarity) for the sources sharing at least one term with task, by index.
+
+        With approximate set and more than LSH_MIN_POSTINGS postings to read,
+        only the LSH index's candidates are scored (when their rows are shorter).
+        """
+        terms, columns, postings = self.query(task)
+        if not columns:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float64)
+        lsh = lsh_index_for(self.sources) if approximate and postings > LSH_MIN_POSTINGS else None
+        if lsh is not None:
+            rows = lsh.candidates(terms)
+            rows = rows[rows < len(self.sources)]
+            if int((self.row_ptr[rows + 1] - self.row_ptr[rows]).sum()) < postings:
+                return self._row_similarity(columns, rows)
+        slices = [slice(self.column_ptr[c], self.column_ptr[c + 1]) for c, _ in columns]
+        touched = np.concatenate([self.column_rows[s] for s in slices])
+        products = np.concatenate([weights[s] * weight for s, (_, weight) in zip(slices, columns)])
+        rows, inverse = np.unique(touched, return_inverse=True)
+        return rows, np.bincount(inverse, weights=products, minlength=len(rows))
+
+    def _row_similarity(self, columns: List[Tuple[int, float]], rows: 'np.ndarray') -> Tuple['np.ndarray', 'np.ndarray']:
+        query = np.zeros(len(self.vocabulary))
+        query[[c for c, _ in columns]] = [weight for _, weight in columns]
+        lengths = self.row_ptr[rows + 1] - self.row_ptr[rows]
+        entries = np.repeat(self.row_ptr[rows] - (np.cumsum(lengths) - lengths), lengths) + np.arange(lengths.sum())
+        owners = np.repeat(np.arange(len(rows)), lengths)
+        products = self._row_weights[entries] * query[self.row_columns[entries]]
+        similarity = np.bincount(owners, weights=products, minlength=len(rows))
+        keep = similarity > 0
+        return rows[keep], similarity[keep]
+
+    def top_indices_batch(self, tasks: List[Dict[str, Any]], top_n: int = 5, now: Optional[datetime] = None,
+                          approximate: bool = False) -> List[List[Tuple[int, float]]]:
+        """For each task, the (source index, relevance) pairs of its top_n sources, best first."""
+        n = len(self.sources)
+        weights = self.weights()
+        freshness = self.freshness_scores(now)
+        freshest = np.argsort(-freshness, kind='stable') if 0 <= top_n < n else None
+        seen = np.zeros(n, dtype=bool)
+        results = []
+        for task in tasks:
+            touched, similarity = self.similarity(task, weights, approximate)
+            if freshest is not None:
+                # Sources sharing no term score on freshness alone: only the freshest top_n of them can place
+                seen[touched] = True
+                extra = freshest[:top_n + len(touched)]
+                extra = extra[~seen[extra]][:top_n]
+                seen[touched] = False
+                candidates = np.concatenate([touched, extra])
+                text = np.concatenate([similarity, np.zeros(len(extra))])
+                order = np.argsort(candidates, kind='stable')
+                candidates, text = candidates[order], text[order]
+            else:
+                candidates = np.arange(n)
+                text = np.zeros(n)
+                text[touched] = similarity
+            relevance = text * TEXT_WEIGHT + freshness[candidates] * FRESHNESS_WEIGHT
+            results.append([(int(candidates[i]), float(relevance[i])) for i in _top_k(relevance, top_n)])
+        return results
+
+    def top_sources(self, task: Dict[str, Any], top_n: int = 5) -> List[Dict[str, Any]]:
+        return self.top_sources_batch([task], top_n)[0]
+
+    def top_sources_batch(self, tasks: List[Dict[str, Any]], top_n: int = 5,
+                          approximate: bool = False) -> List[List[Dict[str, Any]]]:
+        return [[scored(self.sources[i], relevance) for i, relevance in ranked]
+                for ranked in self.top_indices_batch(tasks, top_n, approximate=approximate)]
+
+
+def _top_k(scores: 'np.ndarray', top_n: int) -> List[int]:
+    """Indices of the top_n scores, highest first, earlier indices first among equal scores."""
+    n = len(scores)
+    k = len(range(n)[:top_n])
+    if k == 0:
+        return []
+    if k < n:
+        threshold = scores[np.argpartition(-scores, k - 1)[k - 1]]
+        above = np.flatnonzero(scores > threshold)
+        tied = np.flatnonzero(scores == threshold)[:k - len(above)]
+        candidates = np.concatenate([above, tied])
+    else:
+        candidates = np.arange(n)
+    order = np.lexsort((candidates, -scores[candidates]))
+    return candidates[order].tolist()
+
+class SuggestionCache:
+    """LRU of suggested-source lists keyed by (task hash, sources version, top_n).
+
+    Matching never mutates its inputs, so a result depends only on the key
+    and can be shared; cached lists are read-only. Entries are dropped on
+    any write to sources or tasks, and the key's sources version keeps
+    writes from other processes from being served stale.
+    """
+
+    def __init__(self, store, max_size: int = SUGGESTION_CACHE_SIZE):
+        self.store = store
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries: 'OrderedDict[tuple, List[Dict[str, Any]]]' = OrderedDict()
+        self._lock = threading.Lock()
+        store.add_listener(self._on_write)
+
+    def suggest(self, task: Dict[str, Any], top_n: int = 5) -> List[Dict[str, Any]]:
+        version = self.store.version('sources')
+        key = (task_hash(task), version, top_n)
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cached
+            self.misses += 1
+        result = freeze(match_sources_to_task(task, self.store.load('sources'), top_n))
+        if version is not None:
+            with self._lock:
+                self._entries[key] = result
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+        return result
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'invalidations': self.invalidations,
+            }
+
+    def _on_write(self, name: str) -> None:
+        if name in ('sources', 'tasks'):
+            self.invalidate()
+
+
+_suggestion_cache: Optional[SuggestionCache] = None
+_suggestion_cache_lock = threading.Lock()
+
+def get_suggestion_cache() -> SuggestionCache:
+    global _suggestion_cache
+    with _suggestion_cache_lock:
+        if _suggestion_cache is None:
+            _suggestion_cache = SuggestionCache(get_store())
+        return _suggestion_cache
+
+def suggest_sources(task: Dict[str, Any], top_n: int = 5) -> List[Dict[str, Any]]:
+    """Top sources for a task, memoized until sources or tasks change."""
+    return get_suggestion_cache().suggest(task, top_n)
+
+def suggestion_cache_stats() -> Dict[str, Any]:
+    return get_suggestion_cache().stats()
 
 def assign_sources_to_task(task_id: str, task: Dict[str, Any]):
     """
-    Assign top-matched sources to a task and update sources.json.
+    Assign top-matched sources to a task and persist the changed sources.
     """
-    sources = load_sources()
-    matched = match_sources_to_task(task, sources)
+    matched = match_sources_to_task(task, get_store().load('sources'))
+    store = get_store()
     for source in matched:
-        if 'assigned_tasks' not in source:
-            source['assigned_tasks'] = []
-        if task_id not in source['assigned_tasks']:
-            source['assigned_tasks'].append(task_id)
-    save_sources(sources)
+        assigned = list(source.get('assigned_tasks') or [])
+        if task_id not in assigned:
+            source['assigned_tasks'] = assigned + [task_id]
+            # Only the newly assigned sources are written back
+            store.upsert('sources', source)
     return matched
 
+def assign_sources_to_tasks(task_ids: Optional[List[str]] = None, top_n: int = 5, dry_run: bool = False) -> Dict[str, Any]:
+    """
+    Assign top-matched sources to many tasks (all tasks when task_ids is None).
+    All tasks are scored against the sources in one batch, assigned_tasks is
+    updated in memory and the sources collection is written once. With
+    dry_run nothing is written. Returns a report of the new assignments.
+    """
+    started = time.perf_counter()
+    store = get_store()
+    tasks = store.load('tasks')
+    if task_ids is not None:
+        by_id = {}
+        for task in tasks:
+            by_id.setdefault(task.get('id'), task)
+        missing = [task_id for task_id in task_ids if task_id not in by_id]
+        tasks = [by_id[task_id] for task_id in dict.fromkeys(task_ids) if task_id in by_id]
+    else:
+        missing = []
+        tasks = [task for task in tasks if task.get('id')]
+    sources = store.load('sources')
+    position = {}
+    for i, source in enumerate(sources):
+        position.setdefault(source.get('id'), i)
+
+    # source position -> assigned_tasks after this run, for the sources that change
+    updated: Dict[int, List[str]] = {}
+    changes = []
+    for task, matched in zip(tasks, match_sources_to_tasks(tasks, sources, top_n)):
+        new_sources = []
+        for source in matched:
+            i = position.get(source.get('id'))
+            if i is None:
+                continue
+            assigned = updated.get(i)
+            if assigned is None:
+                assigned = list(sources[i].get('assigned_tasks') or [])
+            if task['id'] not in assigned:
+                updated[i] = assigned + [task['id']]
+                new_sources.append(source['id'])
+        if new_sources:
+            changes.append({'task_id': task['id'], 'source_ids': new_sources})
+
+    if updated and not dry_run:
+        records = list(sources)
+        for i, assigned in updated.items():
+            records[i] = dict(records[i], assigned_tasks=assigned)
+        store.save('sources', records)
+    return {
+        'dry_run': dry_run,
+        'tasks': len(tasks),
+        'sources': len(sources),
+        'assignments': sum(len(change['source_ids']) for change in changes),
+        'sources_changed': len(updated),
+        'missing_tasks': missing,
+        'changes': changes,
+        'elapsed_seconds': round(time.perf_counter() - started, 3),
+    }
+
+def measure_recall(task_ids: Optional[List[str]] = None, top_n: int = 5) -> Dict[str, Any]:
+    """
+    Compare LSH-narrowed matching with exact scoring over the stored sources.
+    recall is the share of the exact top_n sources that the LSH path also
+    returns. lsh_tasks counts the tasks whose postings were long enough for
+    the LSH path and mean_candidates the sources it scored for each of them.
+    """
+    store = get_store()
+    tasks = [task for task in store.load('tasks') if task_ids is None or task.get('id') in task_ids]
+    sources = store.load('sources')
+    started = time.perf_counter()
+    exact = match_sources_to_tasks(tasks, sources, top_n, exact=True)
+    exact_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    approximate = match_sources_to_tasks(tasks, sources, top_n)
+    lsh_seconds = time.perf_counter() - started
+    expected = sum(len(ranked) for ranked in exact)
+    found = sum(len({s['id'] for s in a} & {s['id'] for s in b}) for a, b in zip(exact, approximate))
+    candidates = []
+    lsh = lsh_index_for(sources)
+    if lsh is not None:
+        matrix = SourceMatrix.for_sources(sources)
+        for task in tasks:
+            terms, _, postings = matrix.query(task)
+            if postings > LSH_MIN_POSTINGS:
+                candidates.append(len(lsh.candidates(terms)))
+    return {
+        'tasks': len(tasks),
+        'sources': len(sources),
+        'top_n': top_n,
+        'lsh_tasks': len(candidates),
+        'recall': round(found / expected, 4) if expected else 1.0,
+        'mean_candidates': round(sum(candidates) / len(candidates), 1) if candidates else None,
+        'exact_seconds': round(exact_seconds, 3),
+        'lsh_seconds': round(lsh_seconds, 3),
+    }
+
 # Example usage:
 # task = {"id": "task-021", "title": "New Task Title", "description": "Research ...", "tags": ["payments", "AI"]}
-# assign_sources_to_task(task['id'], task) 
\ No newline at end of file
+# assign_sources_to_task(task['id'], task)
+
+# python source_matcher.py [--dry-run] [--top-n N] [task_id ...]
+#   assign the best sources to the given tasks (all tasks by default) in one pass
+# python source_matcher.py --recall [--top-n N] [task_id ...]
+#   measure how many of the exact top sources the LSH candidates keep
+if __name__ == "__main__":
+    import sys
+
+    args = sys.argv[1:]
+    dry_run = '--dry-run' in args
+    recall = '--recall' in args
+    args = [arg for arg in args if arg not in ('--dry-run', '--recall')]
+    top_n = 5
+    if '--top-n' in args:
+        at = args.index('--top-n')
+        try:
+            top_n = int(args[at + 1])
+        except (IndexError, ValueError):
+            print("Usage: python source_matcher.py [--dry-run | --recall] [--top-n N] [task_id ...]")
+            sys.exit(1)
+        del args[at:at + 2]
+
+    if recall:
+        report = measure_recall(args or None, top_n=top_n)
+        print(f"Recall@{top_n}: {report['recall']} over {report['tasks']} tasks; "
+              f"{report['lsh_tasks']} used LSH, scoring {report['mean_candidates']} of {report['sources']} sources each "
+              f"(exact {report['exact_seconds']}s, LSH {report['lsh_seconds']}s)")
+        sys.exit(0)
+
+    report = assign_sources_to_tasks(args or None, top_n=top_n, dry_run=dry_run)
+    for change in report['changes']:
+        print(f"  {change['task_id']}: +{', '.join(change['source_ids'])}")
+    for task_id in report['missing_tasks']:
+        print(f"  {task_id}: not found")
+    verb = "Would assign" if dry_run else "Assigned"
+    print(f"{verb} {report['assignments']} sources across {len(report['changes'])} of {report['tasks']} tasks "
+          f"({report['sources_changed']} sources changed) in {report['elapsed_seconds']}s") 
\ No newline at end of file
@@ -0,0 +1,59 @@
+# Storage layer for the research analyst collections
+import os
+import threading
+from typing import Optional
+
+from storage.blobs import BlobStore
+from storage.frozen import FrozenDict, FrozenList, freeze, thaw
+from storage.json_backend import DATA_DIR, JsonBackend
+from storage.repository import Repository
+from storage.sqlite_backend import SqliteBackend
+from storage.store import Store
+from storage.versions import VersionConflict, VersionedCollection
+
+__all__ = ['BlobStore', 'FrozenDict', 'FrozenList', 'freeze', 'thaw', 'JsonBackend', 'SqliteBackend',
+           'Store', 'Repository', 'VersionConflict', 'VersionedCollection', 'create_backend',
+           'get_store', 'get_repository', 'get_blob_store']
+
+_store: Optional[Store] = None
+_repository: Optional[Repository] = None
+_blob_store: Optional[BlobStore] = None
+_store_lock = threading.Lock()
+
+
+def create_backend(kind: str, data_dir: str = DATA_DIR):
+    """Build a storage backend: 'json' (data/<name>.json files) or 'sqlite'."""
+    if kind == 'json':
+        return JsonBackend(data_dir)
+    if kind == 'sqlite':
+        db_path = os.getenv('STORAGE_DB_PATH', os.path.join(data_dir, 'research.db'))
+        return SqliteBackend(db_path, data_dir)
+    raise ValueError(f"Unknown storage backend: {kind}")
+
+
+def get_store() -> Store:
+    """Return the process-wide Store for the backend named by STORAGE_BACKEND (default json)."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = Store(create_backend(os.getenv('STORAGE_BACKEND', 'json')))
+        return _store
+
+
+def get_repository() -> Repository:
+    """Return the process-wide Repository over get_store()."""
+    global _repository
+    store = get_store()
+    with _store_lock:
+        if _repository is None:
+            _repository = Repository(store)
+        return _repository
+
+
+def get_blob_store() -> BlobStore:
+    """Return the process-wide BlobStore under STORAGE_BLOB_DIR (default data/blobs)."""
+    global _blob_store
+    with _store_lock:
+        if _blob_store is None:
+            _blob_store = BlobStore(os.getenv('STORAGE_BLOB_DIR', os.path.join(DATA_DIR, 'blobs')))
+        return _blob_store
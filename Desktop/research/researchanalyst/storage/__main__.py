@@ -0,0 +1,43 @@
+import os
+import sys
+
+from storage import get_blob_store, get_store
+from storage.json_backend import DATA_DIR
+from storage.sqlite_backend import TABLES, SqliteBackend
+
+COMMANDS = ('import', 'export', 'externalize')
+
+
+def externalize(collection: str = 'deliverables', field: str = 'content') -> int:
+    """Move inline field values of a collection into the blob store; returns how many moved."""
+    store, blobs = get_store(), get_blob_store()
+    records = store.load(collection, writable=True)
+    moved = 0
+    for i, record in enumerate(records):
+        if isinstance(record, dict) and field in record:
+            records[i] = blobs.externalize(record, field)
+            moved += 1
+    if moved:
+        store.save(collection, records)
+    return moved
+
+
+# python -m storage import [collection ...]   load data/<name>.json into SQLite
+# python -m storage export [collection ...]   write SQLite collections back to data/<name>.json
+# python -m storage externalize               move inline deliverable content into data/blobs
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] not in COMMANDS:
+        print(f"Usage: python -m storage {'|'.join(COMMANDS)} [collection ...]")
+        sys.exit(1)
+    if sys.argv[1] == 'externalize':
+        for collection in sys.argv[2:] or ['deliverables']:
+            print(f"Moved {externalize(collection)} {collection} bodies into {get_blob_store().root}/")
+        sys.exit(0)
+    backend = SqliteBackend(os.getenv('STORAGE_DB_PATH', os.path.join(DATA_DIR, 'research.db')))
+    collections = sys.argv[2:]
+    if sys.argv[1] == 'import':
+        backend.import_json(collections or list(TABLES))
+        print(f"Imported {', '.join(collections or list(TABLES))} into {backend.db_path}")
+    else:
+        exported = backend.export_json(collections or None)
+        print(f"Exported {', '.join(exported)} to {backend.json.data_dir}/")
@@ -0,0 +1,130 @@
+import hashlib
+import json
+import os
+import tempfile
+import zlib
+from typing import Any, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional; zlib is always available
+    zstandard = None
+
+# Compressed blob file suffix -> codec name
+CODECS = {'.zst': 'zstd', '.z': 'zlib'}
+
+
+def encode_body(value: Any) -> Tuple[str, str]:
+    """Return (text, format) for a body: plain text as is, structured content as stable JSON."""
+    if isinstance(value, str):
+        return value, 'text'
+    return json.dumps(value, sort_keys=True, indent=2), 'json'
+
+
+def decode_body(text: str, fmt: Optional[str]) -> Any:
+    return json.loads(text) if fmt == 'json' else text
+
+
+class BlobStore:
+    """Content-addressed store for large text bodies.
+
+    Each blob lives at <root>/<first two hex digits>/<sha256 of the raw
+    bytes>, compressed with zstd when the zstandard package is installed and
+    with zlib otherwise (the file suffix records which). Because the name is
+    the hash, storing identical content twice costs nothing and blobs are
+    never rewritten in place.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.suffix = '.zst' if zstandard is not None else '.z'
+
+    def _path(self, digest: str, suffix: str) -> str:
+        return os.path.join(self.root, digest[:2], digest + suffix)
+
+    def find(self, digest: str) -> Optional[str]:
+        for suffix in CODECS:
+            path = self._path(digest, suffix)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def put(self, data: bytes) -> str:
+        """Store data and return its SHA-256 hex digest."""
+        digest = hashlib.sha256(data).hexdigest()
+        if self.find(digest) is not None:
+            return digest
+        path = self._path(digest, self.suffix)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        if zstandard is not None:
+            compressed = zstandard.ZstdCompressor(level=3).compress(data)
+        else:
+            compressed = zlib.compress(data, 6)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.blob.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(compressed)
+                f.flush()
+                os.fsync(f.fileno())
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        return digest
+
+    def get(self, digest: str) -> bytes:
+        """Return the raw bytes for a digest; raises FileNotFoundError if missing."""
+        path = self.find(digest)
+        if path is None:
+            raise FileNotFoundError(f"Blob not found: {digest}")
+        with open(path, 'rb') as f:
+            compressed = f.read()
+        if path.endswith('.zst'):
+            if zstandard is None:
+                raise RuntimeError(f"Blob {digest} is zstd-compressed but zstandard is not installed")
+            data = zstandard.ZstdDecompressor().decompress(compressed)
+        else:
+            data = zlib.decompress(compressed)
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise ValueError(f"Blob {digest} is corrupt")
+        return data
+
+    def externalize(self, record: dict, field: str = 'content') -> dict:
+        """Return a copy of record with field moved into the blob store.
+
+        The copy keeps <field>_hash, <field>_size (raw bytes) and
+        <field>_format ('text', or 'json' for structured content) instead of
+        the value itself. Records without the field are returned unchanged.
+        """
+        if field not in record:
+            return record
+        text, fmt = encode_body(record[field])
+        data = text.encode('utf-8')
+        stored = {k: v for k, v in record.items() if k != field}
+        stored[f'{field}_hash'] = self.put(data)
+        stored[f'{field}_size'] = len(data)
+        stored[f'{field}_format'] = fmt
+        return stored
+
+    def resolve(self, record: Any, field: str = 'content', default: Any = '') -> Any:
+        """Return the value of field for a record, reading its blob if it was externalized.
+
+        Legacy records that still carry the value inline are returned as is.
+        """
+        if not isinstance(record, dict):
+            return default
+        if field in record:
+            return record[field]
+        digest = record.get(f'{field}_hash')
+        if not digest:
+            return default
+        return decode_body(self.get(digest).decode('utf-8'), record.get(f'{field}_format'))
+
+    def with_content(self, record: Any, field: str = 'content') -> Any:
+        """Return a plain copy of record with field filled in from the blob store."""
+        if not isinstance(record, dict) or field in record or not record.get(f'{field}_hash'):
+            return record
+        return dict(record, **{field: self.resolve(record, field)})
@@ -0,0 +1,202 @@
+import json
+import os
+import tempfile
+from typing import Any, Dict, Optional, Tuple
+
+from storage.mutation_log import COMPACT_THRESHOLD_BYTES, Compactor, MutationLog, file_lock, replay
+
+DATA_DIR = 'data'
+
+# (snapshot mtime_ns, snapshot size, snapshot inode, mutation log size)
+Stamp = Tuple[int, int, int, int]
+
+
+def _stamp(st: os.stat_result) -> Tuple[int, int, int]:
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def find_index(records: Any, key: str, value: Any) -> Optional[int]:
+    """Return the position of the first record whose key equals value."""
+    for i, record in enumerate(records):
+        if isinstance(record, dict) and record.get(key) == value:
+            return i
+    return None
+
+
+def write_json_atomic(path: str, data: Any, durable: bool = True) -> None:
+    """Replace path with the pretty-printed JSON for data via rename (fsynced unless durable=False)."""
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    try:
+        mode = os.stat(path).st_mode & 0o777
+    except FileNotFoundError:
+        mode = 0o644
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f'.{os.path.basename(path)}.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, indent=2)
+            if durable:
+                f.flush()
+                os.fsync(f.fileno())
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+class JsonBackend:
+    """Stores each collection as a data/<name>.json snapshot plus a mutation log.
+
+    Whole-collection saves rewrite the snapshot. Single-record upserts and
+    inserts append to data/<name>.log.jsonl (see MutationLog) so their cost
+    does not grow with the collection; readers see the snapshot with the log
+    replayed on top. A background compactor folds the log back into the
+    snapshot once it passes COMPACT_THRESHOLD_BYTES.
+
+    The change stamp is the snapshot's (mtime, size, inode) plus the log
+    size, so writes from other processes are detected with two os.stat()s.
+    Each write also bumps a monotonically increasing version number, kept
+    with the stamp it belongs to in data/.<name>.version and shared by every
+    worker process; readers only read that file.
+    """
+
+    kind = 'json'
+
+    def __init__(self, data_dir: str = DATA_DIR, compact_threshold: int = COMPACT_THRESHOLD_BYTES):
+        self.data_dir = data_dir
+        self.compact_threshold = compact_threshold
+        self._logs: Dict[str, MutationLog] = {}
+        self._compactor = Compactor(self.compact)
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.data_dir, f'{name}.json')
+
+    def log(self, name: str) -> MutationLog:
+        if name not in self._logs:
+            os.makedirs(self.data_dir, exist_ok=True)
+            self._logs[name] = MutationLog(os.path.join(self.data_dir, f'{name}.log.jsonl'),
+                                           os.path.join(self.data_dir, f'.{name}.lock'),
+                                           on_commit=lambda before: self._bump(name, before))
+        return self._logs[name]
+
+    def stamp(self, name: str) -> Stamp:
+        return self._snapshot_stamp(name, missing_ok=False) + (self.log(name).size(),)
+
+    def read(self, name: str) -> Tuple[Stamp, Any]:
+        log = self.log(name)
+        with file_lock(log.lock_path, exclusive=False):
+            lines = log.read_lines()
+            try:
+                with open(self.path(name), 'r') as f:
+                    data = json.load(f)
+                    snapshot = _stamp(os.fstat(f.fileno()))
+            except FileNotFoundError:
+                if not lines:
+                    raise
+                data, snapshot = [], (0, 0, 0)
+            stamp = snapshot + (log.size(),)
+        if lines:
+            data = replay(data, lines)
+        return stamp, data
+
+    def write(self, name: str, data: Any) -> Stamp:
+        log = self.log(name)
+        with file_lock(log.lock_path, exclusive=True):
+            before = self._current_stamp(name)
+            write_json_atomic(self.path(name), data)
+            if log.size():
+                os.truncate(log.path, 0)
+            self._bump(name, before)
+        return self.stamp(name)
+
+    def upsert(self, name: str, record: dict, key: str = 'id') -> Tuple[Optional[Stamp], Stamp]:
+        """Log a replace-first-match-or-append. Returns the (before, after) stamps."""
+        return self._append(name, {'op': 'upsert', 'key': key, 'record': record})
+
+    def insert(self, name: str, record: dict) -> Tuple[Optional[Stamp], Stamp]:
+        return self._append(name, {'op': 'insert', 'record': record})
+
+    def version(self, name: str, stamp: Stamp) -> Optional[int]:
+        """Return the version number of the collection as of stamp.
+
+        Writes bump the shared counter under the collection lock, so this
+        only reads it. A stamp no write has recorded (e.g. a hand edit of
+        the JSON file) is one past the counter; the next write counts it.
+        Returns None when stamp is already out of date.
+        """
+        version, seen = self._read_version(name)
+        if seen == list(stamp):
+            return version
+        if tuple(stamp) != self.stamp(name):
+            return None
+        return version + 1
+
+    def lock(self, name: str):
+        """Exclusive cross-process lock for a read-modify-write of the collection.
+
+        It uses its own lock file rather than the collection lock, so upserts
+        and inserts can still be made while it is held.
+        """
+        os.makedirs(self.data_dir, exist_ok=True)
+        return file_lock(os.path.join(self.data_dir, f'.{name}.write.lock'), exclusive=True)
+
+    def compact(self, name: str) -> None:
+        """Fold the mutation log into the snapshot and truncate the log."""
+        log = self.log(name)
+        with file_lock(log.lock_path, exclusive=True):
+            lines = log.read_lines()
+            if not lines:
+                return
+            before = self._current_stamp(name)
+            try:
+                with open(self.path(name), 'r') as f:
+                    data = json.load(f)
+            except FileNotFoundError:
+                data = []
+            write_json_atomic(self.path(name), replay(data, lines))
+            os.truncate(log.path, 0)
+            self._bump(name, before)
+
+    def _append(self, name: str, entry: Dict[str, Any]) -> Tuple[Optional[Stamp], Stamp]:
+        log = self.log(name)
+        before, after = log.append(entry, lambda: self._snapshot_stamp(name, missing_ok=True))
+        if after[-1] >= self.compact_threshold:
+            self._compactor.schedule(name)
+        return before, after
+
+    def _bump(self, name: str, before: Optional[Stamp]) -> None:
+        """Record a write made under the collection lock: the stamp it produced gets the next version."""
+        version, seen = self._read_version(name)
+        if before is not None and any(before) and seen != list(before):
+            # Readers saw the unrecorded stamp before this write as version + 1
+            version += 1
+        # Not fsynced: ETags also carry the stamp, so a counter lost in a
+        # crash cannot make old and new data look identical.
+        write_json_atomic(self._version_path(name), [version + 1, list(self.stamp(name))], durable=False)
+
+    def _current_stamp(self, name: str) -> Optional[Stamp]:
+        try:
+            return self.stamp(name)
+        except FileNotFoundError:
+            return None
+
+    def _version_path(self, name: str) -> str:
+        return os.path.join(self.data_dir, f'.{name}.version')
+
+    def _read_version(self, name: str) -> Tuple[int, Optional[list]]:
+        try:
+            with open(self._version_path(name), 'r') as f:
+                version, seen = json.load(f)
+            return int(version), seen
+        except (FileNotFoundError, ValueError, TypeError):
+            return 0, None
+
+    def _snapshot_stamp(self, name: str, missing_ok: bool) -> Tuple[int, int, int]:
+        try:
+            return _stamp(os.stat(self.path(name)))
+        except FileNotFoundError:
+            if missing_ok or self.log(name).size():
+                return (0, 0, 0)
+            raise
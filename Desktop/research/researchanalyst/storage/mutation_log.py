@@ -0,0 +1,217 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows: file_lock does not lock, so only one process may write
+    fcntl = None
+
+# How long a group-commit leader waits for other writers to join its batch
+GROUP_COMMIT_WINDOW = 0.002
+# Fold a log back into its snapshot once it grows past this many bytes
+COMPACT_THRESHOLD_BYTES = 512 * 1024
+# Read size when scanning back for the last complete log line
+TAIL_BLOCK = 4096
+
+
+@contextmanager
+def file_lock(path: str, exclusive: bool) -> Iterator[None]:
+    """Hold an flock on path for the duration of the block (shared or exclusive)."""
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        yield
+    finally:
+        os.close(fd)
+
+
+def replay(records: List[Any], lines: List[str]) -> List[Any]:
+    """Apply logged mutations, in order, to a snapshot list."""
+    positions: Dict[str, Dict[Any, int]] = {}
+
+    def index_for(key: str) -> Dict[Any, int]:
+        if key not in positions:
+            index = {}
+            for i, record in enumerate(records):
+                if isinstance(record, dict):
+                    index.setdefault(_hashable(record.get(key)), i)
+            positions[key] = index
+        return positions[key]
+
+    for line in lines:
+        try:
+            entry = json.loads(line)
+        except json.JSONDecodeError:
+            print(f"Skipping corrupt mutation log entry: {line[:80]!r}")
+            continue
+        record = entry.get('record')
+        if entry.get('op') == 'upsert':
+            key = entry.get('key', 'id')
+            index = index_for(key)
+            value = _hashable(record.get(key))
+            if value in index:
+                records[index[value]] = record
+                continue
+        records.append(record)
+        for key, index in positions.items():
+            index.setdefault(_hashable(record.get(key)), len(records) - 1)
+    return records
+
+
+def trim_torn_tail(f) -> int:
+    """Truncate a partial last line (left by a crash mid-append) from a binary log file; returns its new size."""
+    end = f.seek(0, os.SEEK_END)
+    if end == 0:
+        return 0
+    f.seek(end - 1)
+    if f.read(1) == b'\n':
+        return end
+    pos = end
+    while pos > 0:
+        start = max(0, pos - TAIL_BLOCK)
+        f.seek(start)
+        newline = f.read(pos - start).rfind(b'\n')
+        if newline != -1:
+            pos = start + newline + 1
+            break
+        pos = start
+    f.truncate(pos)
+    return pos
+
+
+def _hashable(value: Any) -> Any:
+    return value if isinstance(value, (str, int, float, bool, type(None))) else json.dumps(value, sort_keys=True)
+
+
+class MutationLog:
+    """Append-only JSONL log of record mutations for one collection.
+
+    Writers append a small {"op", "key", "record"} line instead of rewriting
+    the snapshot file. Appends use group commit: the first writer to arrive
+    becomes the leader, waits GROUP_COMMIT_WINDOW for others to join, then
+    writes the whole batch with a single fsync and wakes every writer in it.
+    Cross-process appends are serialized with an exclusive flock on the
+    collection's lock file, which readers and the compactor also use.
+    """
+
+    def __init__(self, path: str, lock_path: str, window: float = GROUP_COMMIT_WINDOW,
+                 on_commit: Optional[Callable[[Any], None]] = None):
+        self.path = path
+        self.lock_path = lock_path
+        self.window = window
+        # Called with the stamp before each batch, still under the exclusive lock
+        self.on_commit = on_commit
+        self._cond = threading.Condition()
+        self._pending: List[Tuple[str, list]] = []
+        self._batch = 0
+        self._durable = -1
+        self._flushing = False
+        self._failed: Optional[Tuple[int, Exception]] = None
+
+    def size(self) -> int:
+        try:
+            return os.stat(self.path).st_size
+        except FileNotFoundError:
+            return 0
+
+    def read_lines(self) -> List[str]:
+        """Return complete log lines; a torn trailing line from a crash is ignored."""
+        try:
+            with open(self.path, 'r') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return []
+        lines = data.split('\n')
+        return [line for line in lines[:-1] if line]
+
+    def append(self, entry: Dict[str, Any], snapshot_stamp) -> Tuple[Any, Any]:
+        """Durably append one entry; returns the (before, after) collection stamps around it."""
+        line = json.dumps(entry, separators=(',', ':')) + '\n'
+        result: list = []
+        with self._cond:
+            batch = self._batch
+            self._pending.append((line, result))
+            while self._durable < batch and self._flushing:
+                self._cond.wait()
+            if self._durable < batch:
+                self._flushing = True
+                leader = True
+            else:
+                leader = False
+        if leader:
+            self._lead(snapshot_stamp)
+        with self._cond:
+            if self._failed is not None and self._failed[0] == batch:
+                raise self._failed[1]
+        return result[0], result[1]
+
+    def _lead(self, snapshot_stamp) -> None:
+        time.sleep(self.window)
+        with self._cond:
+            pending, self._pending = self._pending, []
+            batch = self._batch
+            self._batch += 1
+        try:
+            with file_lock(self.lock_path, exclusive=True):
+                stamp = snapshot_stamp()
+                with open(self.path, 'a+b') as f:
+                    # Appending after a torn line would merge the first new record into it
+                    offset = trim_torn_tail(f)
+                    before = stamp + (offset,)
+                    data = []
+                    for line, result in pending:
+                        data.append(line.encode('utf-8'))
+                        end = offset + len(data[-1])
+                        result.extend([stamp + (offset,), stamp + (end,)])
+                        offset = end
+                    f.write(b''.join(data))
+                    f.flush()
+                    os.fsync(f.fileno())
+                if self.on_commit is not None:
+                    try:
+                        self.on_commit(before)
+                    except Exception as e:
+                        print(f"Error recording commit to {self.path}: {str(e)}")
+        except Exception as e:
+            with self._cond:
+                self._failed = (batch, e)
+        with self._cond:
+            self._durable = batch
+            self._flushing = False
+            self._cond.notify_all()
+
+
+class Compactor:
+    """Background thread that folds oversized mutation logs into their snapshots."""
+
+    def __init__(self, compact):
+        self._compact = compact
+        self._due: set = set()
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def schedule(self, name: str) -> None:
+        with self._lock:
+            self._due.add(name)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='mutation-log-compactor', daemon=True)
+                self._thread.start()
+        self._wake.set()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            with self._lock:
+                due, self._due = self._due, set()
+            for name in due:
+                try:
+                    self._compact(name)
+                except Exception as e:
+                    print(f"Error compacting {name} mutation log: {str(e)}")
@@ -0,0 +1,109 @@
+import base64
+import json
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# Query parameter -> record field for equality filters; tag matches inside the tags list
+FILTER_FIELDS = {
+    'status': 'status',
+    'category': 'category',
+    'origin': 'origin',
+    'tag': 'tags',
+}
+
+# Large text fields left out of pages unless asked for with fields=
+HEAVY_FIELDS = ('content', 'description')
+
+# Query parameters that switch a list endpoint from a bare array to a page
+PAGE_PARAMS = ('cursor', 'limit', 'fields', 'due_from', 'due_to') + tuple(FILTER_FIELDS)
+
+
+class PageQuery:
+    """A parsed page request for a list endpoint."""
+
+    def __init__(self, filters: List[Tuple[str, Any]], due_from: Optional[str] = None,
+                 due_to: Optional[str] = None, after: Optional[Tuple[int, Any]] = None,
+                 limit: int = DEFAULT_PAGE_SIZE, fields: Optional[List[str]] = None):
+        self.filters = filters
+        self.due_from = due_from
+        self.due_to = due_to
+        self.after = after
+        self.limit = limit
+        self.fields = fields
+
+    def matches(self, record: Any) -> bool:
+        """Range filters that the hash indexes cannot answer."""
+        if self.due_from is None and self.due_to is None:
+            return True
+        due = record.get('due_date') if isinstance(record, dict) else None
+        if not isinstance(due, str) or not due:
+            return False
+        due = due[:10]
+        if self.due_from is not None and due < self.due_from:
+            return False
+        if self.due_to is not None and due > self.due_to:
+            return False
+        return True
+
+    def project(self, record: Any) -> Any:
+        """Keep only the requested fields (id always), or drop HEAVY_FIELDS by default."""
+        if not isinstance(record, dict):
+            return record
+        if self.fields is None:
+            return {k: v for k, v in record.items() if k not in HEAVY_FIELDS}
+        if '*' in self.fields:
+            return dict(record)
+        return {k: record[k] for k in ['id'] + self.fields if k in record}
+
+    def wants(self, field: str) -> bool:
+        return self.fields is None or '*' in self.fields or field in self.fields
+
+
+def wants_page(args) -> bool:
+    return any(param in args for param in PAGE_PARAMS)
+
+
+def parse_page_query(args) -> PageQuery:
+    """Build a PageQuery from request args; raises ValueError on bad input."""
+    filters = []
+    for param, field in FILTER_FIELDS.items():
+        for value in args.getlist(param):
+            filters.append((field, value))
+    try:
+        limit = int(args.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise ValueError('limit must be an integer')
+    if limit < 1:
+        raise ValueError('limit must be positive')
+    fields = args.get('fields')
+    return PageQuery(
+        filters=filters,
+        due_from=args.get('due_from') or None,
+        due_to=args.get('due_to') or None,
+        after=decode_cursor(args['cursor']) if args.get('cursor') else None,
+        limit=min(limit, MAX_PAGE_SIZE),
+        fields=[f.strip() for f in fields.split(',') if f.strip()] if fields is not None else None,
+    )
+
+
+def encode_cursor(position: int, record_id: Any) -> str:
+    raw = json.dumps([position, record_id], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[int, Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        position, record_id = json.loads(raw)
+    except (ValueError, TypeError):
+        raise ValueError('invalid cursor')
+    if not isinstance(position, int) or position < 0:
+        raise ValueError('invalid cursor')
+    return position, record_id
+
+
+def page_envelope(items: Iterable[Any], next_cursor: Optional[str]) -> Dict[str, Any]:
+    items = list(items)
+    return {'items': items, 'next_cursor': next_cursor, 'count': len(items)}
@@ -0,0 +1,239 @@
+import bisect
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+# Field indexes that are built eagerly and kept up to date on every write
+MAINTAINED_FIELDS = {
+    'sources': ('assigned_tasks',),
+    'deliverables': ('task_id',),
+}
+
+
+def _values(record: Any, field: str) -> List[Any]:
+    if not isinstance(record, dict):
+        return []
+    value = record.get(field)
+    values = value if isinstance(value, list) else [value]
+    return [v for v in values if isinstance(v, (str, int, float, bool, type(None)))]
+
+
+class CollectionIndex:
+    """Hash indexes over one collection, keyed by record position.
+
+    by_id maps an id to the position of its first record; field indexes map
+    a value (each element, for list fields) to the set of positions holding
+    it. Lookups keep the old linear-scan semantics: when several records
+    share a value the first one in collection order wins. Indexes can be
+    moved forward with the store's record-level changes instead of being
+    rebuilt.
+    """
+
+    def __init__(self, stamp: Any, records: Any, fields: Iterable[str] = ()):
+        self.stamp = stamp
+        self.records = records if isinstance(records, list) else []
+        # Record count at stamp (the store may already have appended to records in place)
+        self.size = len(self.records)
+        self.by_id: Dict[Any, int] = {}
+        for position, record in enumerate(self.records):
+            for record_id in _values(record, 'id')[:1]:
+                self.by_id.setdefault(record_id, position)
+        self.fields: Dict[str, Dict[Any, Set[int]]] = {}
+        for field in fields:
+            self._build_field(field)
+        self.lock = threading.RLock()
+
+    def _build_field(self, field: str) -> Dict[Any, Set[int]]:
+        index: Dict[Any, Set[int]] = {}
+        for position, record in enumerate(self.records):
+            for value in _values(record, field):
+                index.setdefault(value, set()).add(position)
+        self.fields[field] = index
+        return index
+
+    def field(self, field: str) -> Dict[Any, Set[int]]:
+        with self.lock:
+            index = self.fields.get(field)
+            return index if index is not None else self._build_field(field)
+
+    def apply(self, stamp: Any, records: list, changes) -> bool:
+        """Move the index forward by record-level changes; False if it must be rebuilt."""
+        with self.lock:
+            size = self.size
+            for change in changes:
+                old, new, position = change.old, change.new, change.position
+                old_ids, new_ids = _values(old, 'id')[:1], _values(new, 'id')[:1]
+                if old is not None and old_ids != new_ids:
+                    return False
+                if old is None:
+                    if position != size:
+                        return False
+                    size += 1
+                for record_id in new_ids:
+                    self.by_id.setdefault(record_id, position)
+                for field, index in self.fields.items():
+                    for value in _values(old, field):
+                        positions = index.get(value)
+                        if positions is not None:
+                            positions.discard(position)
+                            if not positions:
+                                del index[value]
+                    for value in _values(new, field):
+                        index.setdefault(value, set()).add(position)
+            if size != len(records):
+                return False
+            self.records = records
+            self.size = size
+            self.stamp = stamp
+            return True
+
+    def get(self, record_id: Any) -> Optional[dict]:
+        with self.lock:
+            position = self.by_id.get(record_id)
+            return self.records[position] if position is not None else None
+
+    def positions(self, field: str, value: Any) -> List[int]:
+        with self.lock:
+            return sorted(self.field(field).get(value, ()))
+
+
+class Repository:
+    """Id-indexed, version-aware lookups over the store's collections.
+
+    Each collection's indexes are tied to a store version. When the store
+    has only applied record-level writes since then (see
+    Store.changes_since) the indexes are moved forward incrementally;
+    otherwise they are rebuilt. Id lookups and "records for these ids"
+    queries therefore cost O(1) / O(k) instead of a scan per request, and
+    the task -> sources reverse index over assigned_tasks stays current as
+    sources are added, tagged or assigned.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._indexes: Dict[str, CollectionIndex] = {}
+        self._lock = threading.Lock()
+        store.set_locator(self.position)
+
+    def index(self, name: str) -> CollectionIndex:
+        stamp, records = self.store.snapshot(name)
+        index = self._indexes.get(name)
+        if index is not None and index.stamp == stamp:
+            return index
+        with self._lock:
+            index = self._indexes.get(name)
+            if index is not None and index.stamp != stamp:
+                changes = self.store.changes_since(name, index.stamp)
+                if changes is None or not index.apply(stamp, records, changes):
+                    index = None
+            if index is None or index.stamp != stamp:
+                index = CollectionIndex(stamp, records, MAINTAINED_FIELDS.get(name, ()))
+            self._indexes[name] = index
+        return index
+
+    def position(self, name: str, key: str, value: Any, stamp: Any, records: list) -> Optional[int]:
+        """Position of the first record whose key equals value in records, the store's view at stamp.
+
+        The store calls this to place an upsert. The index is moved forward
+        to stamp from the records it is given, without a snapshot().
+        """
+        with self._lock:
+            index = self._indexes.get(name)
+            if index is None or index.stamp != stamp:
+                changes = self.store.changes_since(name, index.stamp) if index is not None else None
+                if not changes or changes[-1].after != stamp:
+                    changes = None
+                if changes is None or not index.apply(stamp, records, changes):
+                    index = CollectionIndex(stamp, records, MAINTAINED_FIELDS.get(name, ()))
+                self._indexes[name] = index
+        if key == 'id':
+            with index.lock:
+                return index.by_id.get(value)
+        positions = index.field(key).get(value)
+        return min(positions) if positions else None
+
+    def get(self, name: str, record_id: Any) -> Optional[dict]:
+        """Return the first record with this id, or None."""
+        try:
+            return self.index(name).get(record_id)
+        except TypeError:
+            return None
+
+    def find(self, name: str, field: str, value: Any) -> List[dict]:
+        """Return every record whose field equals (or, for lists, contains) value."""
+        index = self.index(name)
+        try:
+            positions = index.positions(field, value)
+        except TypeError:
+            return []
+        return [index.records[p] for p in positions]
+
+    def first(self, name: str, field: str, value: Any) -> Optional[dict]:
+        """Return the first record whose field equals (or, for lists, contains) value."""
+        index = self.index(name)
+        try:
+            positions = index.field(field).get(value)
+        except TypeError:
+            return None
+        return index.records[min(positions)] if positions else None
+
+    def get_many(self, name: str, ids: Iterable[Any]) -> List[dict]:
+        """Return the records with the given ids, in collection order."""
+        index = self.index(name)
+        positions = set()
+        for record_id in ids:
+            try:
+                position = index.by_id.get(record_id)
+            except TypeError:
+                continue
+            if position is not None:
+                positions.add(position)
+        return [index.records[p] for p in sorted(positions)]
+
+    def page(self, name: str, filters: List[Tuple[str, Any]], after: Optional[Tuple[int, Any]],
+             limit: int, predicate: Optional[Callable[[Any], bool]] = None
+             ) -> Tuple[List[Any], Optional[Tuple[int, Any]]]:
+        """Return up to limit records after a cursor, plus the cursor for the next page.
+
+        Equality filters are answered from the field indexes and intersected;
+        the cursor is (position, id) of the last record returned, resolved
+        through by_id so pages stay stable while records are appended or
+        replaced. predicate handles anything the indexes cannot.
+        """
+        index = self.index(name)
+        with index.lock:
+            records = index.records
+            start = 0
+            if after is not None:
+                position, record_id = after
+                current = records[position] if position < len(records) else None
+                if not isinstance(current, dict) or current.get('id') != record_id:
+                    try:
+                        position = index.by_id.get(record_id, position)
+                    except TypeError:
+                        pass
+                start = position + 1
+            if filters:
+                sets = sorted((index.field(field).get(value, set()) for field, value in filters), key=len)
+                candidates = sorted(sets[0].intersection(*sets[1:]))
+                candidates = candidates[bisect.bisect_left(candidates, start):]
+            else:
+                candidates = range(start, len(records))
+            items, last = [], None
+            for position in candidates:
+                record = records[position]
+                if predicate is not None and not predicate(record):
+                    continue
+                if len(items) == limit:
+                    last_id = records[last].get('id') if isinstance(records[last], dict) else None
+                    return items, (last, last_id)
+                items.append(record)
+                last = position
+        return items, None
+
+    def sources_for_task(self, task_id: str) -> List[dict]:
+        """Return the sources whose assigned_tasks include task_id, in collection order.
+
+        Served from the maintained task -> sources reverse index, so the cost
+        depends on how many sources the task has, not on the collection size.
+        """
+        return self.find('sources', 'assigned_tasks', task_id)
@@ -0,0 +1,278 @@
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from storage.json_backend import DATA_DIR, JsonBackend, find_index
+
+# Collections that get their own table. 'columns' are copied out of the JSON
+# body into indexed columns; 'links' explodes a list field into a join table
+# so membership queries ("sources assigned to task X") hit an index.
+TABLES: Dict[str, Dict[str, Any]] = {
+    'tasks': {'columns': ('category', 'status', 'due_date')},
+    'sources': {'columns': (), 'links': ('source_tasks', 'assigned_tasks', 'task_id')},
+    'deliverables': {'columns': ('task_id',)},
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS collections (
+    name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS documents (
+    name TEXT PRIMARY KEY,
+    body TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    seq INTEGER PRIMARY KEY,
+    id TEXT,
+    category TEXT,
+    status TEXT,
+    due_date TEXT,
+    body TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tasks_id ON tasks(id);
+CREATE INDEX IF NOT EXISTS tasks_category ON tasks(category);
+CREATE INDEX IF NOT EXISTS tasks_status ON tasks(status);
+CREATE INDEX IF NOT EXISTS tasks_due_date ON tasks(due_date);
+CREATE TABLE IF NOT EXISTS sources (
+    seq INTEGER PRIMARY KEY,
+    id TEXT,
+    body TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sources_id ON sources(id);
+CREATE TABLE IF NOT EXISTS source_tasks (
+    seq INTEGER NOT NULL,
+    task_id TEXT NOT NULL,
+    PRIMARY KEY (seq, task_id)
+);
+CREATE INDEX IF NOT EXISTS source_tasks_task_id ON source_tasks(task_id);
+CREATE TABLE IF NOT EXISTS deliverables (
+    seq INTEGER PRIMARY KEY,
+    id TEXT,
+    task_id TEXT,
+    body TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS deliverables_id ON deliverables(id);
+CREATE INDEX IF NOT EXISTS deliverables_task_id ON deliverables(task_id);
+"""
+
+
+def _scalar(value: Any) -> Any:
+    if value is None or isinstance(value, (str, int, float)):
+        return value
+    return json.dumps(value)
+
+
+class SqliteBackend:
+    """Stores collections in a WAL-journaled SQLite database.
+
+    tasks, sources and deliverables are kept one row per record with their
+    commonly filtered fields in indexed columns; every other collection is
+    stored whole in the documents table. Each write runs in its own
+    transaction and bumps the collection's version, which doubles as the
+    change stamp other processes poll. A collection missing from the
+    database is imported from data/<name>.json on first access.
+    """
+
+    kind = 'sqlite'
+
+    def __init__(self, db_path: str = os.path.join(DATA_DIR, 'research.db'), data_dir: str = DATA_DIR):
+        self.db_path = db_path
+        self.json = JsonBackend(data_dir)
+        self._local = threading.local()
+        self._imported = set()
+
+    # Connection and transaction handling
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.db_path) or '.', exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self, write: bool = False) -> Iterator[sqlite3.Connection]:
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE' if write else 'BEGIN')
+        try:
+            yield conn
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+
+    def _version(self, conn: sqlite3.Connection, name: str) -> Optional[int]:
+        row = conn.execute('SELECT version FROM collections WHERE name = ?', (name,)).fetchone()
+        return row[0] if row else None
+
+    def _bump(self, conn: sqlite3.Connection, name: str) -> int:
+        conn.execute(
+            'INSERT INTO collections (name, version) VALUES (?, 1) '
+            'ON CONFLICT(name) DO UPDATE SET version = version + 1',
+            (name,))
+        return self._version(conn, name)
+
+    def _ensure(self, name: str) -> None:
+        """Import data/<name>.json the first time a collection is touched."""
+        if name in self._imported:
+            return
+        with self._transaction(write=True) as conn:
+            if self._version(conn, name) is None:
+                _, data = self.json.read(name)
+                self._replace(conn, name, data)
+                self._bump(conn, name)
+        self._imported.add(name)
+
+    # Row encoding
+
+    def _row(self, name: str, record: Any) -> List[Any]:
+        columns = TABLES[name]['columns']
+        record = record if isinstance(record, dict) else {}
+        return ([_scalar(record.get('id'))] + [_scalar(record.get(c)) for c in columns]
+                + [json.dumps(record)])
+
+    def _write_row(self, conn: sqlite3.Connection, name: str, record: Any, seq: Optional[int] = None) -> None:
+        spec = TABLES[name]
+        columns = ('id',) + spec['columns'] + ('body',)
+        values = self._row(name, record)
+        if seq is None:
+            placeholders = ', '.join('?' for _ in columns)
+            cursor = conn.execute(f"INSERT INTO {name} ({', '.join(columns)}) VALUES ({placeholders})", values)
+            seq = cursor.lastrowid
+        else:
+            assignments = ', '.join(f'{c} = ?' for c in columns)
+            conn.execute(f'UPDATE {name} SET {assignments} WHERE seq = ?', values + [seq])
+        if 'links' in spec:
+            link_table, field, link_column = spec['links']
+            conn.execute(f'DELETE FROM {link_table} WHERE seq = ?', (seq,))
+            linked = record.get(field) if isinstance(record, dict) else None
+            if isinstance(linked, list):
+                conn.executemany(
+                    f'INSERT OR IGNORE INTO {link_table} (seq, {link_column}) VALUES (?, ?)',
+                    [(seq, _scalar(value)) for value in linked])
+
+    def _replace(self, conn: sqlite3.Connection, name: str, data: Any) -> None:
+        if name in TABLES and isinstance(data, list):
+            spec = TABLES[name]
+            if 'links' in spec:
+                conn.execute(f'DELETE FROM {spec["links"][0]}')
+            conn.execute(f'DELETE FROM {name}')
+            conn.execute('DELETE FROM documents WHERE name = ?', (name,))
+            for record in data:
+                self._write_row(conn, name, record)
+        else:
+            conn.execute('INSERT OR REPLACE INTO documents (name, body) VALUES (?, ?)',
+                         (name, json.dumps(data)))
+
+    def _read(self, conn: sqlite3.Connection, name: str) -> Any:
+        row = conn.execute('SELECT body FROM documents WHERE name = ?', (name,)).fetchone()
+        if row is not None or name not in TABLES:
+            return json.loads(row[0]) if row else []
+        return [json.loads(body) for (body,) in conn.execute(f'SELECT body FROM {name} ORDER BY seq')]
+
+    # Backend interface
+
+    def stamp(self, name: str) -> int:
+        self._ensure(name)
+        return self._version(self._conn(), name)
+
+    def version(self, name: str, stamp: Optional[int]) -> Optional[int]:
+        """The stamp already is the collection's transactional version counter."""
+        return stamp
+
+    def read(self, name: str) -> Tuple[int, Any]:
+        self._ensure(name)
+        with self._transaction() as conn:
+            return self._version(conn, name), self._read(conn, name)
+
+    def write(self, name: str, data: Any) -> int:
+        with self._transaction(write=True) as conn:
+            self._replace(conn, name, data)
+            self._imported.add(name)
+            return self._bump(conn, name)
+
+    def lock(self, name: str):
+        """Exclusive cross-process lock for a read-modify-write (a lock file next to the JSON data)."""
+        return self.json.lock(name)
+
+    def upsert(self, name: str, record: dict, key: str = 'id') -> Tuple[Optional[int], int]:
+        """Replace the first record matching on key, or append. Returns (before, after) versions."""
+        return self._put(name, record, key)
+
+    def insert(self, name: str, record: dict) -> Tuple[Optional[int], int]:
+        return self._put(name, record, None)
+
+    def _put(self, name: str, record: dict, key: Optional[str]) -> Tuple[Optional[int], int]:
+        try:
+            self._ensure(name)
+        except FileNotFoundError:
+            pass
+        with self._transaction(write=True) as conn:
+            before = self._version(conn, name)
+            stored_whole = conn.execute('SELECT 1 FROM documents WHERE name = ?', (name,)).fetchone()
+            if name in TABLES and not stored_whole:
+                seq = self._find_seq(conn, name, key, record.get(key)) if key else None
+                self._write_row(conn, name, record, seq)
+            else:
+                data = self._read(conn, name)
+                index = find_index(data, key, record.get(key)) if key else None
+                if index is None:
+                    data.append(record)
+                else:
+                    data[index] = record
+                self._replace(conn, name, data)
+            return before, self._bump(conn, name)
+
+    def _find_seq(self, conn: sqlite3.Connection, name: str, key: str, value: Any) -> Optional[int]:
+        if key == 'id' or key in TABLES[name]['columns']:
+            row = conn.execute(f'SELECT seq FROM {name} WHERE {key} = ? ORDER BY seq LIMIT 1',
+                               (_scalar(value),)).fetchone()
+        else:
+            row = conn.execute(f'SELECT seq FROM {name} WHERE json_extract(body, ?) = ? ORDER BY seq LIMIT 1',
+                               (f'$.{key}', _scalar(value))).fetchone()
+        return row[0] if row else None
+
+    def find(self, name: str, field: str, value: Any) -> Optional[List[Any]]:
+        """Return records whose field equals (or, for linked lists, contains) value.
+
+        Returns None when the field is not indexed so the caller can fall
+        back to scanning the cached collection.
+        """
+        if name not in TABLES:
+            return None
+        spec = TABLES[name]
+        if field == 'id' or field in spec['columns']:
+            sql = f'SELECT body FROM {name} WHERE {field} = ? ORDER BY seq'
+        elif 'links' in spec and spec['links'][1] == field:
+            link_table, _, link_column = spec['links']
+            sql = (f'SELECT body FROM {name} WHERE seq IN '
+                   f'(SELECT seq FROM {link_table} WHERE {link_column} = ?) ORDER BY seq')
+        else:
+            return None
+        self._ensure(name)
+        with self._transaction() as conn:
+            return [json.loads(body) for (body,) in conn.execute(sql, (_scalar(value),))]
+
+    # JSON import/export
+
+    def import_json(self, names: List[str]) -> None:
+        for name in names:
+            _, data = self.json.read(name)
+            self.write(name, data)
+
+    def export_json(self, names: Optional[List[str]] = None) -> List[str]:
+        if names is None:
+            names = [row[0] for row in self._conn().execute('SELECT name FROM collections ORDER BY name')]
+        for name in names:
+            _, data = self.read(name)
+            self.json.write(name, data)
+        return names
+
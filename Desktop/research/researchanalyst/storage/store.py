@@ -0,0 +1,242 @@
+import hashlib
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, NamedTuple, Optional, Set, Tuple
+
+from storage.frozen import FrozenList, freeze, thaw
+from storage.json_backend import find_index
+
+
+# How many record-level changes per collection are kept for changes_since()
+CHANGE_HISTORY = 256
+
+
+class _Entry(NamedTuple):
+    stamp: Any
+    data: Any
+
+
+class Change(NamedTuple):
+    """One record written in place: old is None for appends."""
+    before: Any
+    after: Any
+    position: int
+    old: Optional[dict]
+    new: dict
+
+
+class Store:
+    """Process-level cache of read-only collection views over a storage backend.
+
+    Every load revalidates the cached view against the backend's cheap change
+    stamp (a file stat for JSON, a version counter for SQLite), so writes made
+    by other worker processes are picked up on the next request. Writes go
+    through to the backend and update the cached view in place when it was
+    current, instead of forcing a re-read. Those in-place writes are also
+    recorded in a short change history so derived indexes can catch up
+    incrementally (see changes_since).
+
+    Views are copy-on-write: a view that has not been handed out since the
+    last write is changed directly, so a burst of writes costs one copy at
+    most, and upsert positions come from the repository's id index (see
+    set_locator) rather than a scan.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._entries: Dict[str, _Entry] = {}
+        # Collections whose cached view has been handed out since it was last written in place
+        self._shared: Set[str] = set()
+        self._locator: Optional[Callable[[str, str, Any, Any, list], Optional[int]]] = None
+        self._changes: Dict[str, Deque[Change]] = {}
+        self._versions: Dict[str, Tuple[Any, Optional[int]]] = {}
+        self._listeners: List[Callable[[str], None]] = []
+        self._lock = threading.Lock()
+
+    def load(self, name: str, writable: bool = False) -> Any:
+        """Return the collection as a shared read-only view, or a private copy if writable."""
+        data = self.snapshot(name)[1]
+        return thaw(data) if writable else data
+
+    def snapshot(self, name: str) -> Tuple[Any, Any]:
+        """Return (stamp, read-only data) for the current version of a collection."""
+        stamp = self.backend.stamp(name)
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None and entry.stamp == stamp:
+                # From now on a write must copy the view instead of changing it in place
+                self._shared.add(name)
+                return entry
+        stamp, data = self.backend.read(name)
+        entry = _Entry(stamp, freeze(data))
+        with self._lock:
+            self._entries[name] = entry
+            self._changes.pop(name, None)
+            self._shared.add(name)
+        return entry
+
+    def version(self, name: str) -> Optional[Tuple[int, str]]:
+        """Return (version, tag) for the collection's current state, or None if unknown.
+
+        Only the backend's change stamp is checked; the data is not read.
+
+        version is the backend's monotonically increasing counter, shared by
+        all worker processes; tag is a short digest of the change stamp,
+        suitable for building strong ETags.
+        """
+        return self.version_at(name, self.backend.stamp(name))
+
+    def version_at(self, name: str, stamp: Any) -> Optional[Tuple[int, str]]:
+        """Return (version, tag) for the collection as of stamp, or None once stamp is out of date.
+
+        Lets derived data persisted later be labelled with the version it was
+        actually computed from.
+        """
+        if stamp is None:
+            return None
+        cached = self._versions.get(name)
+        if cached is not None and cached[0] == stamp:
+            version = cached[1]
+        else:
+            version = self.backend.version(name, stamp)
+            self._versions[name] = (stamp, version)
+        if version is None:
+            return None
+        return version, hashlib.sha1(repr(stamp).encode('utf-8')).hexdigest()[:16]
+
+    def changes_since(self, name: str, stamp: Any) -> Optional[List[Change]]:
+        """Return the in-place changes that lead from stamp to the cached version.
+
+        Returns None when that path is not known (the collection was reloaded
+        or replaced, or more than CHANGE_HISTORY writes happened since), in
+        which case derived data has to be rebuilt from scratch.
+        """
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                return None
+            if entry.stamp == stamp:
+                return []
+            changes = list(self._changes.get(name, ()))
+        for i in range(len(changes) - 1, -1, -1):
+            if changes[i].before == stamp:
+                return changes[i:]
+        return None
+
+    def lock(self, name: str):
+        """Hold the backend's cross-process write lock for a read-check-write sequence on a collection."""
+        return self.backend.lock(name)
+
+    def save(self, name: str, data: Any) -> None:
+        """Replace a whole collection."""
+        frozen = freeze(data)
+        stamp = self.backend.write(name, data)
+        with self._lock:
+            self._entries[name] = _Entry(stamp, frozen)
+            self._changes.pop(name, None)
+            self._shared.discard(name)
+        self._notify(name)
+
+    def upsert(self, name: str, record: dict, key: str = 'id') -> dict:
+        """Replace the first record whose key matches record[key], or append it."""
+        frozen = freeze(record)
+        before, after = self.backend.upsert(name, record, key)
+        self._apply(name, before, after, frozen, key)
+        self._notify(name)
+        return frozen
+
+    def insert(self, name: str, record: dict) -> dict:
+        """Append a record without looking for an existing one."""
+        frozen = freeze(record)
+        before, after = self.backend.insert(name, record)
+        self._apply(name, before, after, frozen)
+        self._notify(name)
+        return frozen
+
+    def find(self, name: str, field: str, value: Any) -> List[Any]:
+        """Return read-only records whose field equals (or, for list fields, contains) value."""
+        find = getattr(self.backend, 'find', None)
+        found = find(name, field, value) if find else None
+        if found is not None:
+            return freeze(found)
+        matches = []
+        for record in self.load(name):
+            if not isinstance(record, dict):
+                continue
+            current = record.get(field)
+            if current == value or (isinstance(current, list) and value in current):
+                matches.append(record)
+        return matches
+
+    def set_locator(self, locator: Callable[[str, str, Any, Any, list], Optional[int]]) -> None:
+        """Find upsert positions with locator(name, key, value, stamp, records) instead of a scan.
+
+        The locator answers for the cached view at stamp: the position of the
+        first record whose key equals value, or None if there is none (see
+        Repository.position).
+        """
+        self._locator = locator
+
+    def add_listener(self, listener: Callable[[str], None]) -> None:
+        """Call listener(name) after every write made through this store."""
+        self._listeners.append(listener)
+
+    def _notify(self, name: str) -> None:
+        for listener in list(self._listeners):
+            try:
+                listener(name)
+            except Exception as e:
+                print(f"Error notifying {name} listener: {str(e)}")
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        with self._lock:
+            if name is None:
+                self._entries.clear()
+                self._changes.clear()
+            else:
+                self._entries.pop(name, None)
+                self._changes.pop(name, None)
+
+    def _apply(self, name: str, before: Any, after: Any, record: dict, key: Optional[str] = None) -> None:
+        # Patch the cached view only if it reflected the backend right before our
+        # write; otherwise someone else wrote in between and we re-read lazily.
+        entry = self._entries.get(name)
+        current = entry is not None and before is not None and entry.stamp == before \
+            and isinstance(entry.data, list)
+        position = self._position(name, entry, key, record.get(key)) if current and key is not None else None
+        with self._lock:
+            if not current or self._entries.get(name) is not entry:
+                self._entries.pop(name, None)
+                self._changes.pop(name, None)
+                return
+            records = entry.data
+            if name in self._shared:
+                # Readers hold this view: write into a copy (once per burst of writes)
+                records = FrozenList(records)
+                self._shared.discard(name)
+            if position is None:
+                old = None
+                position = len(records)
+                list.append(records, record)
+            else:
+                old = records[position]
+                list.__setitem__(records, position, record)
+            self._entries[name] = _Entry(after, records)
+            history = self._changes.setdefault(name, deque(maxlen=CHANGE_HISTORY))
+            history.append(Change(before, after, position, old, record))
+
+    def _position(self, name: str, entry: _Entry, key: str, value: Any) -> Optional[int]:
+        """Position of the first record in entry.data whose key equals value, or None."""
+        records = entry.data
+        if self._locator is not None and isinstance(value, (str, int, float)) and not isinstance(value, bool):
+            try:
+                position = self._locator(name, key, value, entry.stamp, records)
+            except Exception as e:
+                print(f"Error locating {name} record: {str(e)}")
+            else:
+                if position is None:
+                    return None
+                if position < len(records) and isinstance(records[position], dict) \
+                        and records[position].get(key) == value:
+                    return position
+        return find_index(records, key, value)
@@ -0,0 +1,322 @@
+import difflib
+import hashlib
+import json
+import re
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from storage.blobs import decode_body, encode_body
+from storage.frozen import thaw
+
+# Every Nth version of a document is stored whole; the ones in between are deltas
+KEYFRAME_INTERVAL = 10
+
+# Fields the blob store writes in place of an externalized body
+BLOB_FIELDS = ('content', 'content_hash', 'content_size', 'content_format')
+
+
+def diff_ops(old: str, new: str) -> List[list]:
+    """Line-level edit script turning old into new: [[start, end, [new lines]], ...]."""
+    a, b = old.splitlines(keepends=True), new.splitlines(keepends=True)
+    matcher = difflib.SequenceMatcher(None, a, b, autojunk=False)
+    return [[i1, i2, b[j1:j2]] for tag, i1, i2, j1, j2 in matcher.get_opcodes() if tag != 'equal']
+
+
+def apply_ops(old: str, ops: List[list]) -> str:
+    lines = old.splitlines(keepends=True)
+    out: List[str] = []
+    position = 0
+    for start, end, replacement in ops:
+        out.extend(lines[position:start])
+        out.extend(replacement)
+        position = end
+    out.extend(lines[position:])
+    return ''.join(out)
+
+
+class VersionConflict(Exception):
+    """A patch was based on a version that is no longer the latest."""
+
+    def __init__(self, current: int):
+        super().__init__(f"Stale base version; the latest version is {current}")
+        self.current = current
+
+
+def apply_edits(text: str, edits: List[Any]) -> str:
+    """Apply character edits [offset, delete, insert] (offsets into text, ascending, non-overlapping)."""
+    out: List[str] = []
+    position = 0
+    for edit in edits:
+        if not isinstance(edit, (list, tuple)) or len(edit) != 3:
+            raise ValueError('each edit needs offset, delete and insert')
+        offset, delete, insert = edit
+        if not isinstance(offset, int) or not isinstance(delete, int) or not isinstance(insert, str):
+            raise ValueError('offset and delete must be integers and insert a string')
+        if offset < position or delete < 0 or offset + delete > len(text):
+            raise ValueError(f'edit at offset {offset} is out of range or overlaps a previous edit')
+        out.append(text[position:offset])
+        out.append(insert)
+        position = offset + delete
+    out.append(text[position:])
+    return ''.join(out)
+
+
+_HUNK = re.compile(r'^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@')
+
+
+def parse_unified_diff(diff: str, old: str) -> List[list]:
+    """Turn a unified diff against old into line ops, checking every context and removed line."""
+    lines = old.splitlines(keepends=True)
+    ops: List[list] = []
+    position = None
+    current = None
+    last_tag = None
+
+    def check(body: str) -> None:
+        if position >= len(lines) or lines[position].rstrip('\n') != body.rstrip('\n'):
+            raise ValueError(f'diff does not apply at line {position + 1}')
+
+    for line in diff.splitlines(keepends=True):
+        match = _HUNK.match(line)
+        if match:
+            start = int(match.group(1))
+            # A zero-length range names the line before the insertion point
+            if match.group(2) != '0':
+                start -= 1
+            if position is not None and start < position:
+                raise ValueError('diff hunks overlap or are out of order')
+            position, current, last_tag = start, None, None
+            continue
+        if position is None:
+            continue  # ---/+++ file headers
+        tag, body = (' ', line) if line in ('\n', '\r\n') else (line[:1], line[1:])
+        if tag == '\\':
+            # "\ No newline at end of file" applies to the line before it
+            if last_tag == '+' and current is not None and current[2]:
+                current[2][-1] = current[2][-1].rstrip('\n')
+            continue
+        if tag == ' ':
+            check(body)
+            position += 1
+            current = None
+        elif tag in ('-', '+'):
+            if current is None:
+                current = [position, position, []]
+                ops.append(current)
+            if tag == '-':
+                check(body)
+                position += 1
+                current[1] = position
+            else:
+                current[2].append(body if body.endswith('\n') else body + '\n')
+        else:
+            raise ValueError(f'unexpected diff line: {line[:40]!r}')
+        last_tag = tag
+    return ops
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class VersionedCollection:
+    """One logical record per key, with a delta-compressed history of its body.
+
+    The head record in the collection (e.g. deliverables, keyed by task_id)
+    always points at the full latest body in the blob store, so reading the
+    current version is one lookup plus one blob read. Each save also appends
+    an entry to the history collection: every KEYFRAME_INTERVAL-th version
+    references a full blob, the versions in between store a line-level delta
+    from their predecessor. Any historical version is therefore rebuilt from
+    one keyframe and at most KEYFRAME_INTERVAL - 1 deltas.
+    """
+
+    def __init__(self, store, repository, blobs, name: str = 'deliverables', key: str = 'task_id',
+                 history: str = 'deliverable_versions', keyframe_interval: int = KEYFRAME_INTERVAL):
+        self.store = store
+        self.repository = repository
+        self.blobs = blobs
+        self.name = name
+        self.key = key
+        self.history = history
+        self.keyframe_interval = keyframe_interval
+        self._lock = threading.Lock()
+
+    def head(self, key_value: Any) -> Optional[dict]:
+        """Return the current record for key_value (without its body)."""
+        return self.repository.first(self.name, self.key, key_value)
+
+    def latest(self, key_value: Any) -> Optional[dict]:
+        """Return the current record with its body read back from the blob store."""
+        head = self.head(key_value)
+        return self.blobs.with_content(head) if head else None
+
+    def save(self, record: dict, merge: bool = False) -> dict:
+        """Create or replace the record for record[key], adding a version if its body changed.
+
+        With merge=True the fields are applied on top of the existing record
+        (a partial update); otherwise the record replaces it, keeping its id
+        and created_at. Returns the full record, body included.
+        """
+        key_value = record.get(self.key)
+        with self._locked():
+            head = self.head(key_value) if key_value is not None else None
+            if head is not None:
+                if merge:
+                    base = thaw(head)
+                    if 'content' in record:
+                        base = {k: v for k, v in base.items() if k not in BLOB_FIELDS}
+                    record = dict(base, **record)
+                else:
+                    record = dict(record, **{k: head[k] for k in ('id', 'created_at') if k in head})
+            if 'content' in record and key_value is not None:
+                record['version'] = self._add_version(key_value, head, record['content'])
+            elif head is not None and 'version' in head:
+                record['version'] = head['version']
+            stored = self.blobs.externalize(record)
+            if head is not None:
+                self.store.upsert(self.name, stored, self.key)
+            else:
+                self.store.insert(self.name, stored)
+        return self.blobs.with_content(stored)
+
+    def versions(self, key_value: Any) -> List[dict]:
+        """Return the history entries for key_value, oldest first, without their deltas."""
+        entries = self._entries(key_value)
+        entries.sort(key=lambda entry: entry.get('version', 0))
+        return [{k: v for k, v in entry.items() if k not in ('ops', 'edits')} for entry in entries]
+
+    def checkout(self, key_value: Any, version: int) -> Optional[Any]:
+        """Rebuild the body of one historical version, or None if it does not exist."""
+        chain = []
+        current = version
+        while True:
+            entry = self._entry(key_value, current)
+            if entry is None:
+                return None
+            chain.append(entry)
+            if entry.get('kind') == 'keyframe':
+                break
+            current -= 1
+        text = self.blobs.get(chain[-1]['content_hash']).decode('utf-8')
+        for entry in reversed(chain[:-1]):
+            if entry.get('kind') == 'patch':
+                text = apply_edits(text, entry['edits'])
+            else:
+                text = apply_ops(text, entry['ops'])
+        target = chain[0]
+        if _digest(text) != target.get('content_sha256'):
+            raise ValueError(f"Version {version} of {key_value} failed its checksum")
+        return decode_body(text, target.get('content_format', 'text'))
+
+    def patch(self, key_value: Any, base_version: int, edits: Optional[List[Any]] = None,
+              diff: Optional[str] = None, fields: Optional[Dict[str, Any]] = None) -> Optional[dict]:
+        """Apply a text patch to the latest body if it is still base_version.
+
+        edits are character edits [offset, delete, insert] with offsets into
+        the base text (or {"offset", "delete", "insert"} objects); diff is a
+        unified diff against it. The edits are stored as the new version's
+        delta as they are, so the history entry grows with the edit rather
+        than the document. Raises VersionConflict when base_version is stale
+        and ValueError when the patch does not apply. Returns the stored head
+        record (without its body), or None if there is no record.
+        """
+        with self._locked():
+            head = self.head(key_value)
+            if head is None:
+                return None
+            current = head.get('version', 0)
+            if base_version != current:
+                raise VersionConflict(current)
+            text, fmt = encode_body(self.blobs.resolve(head))
+            if fmt != 'text':
+                raise ValueError('only text bodies can be patched')
+            if current == 0:
+                current = 1
+                self._append(key_value, current, text, fmt, None)
+            if diff is not None:
+                ops = parse_unified_diff(diff, text)
+                new_text = apply_ops(text, ops)
+                delta = ('delta', 'ops', ops)
+            else:
+                edits = [[e.get('offset'), e.get('delete', 0), e.get('insert', '')] if isinstance(e, dict) else e
+                         for e in edits or []]
+                new_text = apply_edits(text, edits)
+                delta = ('patch', 'edits', edits)
+            record = {k: v for k, v in thaw(head).items() if k not in BLOB_FIELDS}
+            record.update(fields or {})
+            record[self.key] = key_value
+            if new_text != text:
+                current += 1
+                self._append(key_value, current, new_text, fmt, delta)
+            record['version'] = current
+            record['content'] = new_text
+            stored = self.blobs.externalize(record)
+            self.store.upsert(self.name, stored, self.key)
+        return stored
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        # Other worker processes share the collection: the head is re-read and
+        # written, and version ids allocated, under the store's write lock
+        with self._lock, self.store.lock(self.name):
+            yield
+
+    def _entries(self, key_value: Any) -> List[dict]:
+        try:
+            return [dict(entry) for entry in self.repository.find(self.history, self.key, key_value)]
+        except FileNotFoundError:
+            return []
+
+    def _entry(self, key_value: Any, version: int) -> Optional[dict]:
+        try:
+            return self.repository.get(self.history, f"{key_value}:v{version}")
+        except FileNotFoundError:
+            return None
+
+    def _add_version(self, key_value: Any, head: Optional[dict], content: Any) -> int:
+        text, fmt = encode_body(content)
+        previous = None
+        version = head.get('version', 0) if head is not None else 0
+        if head is not None:
+            try:
+                old = self.blobs.resolve(head, default=None)
+            except FileNotFoundError as e:
+                print(f"Error loading previous {self.name} body: {str(e)}")
+                old = None
+            if old is not None:
+                previous = encode_body(old)
+                if version == 0:
+                    # Record the body the head had before versioning started
+                    version = 1
+                    self._append(key_value, version, previous[0], previous[1], None)
+                if previous == (text, fmt):
+                    return version
+        version += 1
+        delta = ('delta', 'ops', diff_ops(previous[0], text)) if previous and previous[1] == fmt else None
+        self._append(key_value, version, text, fmt, delta)
+        return version
+
+    def _append(self, key_value: Any, version: int, text: str, fmt: str,
+                delta: Optional[Tuple[str, str, list]]) -> None:
+        """Add a history entry: delta is (kind, field, changes) from the previous version, if known."""
+        entry: Dict[str, Any] = {
+            'id': f"{key_value}:v{version}",
+            self.key: key_value,
+            'version': version,
+            'content_sha256': _digest(text),
+            'content_size': len(text.encode('utf-8')),
+            'content_format': fmt,
+            'created_at': datetime.now().isoformat(),
+        }
+        if delta is None or (version - 1) % self.keyframe_interval == 0 \
+                or len(json.dumps(delta[2])) >= len(text):
+            entry['kind'] = 'keyframe'
+            entry['content_hash'] = self.blobs.put(text.encode('utf-8'))
+        else:
+            kind, field, changes = delta
+            entry['kind'] = kind
+            entry[field] = changes
+        self.store.insert(self.history, entry)
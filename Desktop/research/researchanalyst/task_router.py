@@ -3,19 +3,16 @@ import uuid
 from datetime import datetime
 from typing import Dict, Any, List
 from source_matcher import assign_sources_to_task
-
-tasks_path = 'data/tasks.json'
+from storage import get_store
 
 def load_tasks() -> List[Dict[str, Any]]:
     try:
-        with open(tasks_path, 'r') as f:
-            return json.load(f)
+        return get_store().load('tasks', writable=True)
     except (FileNotFoundError, json.JSONDecodeError):
         return []
 
 def save_tasks(tasks: List[Dict[str, Any]]):
-    with open(tasks_path, 'w') as f:
-        json.dump(tasks, f, indent=2)
+    get_store().save('tasks', tasks)
 
 def create_task(task_data: Dict[str, Any], origin: str = 'analyst') -> Dict[str, Any]:
     """
@@ -23,8 +20,6 @@ def create_task(task_data: Dict[str, Any], origin: str = 'analyst') -> Dict[str,
     Returns the new task with proper ID and metadata.
     """
     try:
-        tasks = load_tasks()
-        
         # Generate a unique ID if not provided
         if 'id' not in task_data or not task_data['id']:
             task_data['id'] = f"task-{str(uuid.uuid4())[:8]}"
@@ -58,9 +53,8 @@ def create_task(task_data: Dict[str, Any], origin: str = 'analyst') -> Dict[str,
             }
         }
         
-        # Add the new task to the list
-        tasks.append(new_task)
-        save_tasks(tasks)
+        # Append the new task without rewriting the collection
+        get_store().insert('tasks', new_task)
         
         # Return the task ID for the frontend
         return {"id": new_task['id'], "success": True, "task": new_task}
@@ -3,6 +3,24 @@ import re
 from datetime import datetime
 from typing import Dict, List, Any, Tuple, Optional
 
+from storage import get_store
+
+
+def _load_tasks(tasks_file: Optional[str]) -> List[Dict[str, Any]]:
+    """Load tasks from the configured store, or from an explicit JSON file."""
+    if tasks_file is None:
+        return get_store().load('tasks', writable=True)
+    with open(tasks_file, 'r') as f:
+        return json.load(f)
+
+
+def _save_tasks(tasks_file: Optional[str], tasks: List[Dict[str, Any]]):
+    if tasks_file is None:
+        get_store().save('tasks', tasks)
+    else:
+        with open(tasks_file, 'w') as f:
+            json.dump(tasks, f, indent=2)
+
 class TaskValidator:
     """Validates task data structure and content for quality assurance."""
     
@@ -18,7 +36,7 @@ class TaskValidator:
     VALID_RISK_LEVELS = ['Low', 'Medium', 'High', 'Critical']
     VALID_URGENCY_LEVELS = ['Low', 'Medium', 'High', 'Critical']
     
-    def __init__(self, tasks_file: str = 'data/tasks.json'):
+    def __init__(self, tasks_file: Optional[str] = None):
         self.tasks_file = tasks_file
         self.validation_errors = []
         self.validation_warnings = []
@@ -125,12 +143,11 @@ class TaskValidator:
         return len(errors) == 0, errors, warnings
     
     def validate_all_tasks(self) -> Tuple[bool, List[str], List[str]]:
-        """Validate all tasks in the tasks file."""
+        """Validate all tasks in the tasks file (or the task store when no file is given)."""
         try:
-            with open(self.tasks_file, 'r') as f:
-                tasks = json.load(f)
+            tasks = _load_tasks(self.tasks_file)
         except FileNotFoundError:
-            return False, [f"Tasks file not found: {self.tasks_file}"], []
+            return False, [f"Tasks file not found: {self.tasks_file or 'data/tasks.json'}"], []
         except json.JSONDecodeError as e:
             return False, [f"Invalid JSON in tasks file: {e}"], []
         
@@ -191,8 +208,7 @@ class TaskValidator:
     def get_tasks_quality_report(self) -> Dict[str, Any]:
         """Generate a comprehensive quality report for all tasks."""
         try:
-            with open(self.tasks_file, 'r') as f:
-                tasks = json.load(f)
+            tasks = _load_tasks(self.tasks_file)
         except (FileNotFoundError, json.JSONDecodeError):
             return {"error": "Could not load tasks file"}
         
@@ -239,7 +255,7 @@ class TaskValidator:
         
         return report
 
-def validate_and_fix_tasks(tasks_file: str = 'data/tasks.json') -> Tuple[bool, List[str]]:
+def validate_and_fix_tasks(tasks_file: Optional[str] = None) -> Tuple[bool, List[str]]:
     """Validate tasks and attempt to fix common issues."""
     validator = TaskValidator(tasks_file)
     is_valid, errors, warnings = validator.validate_all_tasks()
@@ -249,8 +265,7 @@ def validate_and_fix_tasks(tasks_file: str = 'data/tasks.json') -> Tuple[bool, L
     
     # Try to fix common issues
     try:
-        with open(tasks_file, 'r') as f:
-            tasks = json.load(f)
+        tasks = _load_tasks(tasks_file)
     except:
         return False, errors
     
@@ -287,8 +302,7 @@ def validate_and_fix_tasks(tasks_file: str = 'data/tasks.json') -> Tuple[bool, L
     
     # Save fixed tasks
     try:
-        with open(tasks_file, 'w') as f:
-            json.dump(tasks, f, indent=2)
+        _save_tasks(tasks_file, tasks)
         fixed_errors.append("Fixed common validation issues and saved updated tasks")
     except Exception as e:
         fixed_errors.append(f"Could not save fixed tasks: {e}")
@@ -0,0 +1,32 @@
+import importlib
+
+import pytest
+
+from storage import JsonBackend, Repository, Store
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setenv('FEED_INGESTER', 'off')
+    app = importlib.import_module('app')
+    store = Store(JsonBackend(str(tmp_path)))
+    store.save('tasks', [{'id': 't1', 'title': 'Payments review'}])
+    monkeypatch.setattr(app, 'store', store)
+    monkeypatch.setattr(app, 'repository', Repository(store))
+    return app.app.test_client()
+
+
+@pytest.mark.parametrize('url', ['/api/deliverables', '/api/deliverables?limit=5'])
+def test_missing_collection_file_is_served_empty(client, url):
+    response = client.get(url)
+
+    assert response.status_code == 200
+    assert 'ETag' not in response.headers
+    body = response.get_json()
+    assert body == [] or body['items'] == []
+
+
+def test_existing_collection_gets_an_etag(client):
+    response = client.get('/api/tasks')
+    assert response.status_code == 200 and response.get_json()[0]['id'] == 't1'
+    assert client.get('/api/tasks', headers={'If-None-Match': response.headers['ETag']}).status_code == 304
@@ -0,0 +1,36 @@
+import api.deliverable_engine
+from api.deliverable_engine import DeliverableEngine
+from search.tfidf import TfidfModel
+from storage import JsonBackend, Store
+
+
+def _model(tmp_path, monkeypatch):
+    store = Store(JsonBackend(str(tmp_path)))
+    store.save('sources', [{'id': f's{i}', 'title': f'payments report{i}'} for i in range(5)])
+    store.save('tasks', [{'id': 't1', 'title': 'payments review'}])
+    model = TfidfModel(store, path=str(tmp_path / 'tfidf.json'))
+    refreshes = []
+    original = model.refresh
+    monkeypatch.setattr(model, 'refresh', lambda: refreshes.append(1) or original())
+    monkeypatch.setattr(api.deliverable_engine, 'get_tfidf_model', lambda: model)
+    return model, refreshes
+
+
+def test_ranking_refreshes_the_model_once(tmp_path, monkeypatch):
+    model, refreshes = _model(tmp_path, monkeypatch)
+    sources = [{'title': f'payments report{i}'} for i in range(5)] + [{'title': 'unrelated'}]
+
+    ranked = DeliverableEngine.__new__(DeliverableEngine)._rank_sources_by_relevance(
+        {'title': 'payments report3'}, sources)
+
+    assert len(refreshes) == 1
+    assert ranked[0]['title'] == 'payments report3' and ranked[-1]['relevance_score'] == 0
+
+
+def test_similarity_refreshes_only_when_asked(tmp_path, monkeypatch):
+    model, refreshes = _model(tmp_path, monkeypatch)
+
+    assert model.similarity('payments review', 'payments review') > 0.99
+    assert len(refreshes) == 1
+    assert model.similarity('payments review', 'report1', refresh=False) == 0
+    assert len(refreshes) == 1
@@ -0,0 +1,101 @@
+import http.server
+import threading
+
+import pytest
+
+from api.feeds import FeedFetcher
+from api.http_client import HttpClient
+
+
+def rss(count):
+    items = ''.join(
+        f'<item><title>Story {i} {"payments" if i % 3 == 0 else "misc"}</title>'
+        f'<description>Body {i}</description><link>http://example.com/{i}</link>'
+        f'<pubDate>Mon, 01 Jan 2024 10:00:00 GMT</pubDate></item>' for i in range(count))
+    return f'<?xml version="1.0"?><rss version="2.0"><channel><title>Fixture RSS</title>{items}</channel></rss>'
+
+
+FEEDS = {
+    '/rss': rss(30).encode(),
+    '/atom': (b'<?xml version="1.0"?><feed xmlns="http://www.w3.org/2005/Atom"><title>Fixture Atom</title>'
+              b'<entry><title>Atom payments</title><link href="http://example.com/a"/>'
+              b'<summary>s</summary><updated>2024-01-01T00:00:00Z</updated></entry></feed>'),
+    # &nbsp; is not an XML entity
+    '/malformed': (b'<rss><channel><title>Malformed &nbsp; feed</title>'
+                   b'<item><title>payments &nbsp; story</title><link>http://example.com/m</link></item>'
+                   b'</channel></rss>'),
+    '/truncated': rss(3).encode()[:-len('</channel></rss>')],
+}
+
+
+class FeedHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        if self.headers.get('If-None-Match') == '"v1"':
+            self.send_response(304)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        body = FEEDS[self.path]
+        self.send_response(200)
+        self.send_header('ETag', '"v1"')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture(scope='module')
+def server():
+    httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), FeedHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{httpd.server_port}'
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def fetcher():
+    return FeedFetcher(client=HttpClient())
+
+
+def test_download_reads_rss_and_atom(server, fetcher):
+    result = fetcher.download(server + '/rss')
+    assert result['title'] == 'Fixture RSS'
+    assert result['etag'] == '"v1"'
+    assert result['complete'] and len(result['items']) == 30
+    assert result['items'][0] == {'title': 'Story 0 payments', 'description': 'Body 0',
+                                  'link': 'http://example.com/0', 'published': 'Mon, 01 Jan 2024 10:00:00 GMT'}
+
+    atom = fetcher.download(server + '/atom')
+    assert atom['title'] == 'Fixture Atom'
+    assert atom['items'][0]['link'] == 'http://example.com/a'
+
+
+def test_unchanged_feed_returns_previous_result_on_304(server, fetcher):
+    previous = fetcher.download(server + '/rss')
+    assert fetcher.download(server + '/rss', previous) is previous
+    assert fetcher.stats['not_modified'] == 1
+
+
+def test_reading_stops_after_enough_matches(server, fetcher):
+    result = fetcher.download(server + '/rss', terms=['payments'], limit=2)
+    assert not result['complete']
+    # Items 0 and 3 match; nothing after the second match is read
+    assert len(result['items']) == 4
+
+
+def test_malformed_feed_falls_back_to_feedparser(server, fetcher):
+    result = fetcher.download(server + '/malformed')
+    assert result['complete']
+    assert [item['link'] for item in result['items']] == ['http://example.com/m']
+
+
+def test_truncated_feed_falls_back_to_feedparser(server, fetcher):
+    result = fetcher.download(server + '/truncated')
+    assert result['complete']
+    assert [item['title'] for item in result['items']] == ['Story 0 payments', 'Story 1 misc', 'Story 2 misc']
@@ -0,0 +1,29 @@
+from storage.json_backend import JsonBackend
+
+
+def test_append_after_torn_tail_keeps_acknowledged_records(tmp_path):
+    backend = JsonBackend(str(tmp_path))
+    backend.insert('tasks', {'id': 1})
+    # A crash mid-append leaves a partial line without its newline
+    with open(backend.log('tasks').path, 'a') as f:
+        f.write('{"op":"insert","rec')
+    backend.insert('tasks', {'id': 2})
+    backend.insert('tasks', {'id': 3})
+
+    _, records = backend.read('tasks')
+    assert records == [{'id': 1}, {'id': 2}, {'id': 3}]
+
+
+def test_torn_tail_is_ignored_until_the_next_append(tmp_path):
+    backend = JsonBackend(str(tmp_path))
+    backend.upsert('tasks', {'id': 1, 'title': 'a'})
+    with open(backend.log('tasks').path, 'a') as f:
+        f.write('{"op":"upsert"')
+
+    _, records = backend.read('tasks')
+    assert records == [{'id': 1, 'title': 'a'}]
+
+    before, after = backend.upsert('tasks', {'id': 1, 'title': 'b'})
+    assert after[-1] == backend.log('tasks').size()
+    _, records = backend.read('tasks')
+    assert records == [{'id': 1, 'title': 'b'}]
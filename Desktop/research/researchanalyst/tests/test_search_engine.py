@@ -0,0 +1,25 @@
+from search.engine import SearchIndex
+from storage import BlobStore, JsonBackend, Repository, Store
+
+
+def _index(tmp_path):
+    store = Store(JsonBackend(str(tmp_path)))
+    store.save('tasks', [{'id': 't1', 'title': 'Payments strategy', 'status': 'Active', 'category': 'Research'},
+                         {'id': 't2', 'title': 'Payments rollout', 'status': 'Completed', 'category': 'Research'}])
+    store.save('sources', [{'id': 's1', 'title': 'Payments report', 'type': 'report', 'media_type': 'pdf'}])
+    store.save('deliverables', [{'id': 'd1', 'title': 'Payments brief', 'content': 'payments'}])
+    return SearchIndex(store, Repository(store), BlobStore(str(tmp_path / 'blobs')))
+
+
+def test_type_filter_applies_to_total_and_facets(tmp_path):
+    result = _index(tmp_path).query('payments', types=['task'])
+    assert {hit['id'] for hit in result['hits']} == {'t1', 't2'}
+    assert result['total'] == 2
+    assert result['facets']['status'] == {'Active': 1, 'Completed': 1}
+    assert not result['facets'].get('source_type')
+
+
+def test_unfiltered_query_counts_every_collection(tmp_path):
+    result = _index(tmp_path).query('payments')
+    assert result['total'] == 4
+    assert result['facets']['source_type'] == {'report': 1}
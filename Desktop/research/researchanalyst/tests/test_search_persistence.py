@@ -0,0 +1,69 @@
+import search.lsh
+from search.lsh import LSHIndex
+from search.tfidf import TfidfModel
+from storage import JsonBackend, Store
+
+
+def _store(data_dir):
+    return Store(JsonBackend(data_dir))
+
+
+def _seed(data_dir):
+    store = _store(data_dir)
+    store.save('sources', [{'id': f's{i}', 'title': f'topic{i} report{i}'} for i in range(1, 6)])
+    store.save('tasks', [{'id': 't1', 'title': 'payments review'}])
+    return store
+
+
+def test_tfidf_is_not_saved_under_a_newer_version(tmp_path):
+    data_dir, path = str(tmp_path), str(tmp_path / 'tfidf.json')
+    store = _seed(data_dir)
+    model = TfidfModel(store, path=path)
+    model.refresh()
+    # Counted incrementally but not saved yet (PERSIST_INTERVAL)
+    store.upsert('sources', {'id': 's2', 'title': 'digital payments'})
+    # Another worker edits a source in place before the exit-time save
+    _store(data_dir).upsert('sources', {'id': 's1', 'title': 'quarterly earnings'})
+    model.save()
+
+    fresh = TfidfModel(_store(data_dir), path=path)
+    fresh.refresh()
+    assert fresh.document_frequency('earnings') == 1
+    assert fresh.document_frequency('topic1') == 0
+    assert fresh.document_frequency('payments') == 2
+
+
+def test_tfidf_is_reused_while_its_version_matches(tmp_path):
+    data_dir, path = str(tmp_path), str(tmp_path / 'tfidf.json')
+    store = _seed(data_dir)
+    model = TfidfModel(store, path=path)
+    model.refresh()
+    store.upsert('sources', {'id': 's2', 'title': 'digital payments'})
+    model.save()
+
+    fresh = TfidfModel(_store(data_dir), path=path)
+    fresh._recount = None  # would raise if the persisted counts were not adopted
+    fresh.refresh()
+    assert fresh.document_frequency('payments') == 2
+
+
+def test_lsh_is_not_saved_under_a_newer_version(tmp_path, monkeypatch):
+    # Tiny corpus: keep every term out of the common set
+    monkeypatch.setattr(search.lsh, 'MAX_DF_RATIO', 1.0)
+    data_dir = str(tmp_path)
+    store = _seed(data_dir)
+    index = LSHIndex(store, TfidfModel(store, path=str(tmp_path / 'tfidf.json')), path=str(tmp_path / 'lsh.npz'))
+    index.refresh()
+    store.upsert('sources', {'id': 's2', 'title': 'digital payments'})
+    _store(data_dir).upsert('sources', {'id': 's1', 'title': 'quarterly earnings'})
+    index.save()
+
+    current = _store(data_dir)
+    expected = LSHIndex(current, TfidfModel(current, path=str(tmp_path / 'other.json')),
+                        path=str(tmp_path / 'other.npz'))
+    expected.refresh()
+    fresh_store = _store(data_dir)
+    fresh = LSHIndex(fresh_store, TfidfModel(fresh_store, path=str(tmp_path / 'tfidf.json')),
+                     path=str(tmp_path / 'lsh.npz'))
+    fresh.refresh()
+    assert (fresh.hashes == expected.hashes).all()
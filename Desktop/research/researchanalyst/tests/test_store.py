@@ -0,0 +1,94 @@
+import pytest
+
+import storage.json_backend
+import storage.store
+from storage import JsonBackend, Repository, SqliteBackend, Store
+
+
+@pytest.fixture(params=['json', 'sqlite'])
+def store(request, tmp_path):
+    if request.param == 'json':
+        backend = JsonBackend(str(tmp_path))
+    else:
+        backend = SqliteBackend(str(tmp_path / 'research.db'), str(tmp_path))
+    store = Store(backend)
+    store.save('tasks', [{'id': f't{i}', 'title': f'Task {i}'} for i in range(100)])
+    return store
+
+
+def test_views_handed_out_are_not_changed_by_later_writes(store):
+    repository = Repository(store)
+    view = store.load('tasks')
+    store.upsert('tasks', {'id': 't5', 'title': 'Renamed'})
+    store.insert('tasks', {'id': 't100', 'title': 'New'})
+
+    assert view[5]['title'] == 'Task 5' and len(view) == 100
+    current = store.load('tasks')
+    assert current[5]['title'] == 'Renamed' and len(current) == 101
+    assert repository.get('tasks', 't5')['title'] == 'Renamed'
+    assert repository.get('tasks', 't100')['title'] == 'New'
+
+
+def test_burst_of_writes_copies_the_view_once(store, monkeypatch):
+    Repository(store)
+    store.load('tasks')
+    copies = []
+    original = storage.store.FrozenList
+    monkeypatch.setattr(storage.store, 'FrozenList', lambda records: copies.append(1) or original(records))
+    for i in range(20):
+        store.upsert('tasks', {'id': f't{i}', 'title': f'Edited {i}'})
+    store.upsert('tasks', {'id': 't200', 'title': 'Appended'})
+
+    assert len(copies) == 1
+    records = store.load('tasks')
+    assert [r['title'] for r in records[:3]] == ['Edited 0', 'Edited 1', 'Edited 2']
+    assert records[-1]['id'] == 't200' and len(records) == 101
+
+
+def test_upsert_positions_come_from_the_id_index(store, monkeypatch):
+    repository = Repository(store)
+    repository.get('tasks', 't0')
+    monkeypatch.setattr(storage.store, 'find_index', lambda *args: pytest.fail('scanned for the position'))
+    store.upsert('tasks', {'id': 't42', 'title': 'Indexed'})
+    store.upsert('tasks', {'id': 't43', 'title': 'Indexed too'})
+
+    records = store.load('tasks')
+    assert records[42]['title'] == 'Indexed' and records[43]['title'] == 'Indexed too'
+
+
+def test_version_reads_neither_the_data_nor_the_write_lock(store, monkeypatch):
+    first = store.version('tasks')
+    monkeypatch.setattr(store.backend, 'read', lambda name: pytest.fail('read the collection'))
+    monkeypatch.setattr(storage.store.Store, 'snapshot', lambda self, name: pytest.fail('took a snapshot'))
+    if isinstance(store.backend, JsonBackend):
+        monkeypatch.setattr(storage.json_backend, 'write_json_atomic',
+                            lambda *args, **kwargs: pytest.fail('wrote on a read'))
+    store.invalidate()
+    store._versions.clear()
+
+    assert store.version('tasks') == first
+
+
+def test_version_increases_with_every_write(store):
+    versions = [store.version('tasks')[0]]
+    store.upsert('tasks', {'id': 't1', 'title': 'Edited'})
+    versions.append(store.version('tasks')[0])
+    store.insert('tasks', {'id': 't100', 'title': 'New'})
+    versions.append(store.version('tasks')[0])
+    store.save('tasks', [])
+    versions.append(store.version('tasks')[0])
+
+    assert versions == sorted(set(versions))
+    assert Store(store.backend).version('tasks')[0] == versions[-1]
+
+
+def test_hand_edits_get_a_version_that_later_writes_keep_ahead_of(tmp_path):
+    store = Store(JsonBackend(str(tmp_path)))
+    store.save('tasks', [{'id': 't0'}])
+    saved = store.version('tasks')[0]
+    (tmp_path / 'tasks.json').write_text('[{"id": "t0", "title": "By hand"}]')
+
+    edited = store.version('tasks')[0]
+    store.upsert('tasks', {'id': 't1'})
+
+    assert saved < edited < store.version('tasks')[0]
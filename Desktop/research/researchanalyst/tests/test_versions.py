@@ -0,0 +1,48 @@
+import multiprocessing
+
+import pytest
+
+from storage import BlobStore, JsonBackend, Repository, Store, VersionConflict, VersionedCollection
+
+
+def _collection(data_dir, create=False):
+    store = Store(JsonBackend(data_dir))
+    if create:
+        store.save('deliverables', [])
+        store.save('deliverable_versions', [])
+    return VersionedCollection(store, Repository(store), BlobStore(f'{data_dir}/blobs'))
+
+
+def _patch(data_dir, start, results):
+    start.wait()
+    try:
+        _collection(data_dir).patch('t1', 1, edits=[[0, 0, 'x']])
+        results.put('ok')
+    except VersionConflict:
+        results.put('conflict')
+
+
+def test_concurrent_patches_from_two_processes_conflict(tmp_path):
+    data_dir = str(tmp_path)
+    _collection(data_dir, create=True).save({'task_id': 't1', 'content': 'hello\n'})
+    context = multiprocessing.get_context('fork')
+    start, results = context.Event(), context.Queue()
+    workers = [context.Process(target=_patch, args=(data_dir, start, results)) for _ in range(2)]
+    for worker in workers:
+        worker.start()
+    start.set()
+    for worker in workers:
+        worker.join(30)
+
+    assert sorted(results.get(timeout=5) for _ in workers) == ['conflict', 'ok']
+    collection = _collection(data_dir)
+    assert collection.latest('t1')['version'] == 2
+    assert [entry['version'] for entry in collection.versions('t1')] == [1, 2]
+
+
+def test_stale_patch_is_rejected(tmp_path):
+    collection = _collection(str(tmp_path), create=True)
+    collection.save({'task_id': 't1', 'content': 'hello\n'})
+    collection.patch('t1', 1, edits=[[0, 0, 'x']])
+    with pytest.raises(VersionConflict):
+        collection.patch('t1', 1, edits=[[0, 0, 'y']])